@@ -0,0 +1,68 @@
+"""
+Кэштелген аутентификация.
+
+Әр сұрауда сессия, `CustomUser` және `user.group` үшін базаға бару
+болмауы үшін пайдаланушының ықшам көшірмесі (snapshot) кэште сақталады.
+Көшірме пайдаланушы немесе оның группасы сақталғанда/жойылғанда өшіріледі
+(accounts.signals қараңыз).
+"""
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+from core.models import CustomUser, Group
+
+SNAPSHOT_FIELDS = (
+    'id', 'password', 'last_login', 'is_superuser', 'username', 'first_name',
+    'last_name', 'email', 'is_staff', 'is_active', 'date_joined', 'role', 'group_id',
+    'digest_frequency',
+)
+
+
+def user_cache_key(user_id):
+    return f'auth:user:{user_id}'
+
+
+def build_snapshot(user):
+    """Пайдаланушының кэшке жазылатын ықшам көшірмесі"""
+    snapshot = {field: getattr(user, field) for field in SNAPSHOT_FIELDS}
+    snapshot['group_name'] = user.group.name if user.group_id else None
+    return snapshot
+
+
+def user_from_snapshot(snapshot):
+    """Көшірмеден базаға бармай `CustomUser` құру (қалған өрістер deferred)"""
+    # from_db мәндерді модель өрістерінің ретімен күтеді
+    field_names = [f.attname for f in CustomUser._meta.concrete_fields if f.attname in snapshot]
+    user = CustomUser.from_db(
+        DEFAULT_DB_ALIAS, field_names, [snapshot[field] for field in field_names]
+    )
+    if snapshot['group_id']:
+        user.group = Group.from_db(
+            DEFAULT_DB_ALIAS, ['id', 'name'], [snapshot['group_id'], snapshot['group_name']]
+        )
+    return user
+
+
+def invalidate_user_snapshot(*user_ids):
+    """Пайдаланушылардың кэштегі көшірмесін өшіру"""
+    cache.delete_many([user_cache_key(user_id) for user_id in user_ids])
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend, бірақ get_user алдымен кэштен оқиды"""
+
+    def get_user(self, user_id):
+        key = user_cache_key(user_id)
+        snapshot = cache.get(key)
+        if snapshot is None:
+            try:
+                user = CustomUser._default_manager.select_related('group').get(pk=user_id)
+            except CustomUser.DoesNotExist:
+                return None
+            snapshot = build_snapshot(user)
+            cache.set(key, snapshot, getattr(settings, 'AUTH_USER_CACHE_TIMEOUT', 300))
+        else:
+            user = user_from_snapshot(snapshot)
+        return user if self.user_can_authenticate(user) else None
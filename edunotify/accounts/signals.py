@@ -0,0 +1,28 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from core.models import CustomUser, Group
+from core.signals import users_regrouped
+from .backends import invalidate_user_snapshot
+
+
+@receiver([post_save, post_delete], sender=CustomUser)
+def invalidate_user_cache(sender, instance, **kwargs):
+    """Пайдаланушы өзгергенде (профиль, edit_user, пароль) кэшті өшіру"""
+    invalidate_user_snapshot(instance.pk)
+
+
+@receiver([post_save, pre_delete], sender=Group)
+def invalidate_group_members_cache(sender, instance, **kwargs):
+    """Группа аты көшірмеде сақталады, сондықтан мүшелердің кэшін өшіру"""
+    member_ids = list(CustomUser.objects.filter(group_id=instance.pk).values_list('id', flat=True))
+    if member_ids:
+        invalidate_user_snapshot(*member_ids)
+
+
+@receiver(users_regrouped)
+def invalidate_regrouped_users_cache(sender, user_ids, **kwargs):
+    """Жаппай ауыстыруда save() шақырылмайды; commit-тен кейін тағы өшіріледі"""
+    invalidate_user_snapshot(*user_ids)
+    transaction.on_commit(lambda: invalidate_user_snapshot(*user_ids))
@@ -1,3 +1,144 @@
-from django.test import TestCase
+import time
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+
+from core.models import CustomUser, Group
+from .backends import CachedModelBackend
+from .throttling import client_ip
+
+
+class CachedModelBackendTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.group = Group.objects.create(name='ИС-21')
+        self.user = CustomUser.objects.create_user(
+            username='student', email='student@example.com', password='pass12345', group=self.group
+        )
+        self.backend = CachedModelBackend()
+
+    def test_warm_cache_loads_user_and_group_without_queries(self):
+        self.backend.get_user(self.user.pk)
+        with self.assertNumQueries(0):
+            user = self.backend.get_user(self.user.pk)
+            self.assertEqual(user.group.name, 'ИС-21')
+            self.assertEqual(user.role, 'user')
+
+    def test_user_save_invalidates_snapshot(self):
+        self.backend.get_user(self.user.pk)
+        self.user.first_name = 'Айгерім'
+        self.user.save()
+        self.assertEqual(self.backend.get_user(self.user.pk).first_name, 'Айгерім')
+
+    def test_group_rename_invalidates_member_snapshots(self):
+        self.backend.get_user(self.user.pk)
+        self.group.name = 'ИС-22'
+        self.group.save()
+        self.assertEqual(self.backend.get_user(self.user.pk).group.name, 'ИС-22')
+
+    def test_page_view_hits_database_zero_times_for_auth(self):
+        self.client.login(username='student', password='pass12345')
+        self.client.get('/profile/')
+        with self.assertNumQueries(0):
+            # Группалар тізімі каталогтан (core.catalogue) алынады
+            self.client.get('/profile/')
+
+
+class CountingHasher(PBKDF2PasswordHasher):
+    """Тесттерге арналған: есептелген хештер санын жазады"""
+    iterations = 1000
+    calls = 0
+
+    def encode(self, password, salt, iterations=None):
+        CountingHasher.calls += 1
+        return super().encode(password, salt, iterations)
+
+
+@override_settings(
+    PASSWORD_HASHERS=['accounts.tests.CountingHasher'],
+    AUTH_THROTTLE_RULES={
+        'login': {'ip': (20, 300), 'username': (5, 300)},
+        'register': {'ip': (3, 3600)},
+        'password_reset': {'ip': (10, 3600), 'username': (2, 3600)},
+    },
+)
+class ThrottlingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(
+            username='student', email='student@example.com', password='pass12345'
+        )
+        CountingHasher.calls = 0
+
+    def _login(self, username, password='wrong', ip='10.0.0.1', **extra):
+        return self.client.post('/login/', {'username': username, 'password': password}, REMOTE_ADDR=ip, **extra)
+
+    def test_burst_against_one_username_keeps_hash_count_bounded(self):
+        responses = [self._login('student', ip=f'10.0.1.{i}') for i in range(50)]
+        self.assertEqual(CountingHasher.calls, 6)
+        self.assertEqual(responses[-1].status_code, 429)
+        self.assertTrue(int(responses[-1]['Retry-After']) > 0)
+
+        # Құлып кезінде дұрыс пароль да тексерілмейді
+        self.assertEqual(self._login('student', 'pass12345').status_code, 429)
+        self.assertEqual(CountingHasher.calls, 6)
+
+    def test_credential_stuffing_from_one_ip_is_bounded(self):
+        for i in range(100):
+            self._login(f'user{i}')
+        self.assertEqual(CountingHasher.calls, 21)
+        # Басқа IP-ден кіру жұмыс істейді
+        self.assertEqual(self._login('student', 'pass12345', ip='10.0.0.2').status_code, 302)
+
+    def test_lockout_doubles_and_success_resets_username_counter(self):
+        for _ in range(4):
+            self._login('student')
+        self.assertEqual(self._login('student', 'pass12345').status_code, 302)
+        self.client.logout()
+        for _ in range(5):
+            self.assertEqual(self._login('student').status_code, 200)
+
+        for _ in range(2):
+            self._login('student')
+        self.assertEqual(int(self._login('student')['Retry-After']), 60)
+        # Құлып біткеннен кейінгі келесі сәтсіз әрекет екі есе ұзақ құлыптайды
+        with mock.patch('accounts.throttling.time.time', return_value=time.time() + 61):
+            self.assertEqual(self._login('student').status_code, 200)
+            self.assertEqual(int(self._login('student')['Retry-After']), 120)
+
+    def test_direct_client_ignores_forwarded_header(self):
+        request = RequestFactory().post('/login/', REMOTE_ADDR='203.0.113.5', HTTP_X_FORWARDED_FOR='10.9.9.9')
+        self.assertEqual(client_ip(request), '203.0.113.5')
+
+    @override_settings(AUTH_THROTTLE_TRUSTED_PROXIES=['10.0.0.0/8'])
+    def test_proxied_clients_get_separate_buckets(self):
+        request = RequestFactory().post(
+            '/login/', REMOTE_ADDR='10.0.0.1', HTTP_X_FORWARDED_FOR='1.2.3.4, 198.51.100.7, 10.0.0.2'
+        )
+        # Клиент жазған сол жақ hop емес, прокси қосқан оң жақ сенімсіз hop
+        self.assertEqual(client_ip(request), '198.51.100.7')
+
+        for i in range(100):
+            self._login(f'user{i}', ip='10.0.0.1', HTTP_X_FORWARDED_FOR='198.51.100.7')
+        self.assertEqual(self._login('x', ip='10.0.0.1', HTTP_X_FORWARDED_FOR='198.51.100.7').status_code, 429)
+        # Сол прокси арқылы келген басқа клиент құлыпталмайды
+        response = self._login('student', 'pass12345', ip='10.0.0.1', HTTP_X_FORWARDED_FOR='198.51.100.8')
+        self.assertEqual(response.status_code, 302)
+
+    def test_register_and_password_reset_are_throttled(self):
+        for i in range(10):
+            self.client.post('/register/', {
+                'username': f'new{i}', 'email': f'new{i}@example.com',
+                'password1': 'pass12345', 'password2': 'pass12345',
+            })
+            self.client.logout()
+        self.assertEqual(CountingHasher.calls, 3)
+        self.assertEqual(CustomUser.objects.filter(username__startswith='new').count(), 3)
+
+        statuses = [
+            self.client.post('/password-reset/', {'email': 'student@example.com'}).status_code
+            for _ in range(4)
+        ]
+        self.assertEqual(statuses, [302, 302, 429, 429])
@@ -0,0 +1,174 @@
+"""
+Кіру, тіркелу және парольді қалпына келтіру әрекеттерін шектеу.
+
+Әр сәтсіз кіру толық PBKDF2 хешін есептейді, сондықтан credential
+stuffing кезінде worker-лердің CPU-ы таусылады. Әрекеттер IP және
+пайдаланушы аты (email) бойынша кэштегі атомарлы санауыштармен (`incr`)
+сырғымалы терезеде саналады: ағымдағы және алдыңғы терезе салмақпен
+қосылады. Шектен асқанда құлып қойылады, әр келесі құлып екі есе ұзақ
+(AUTH_THROTTLE_MAX_LOCKOUT-қа дейін). Құлып хеш есептелмей тұрып
+тексеріледі - құлыптаулы сұрау базаға да, хешерге де жетпейді.
+
+Кэш барлық процестерге ортақ болуы керек (production-да Redis);
+LocMemCache-те шектеу әр процесте бөлек саналады.
+
+nginx артында REMOTE_ADDR - прокси мекенжайы. REMOTE_ADDR
+AUTH_THROTTLE_TRUSTED_PROXIES ішінде болса, клиент IP-і
+X-Forwarded-For тізбегінің оң жағынан алғашқы сенімсіз hop болады
+(сол жақ бөлігін клиенттің өзі жаза алады).
+"""
+import functools
+import hashlib
+import ipaddress
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.shortcuts import render
+
+DEFAULT_RULES = {
+    'login': {'ip': (100, 300), 'username': (5, 300)},
+    'register': {'ip': (30, 3600)},
+    'password_reset': {'ip': (20, 3600), 'username': (3, 3600)},
+}
+
+
+def get_rules(scope):
+    """{түрі: (шек, терезе секундпен)}"""
+    return getattr(settings, 'AUTH_THROTTLE_RULES', DEFAULT_RULES).get(scope, {})
+
+
+def get_lockout_range():
+    return (
+        getattr(settings, 'AUTH_THROTTLE_LOCKOUT', 60),
+        getattr(settings, 'AUTH_THROTTLE_MAX_LOCKOUT', 3600),
+    )
+
+
+def get_trusted_proxies():
+    """Сенімді прокси желілері (IP немесе CIDR)"""
+    return [
+        ipaddress.ip_network(proxy, strict=False)
+        for proxy in getattr(settings, 'AUTH_THROTTLE_TRUSTED_PROXIES', [])
+    ]
+
+
+def get_client_ip_header():
+    return getattr(settings, 'AUTH_THROTTLE_CLIENT_IP_HEADER', 'HTTP_X_FORWARDED_FOR')
+
+
+def _is_trusted(address, proxies):
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in proxies)
+
+
+def client_ip(request):
+    remote_addr = request.META.get('REMOTE_ADDR', '')
+    proxies = get_trusted_proxies()
+    if not _is_trusted(remote_addr, proxies):
+        return remote_addr
+    hops = [hop.strip() for hop in request.META.get(get_client_ip_header(), '').split(',') if hop.strip()]
+    for hop in reversed(hops):
+        if not _is_trusted(hop, proxies):
+            return hop
+    # Тізбектің бәрі сенімді прокси - ең алғашқысы клиентке жақын
+    return hops[0] if hops else remote_addr
+
+
+def identities(scope, request, username=None):
+    """(түрі, кэш кілтінің негізі) жұптары"""
+    values = {'ip': client_ip(request), 'username': (username or '').strip().lower()}
+    for kind in get_rules(scope):
+        if values.get(kind):
+            digest = hashlib.sha256(values[kind].encode()).hexdigest()[:32]
+            yield kind, f'throttle:{scope}:{kind}:{digest}'
+
+
+def _window_keys(base, window, now):
+    bucket = int(now // window)
+    return f'{base}:{bucket}', f'{base}:{bucket - 1}'
+
+
+def _hit(base, window, now):
+    """Әрекетті санау; сырғымалы терезедегі бағаланған санды қайтарады"""
+    current_key, previous_key = _window_keys(base, window, now)
+    cache.add(current_key, 0, window * 2)
+    try:
+        current = cache.incr(current_key)
+    except ValueError:
+        # add пен incr арасында кілт кэштен шығарылды
+        cache.set(current_key, 1, window * 2)
+        current = 1
+    previous = cache.get(previous_key, 0)
+    return current + previous * (1 - (now % window) / window)
+
+
+def _lock(base):
+    base_lockout, max_lockout = get_lockout_range()
+    strikes_key = f'{base}:strikes'
+    cache.add(strikes_key, 0, max_lockout * 2)
+    try:
+        strikes = cache.incr(strikes_key)
+    except ValueError:
+        strikes = 1
+    lockout = min(base_lockout * 2 ** (strikes - 1), max_lockout)
+    cache.set(f'{base}:lock', time.time() + lockout, lockout)
+    return lockout
+
+
+def retry_after(scope, request, username=None):
+    """Құлып бар болса, қанша секунд күту керегі; әйтпесе None"""
+    now = time.time()
+    keys = [f'{base}:lock' for _, base in identities(scope, request, username)]
+    locked_until = [until for until in cache.get_many(keys).values() if until > now]
+    if not locked_until:
+        return None
+    return max(1, math.ceil(max(locked_until) - now))
+
+
+def register_attempt(scope, request, username=None):
+    """Әрекетті санау; шек асса құлып қойып, оның ұзақтығын қайтарады"""
+    now = time.time()
+    lockouts = []
+    for kind, base in identities(scope, request, username):
+        limit, window = get_rules(scope)[kind]
+        if _hit(base, window, now) > limit:
+            lockouts.append(_lock(base))
+    return max(lockouts) if lockouts else None
+
+
+def reset(scope, request, username=None):
+    """Сәтті кіруден кейін пайдаланушы атының санауыштарын тазалау (IP қалады)"""
+    now = time.time()
+    for kind, base in identities(scope, request, username):
+        if kind != 'ip':
+            _, window = get_rules(scope)[kind]
+            cache.delete_many([*_window_keys(base, window, now), f'{base}:strikes'])
+
+
+def throttled_response(request, seconds):
+    response = render(request, 'auth/throttled.html', {'retry_after': seconds}, status=429)
+    response['Retry-After'] = str(seconds)
+    return response
+
+
+def throttle_posts(scope, username_field=None):
+    """Әр POST-ты санайтын декоратор (тіркелу, парольді қалпына келтіру)"""
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method == 'POST':
+                username = request.POST.get(username_field) if username_field else None
+                seconds = retry_after(scope, request, username)
+                if seconds is None:
+                    # Шекті асырған сұраудың өзі де өткізілмейді
+                    seconds = register_attempt(scope, request, username)
+                if seconds is not None:
+                    return throttled_response(request, seconds)
+            return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -2,24 +2,37 @@ from django.shortcuts import render, redirect
 from django.contrib.auth import login, authenticate, logout
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from core.models import CustomUser, Group
+from core.catalogue import get_group, group_catalogue
+from core.models import CustomUser
+from .throttling import register_attempt, reset, retry_after, throttle_posts
 
 def login_view(request):
     if request.method == 'POST':
         username = request.POST.get('username')
         password = request.POST.get('password')
         
+        # Құлып хеш есептелмей тұрып тексеріледі
+        seconds = retry_after('login', request, username)
+        if seconds is not None:
+            messages.error(request, f'Сәтсіз әрекеттер тым көп. {seconds} секундтан кейін қайталап көріңіз')
+            response = render(request, 'auth/login.html', status=429)
+            response['Retry-After'] = str(seconds)
+            return response
+        
         user = authenticate(request, username=username, password=password)
         
         if user is not None:
+            reset('login', request, username)
             login(request, user)
             messages.success(request, 'Сәтті кірдіңіз!')
             return redirect('home')
         else:
+            register_attempt('login', request, username)
             messages.error(request, 'Пайдаланушы аты немесе пароль қате')
     
     return render(request, 'auth/login.html') 
 
+@throttle_posts('register')
 def register_view(request):
     if request.method == 'POST':
         username = request.POST.get('username')
@@ -40,12 +53,7 @@ def register_view(request):
             messages.error(request, 'Бұл электронды пошта бос емес')
             return redirect('register')
         
-        group = None
-        if group_id:
-            try:
-                group = Group.objects.get(id=group_id)
-            except Group.DoesNotExist:
-                pass
+        group = get_group(group_id) if group_id else None
         
         user = CustomUser.objects.create_user(
             username=username,
@@ -58,7 +66,7 @@ def register_view(request):
         messages.success(request, 'Тіркелу сәтті аяқталды!')
         return redirect('home')
     
-    groups = Group.objects.all()
+    groups = group_catalogue()
     return render(request, 'auth/register.html', {'groups': groups}) 
 
 @login_required
@@ -74,17 +82,22 @@ def profile_view(request):
         user.first_name = request.POST.get('first_name', '')
         user.last_name = request.POST.get('last_name', '')
         
+        digest_frequency = request.POST.get('digest_frequency')
+        if digest_frequency in dict(CustomUser.DIGEST_CHOICES):
+            user.digest_frequency = digest_frequency
+        
         group_id = request.POST.get('group')
         if group_id:
-            try:
-                group = Group.objects.get(id=group_id)
+            group = get_group(group_id)
+            if group is not None:
                 user.group = group
-            except Group.DoesNotExist:
-                pass
         
         user.save()
         messages.success(request, 'Профиль сәтті жаңартылды!')
         return redirect('profile')
     
-    groups = Group.objects.all()
-    return render(request, 'profile.html', {'groups': groups})
\ No newline at end of file
+    groups = group_catalogue()
+    return render(request, 'profile.html', {
+        'groups': groups,
+        'digest_choices': CustomUser.DIGEST_CHOICES,
+    })
\ No newline at end of file
@@ -1,3 +1,158 @@
-from django.contrib import admin
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ActionForm
+from django.contrib.auth.admin import UserAdmin
+from django.db import transaction
 
-# Register your models here.
+from .catalogue import GroupChoiceField
+from .jobs import requeue_failed
+from .models import (
+    CustomUser, Group, Job, Notification, NotificationArchive, NotificationView, WebhookDeadLetter, WebhookEndpoint,
+)
+from .paginator import EstimatedCountPaginator
+from .regrouping import merge_groups, move_users
+from .webhooks import requeue_dead
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """Миллиондаған жолы бар кестелерге арналған ортақ баптаулар"""
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    list_per_page = 50
+
+
+class TargetGroupActionForm(ActionForm):
+    """Әрекеттер тізімінің жанындағы мақсат группа өрісі"""
+    target_group = GroupChoiceField(
+        queryset=Group.objects.all(), required=False, empty_label='Группасыз', label='Группа',
+        widget=forms.Select,
+    )
+
+
+def get_target_group(modeladmin, request):
+    """(дұрыс па, группа); ActionForm-ның өзін admin тексереді"""
+    field = TargetGroupActionForm.base_fields['target_group']
+    try:
+        return True, field.clean(request.POST.get('target_group'))
+    except forms.ValidationError:
+        modeladmin.message_user(request, 'Группа дұрыс таңдалмады', messages.ERROR)
+        return False, None
+
+
+@admin.register(Group)
+class GroupAdmin(admin.ModelAdmin):
+    list_display = ('name', 'member_count', 'notification_count', 'created_at')
+    search_fields = ('name',)
+    readonly_fields = ('member_count', 'notification_count', 'created_at')
+    ordering = ('name',)
+    action_form = TargetGroupActionForm
+    actions = ['merge_into']
+
+    @admin.action(description='Таңдалған группаларды көрсетілген группаға біріктіру')
+    def merge_into(self, request, queryset):
+        valid, target = get_target_group(self, request)
+        if not valid:
+            return
+        if target is None:
+            self.message_user(request, 'Біріктіретін группаны таңдаңыз', messages.ERROR)
+            return
+        users = notifications = 0
+        with transaction.atomic():
+            for source in queryset.exclude(pk=target.pk):
+                moved_users, moved_notifications = merge_groups(source, target)
+                users += moved_users
+                notifications += moved_notifications
+        self.message_user(
+            request, f'{target.name} группасына {users} пайдаланушы және {notifications} хабарландыру ауыстырылды',
+        )
+
+
+@admin.register(CustomUser)
+class CustomUserAdmin(UserAdmin):
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    list_display = ('username', 'email', 'first_name', 'last_name', 'role', 'group',
+                    'notifications_count', 'date_joined')
+    list_filter = ('role', 'group', 'is_active', 'is_staff')
+    list_select_related = ('group',)
+    autocomplete_fields = ('group',)
+    search_fields = ('username', 'email', 'first_name', 'last_name')
+    readonly_fields = ('notifications_count', 'archived_notifications_count', 'last_login', 'date_joined')
+    fieldsets = UserAdmin.fieldsets + (
+        ('EduNotify', {
+            'fields': ('role', 'group', 'phone', 'digest_frequency',
+                       'notifications_count', 'archived_notifications_count'),
+        }),
+    )
+    add_fieldsets = UserAdmin.add_fieldsets + (
+        ('EduNotify', {'fields': ('email', 'role', 'group')}),
+    )
+    action_form = TargetGroupActionForm
+    actions = ['move_to_group']
+
+    @admin.action(description='Таңдалған пайдаланушыларды группаға ауыстыру')
+    def move_to_group(self, request, queryset):
+        valid, target = get_target_group(self, request)
+        if valid:
+            moved = move_users(queryset, target)
+            name = target.name if target else 'Группасыз'
+            self.message_user(request, f'{name}: {len(moved)} пайдаланушы ауыстырылды')
+
+
+@admin.register(Notification)
+class NotificationAdmin(LargeTableAdmin):
+    list_display = ('title', 'notification_type', 'group', 'status', 'is_important', 'created_by', 'created_at')
+    list_filter = ('status', 'notification_type', 'is_important')
+    list_select_related = ('group', 'created_by')
+    autocomplete_fields = ('group', 'created_by', 'archived_by')
+    search_fields = ('title',)
+    date_hierarchy = 'created_at'
+    readonly_fields = ('created_at', 'updated_at')
+
+
+@admin.register(NotificationArchive)
+class NotificationArchiveAdmin(LargeTableAdmin):
+    list_display = ('notification', 'archived_by', 'archived_at')
+    list_select_related = ('notification', 'archived_by')
+    autocomplete_fields = ('notification', 'archived_by')
+    date_hierarchy = 'archived_at'
+
+
+@admin.register(NotificationView)
+class NotificationViewAdmin(LargeTableAdmin):
+    list_display = ('user', 'notification', 'viewed_at')
+    list_select_related = ('user', 'notification')
+    autocomplete_fields = ('user', 'notification')
+    date_hierarchy = 'viewed_at'
+
+
+@admin.register(WebhookEndpoint)
+class WebhookEndpointAdmin(admin.ModelAdmin):
+    list_display = ('name', 'url', 'group', 'events', 'max_concurrency', 'is_active')
+    list_filter = ('is_active',)
+    search_fields = ('name', 'url')
+
+
+@admin.register(WebhookDeadLetter)
+class WebhookDeadLetterAdmin(LargeTableAdmin):
+    list_display = ('endpoint', 'event', 'attempts', 'last_error', 'failed_at')
+    list_select_related = ('endpoint',)
+    list_filter = ('event',)
+    readonly_fields = ('endpoint', 'event', 'payload', 'attempts', 'last_error', 'created_at', 'failed_at')
+    actions = ['requeue']
+
+    @admin.action(description='Кезекке қайта қою')
+    def requeue(self, request, queryset):
+        self.message_user(request, f'Кезекке қайта қойылды: {requeue_dead(queryset)}')
+
+
+@admin.register(Job)
+class JobAdmin(LargeTableAdmin):
+    list_display = ('name', 'status', 'priority', 'run_at', 'attempts', 'max_attempts', 'locked_by', 'last_error')
+    list_filter = ('status', 'name')
+    readonly_fields = ('attempts', 'locked_by', 'last_error', 'created_at')
+    actions = ['requeue']
+
+    @admin.action(description='Кезекке қайта қою')
+    def requeue(self, request, queryset):
+        self.message_user(request, f'Кезекке қайта қойылды: {requeue_failed(queryset)}')
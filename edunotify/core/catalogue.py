@@ -0,0 +1,103 @@
+"""
+Группалар каталогы: әр процестегі өзгермейтін көшірме.
+
+Группалар тізімі тіркелу, профиль, хабарландыру формасы, пайдаланушыны
+өңдеу беттерінде қажет, ал өзгеруі сирек. Көшірме (id, name, description)
+процесс жадында сақталады және әр қолданыста ортақ кэштегі нұсқа
+кілтімен салыстырылады: кілт бір кэш GET, база сұрауы жоқ. Group
+сақталғанда/жойылғанда нұсқа ауыстырылады (core.signals) - барлық
+процестер келесі сұрауда каталогты қайта жүктейді.
+
+Көшірмедегі Group даналары ортақ: оларды өзгертпеңіз. Басқа өрістерге
+(member_count, т.б.) қатынау әр данаға бөлек сұрау жасайды - ондай
+беттер (manage_groups) Group.objects-ті тікелей қолданады.
+"""
+import copy
+import threading
+import uuid
+
+from django import forms
+from django.core.cache import cache
+from django.db import transaction
+
+from edunotify.db_router import use_primary
+from .models import Group
+
+VERSION_KEY = 'groups:catalogue:version'
+CATALOGUE_FIELDS = ('id', 'name', 'description')
+
+_snapshot = (None, (), {})
+_lock = threading.Lock()
+
+
+def bump_version():
+    """Каталогты барлық процестерде ескірген деп белгілеу"""
+    cache.set(VERSION_KEY, uuid.uuid4().hex, None)
+
+
+def current_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, uuid.uuid4().hex, None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def _load(version):
+    global _snapshot
+    with _lock:
+        if _snapshot[0] != version:
+            # Жаңа нұсқа кілтімен сақталатындықтан кешіккен репликадан оқылмайды
+            with use_primary():
+                groups = tuple(Group.objects.only(*CATALOGUE_FIELDS).order_by('name', 'pk'))
+            _snapshot = (version, groups, {group.pk: group for group in groups})
+    return _snapshot
+
+
+def _current():
+    version = current_version()
+    snapshot = _snapshot
+    if snapshot[0] != version:
+        snapshot = _load(version)
+    return snapshot
+
+
+def group_catalogue():
+    """Барлық группалар (атауы бойынша), өзгермейтін кортеж"""
+    return _current()[1]
+
+
+def get_group(pk):
+    """Группаның көшірмесі немесе None (сақтауға болады)"""
+    try:
+        group = _current()[2].get(int(pk))
+    except (TypeError, ValueError):
+        return None
+    return copy.copy(group) if group is not None else None
+
+
+def invalidate_on_change(using=None):
+    # Бірден: осы процесс өзгерісті бірден көреді. Commit-тен кейін тағы:
+    # арада commit болмаған деректі жүктеген процестер қайта жүктейді
+    bump_version()
+    transaction.on_commit(bump_version, using=using)
+
+
+class GroupChoiceField(forms.ModelChoiceField):
+    """ModelChoiceField, таңдаулары мен тексеруі каталогтан (сұраусыз)"""
+
+    def _get_choices(self):
+        choices = [(group.pk, self.label_from_instance(group)) for group in group_catalogue()]
+        if self.empty_label is not None:
+            choices.insert(0, ('', self.empty_label))
+        return choices
+
+    choices = property(_get_choices, forms.ChoiceField._set_choices)
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        group = get_group(value.pk if isinstance(value, Group) else value)
+        if group is None:
+            raise forms.ValidationError(self.error_messages['invalid_choice'], code='invalid_choice')
+        return group
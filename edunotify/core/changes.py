@@ -0,0 +1,183 @@
+"""
+Клиенттерге арналған өзгерістер ағыны (инкременттік синхрондау).
+
+Хабарландырудың әр құрылуы, өзгеруі, жариялануы, архивтелуі, қалпына
+келуі және жойылуы NotificationChange кестесіне `seq` нөмірімен
+жазылады (core.signals, core.scheduling). Клиент `?since=<курсор>`
+жібереді де, соңғы сапарынан кейін өзгерген хабарландыруларды алады:
+өзіне көрінетіндері `upserts`-те (ағымдағы күйімен), көрінбейтін
+болғандары мен жойылғандары `deletes`-те (тек ID).
+
+Курсор - "<seq>.<уақыт>". Уақыт бойынша клиенттің курсоры
+tombstone-дар сақталатын мерзімнен (CHANGE_FEED_RETENTION_DAYS) ескі
+екені анықталады - ондай клиент толық синхрондауды қайта бастауы керек.
+
+seq аралығы (жоқ нөмір) кері қайтарылған не ықшамдалған жазба болуы
+мүмкін, бірақ әлі commit болмаған транзакция да болуы мүмкін. Ағын негізгі
+базадан оқылады (репликаның кешігуі аралықты ескі етіп көрсетер еді), ал
+PostgreSQL-де аралық алдындағы барлық жазатын транзакциялар аяқталғанша
+аттап өтілмейді (pg_stat_activity; қосымша сол рөлмен қосылуы керек).
+
+Ықшамдау (`compact_changes`) бір хабарландырудың ескі жазбаларын
+жояды (соңғысы жеткілікті) және мерзімі өткен tombstone-дарды тазалайды.
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import connections, router
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from .models import Notification, NotificationChange
+
+
+class CursorError(ValueError):
+    """Курсор дұрыс емес"""
+
+
+class CursorExpired(Exception):
+    """Курсор tombstone-дар сақталатын мерзімнен ескі"""
+
+
+def get_retention():
+    return timedelta(days=getattr(settings, 'CHANGE_FEED_RETENTION_DAYS', 30))
+
+
+def get_settle_time():
+    """Осы уақыттан жас seq аралықтары әлі commit болмаған транзакция болуы мүмкін"""
+    return timedelta(seconds=getattr(settings, 'CHANGE_FEED_SETTLE_SECONDS', 5))
+
+
+def record_change(notification_id, action):
+    NotificationChange.objects.create(notification_id=notification_id, action=action)
+
+
+def record_changes(notification_ids, action):
+    NotificationChange.objects.bulk_create(
+        NotificationChange(notification_id=notification_id, action=action)
+        for notification_id in notification_ids
+    )
+
+
+def make_cursor(seq, issued_at):
+    return f'{seq}.{int(issued_at.timestamp())}'
+
+
+def parse_cursor(cursor):
+    """(seq, берілген уақыты); бос курсор - толық синхрондау"""
+    if not cursor or cursor == '0':
+        return 0, None
+    seq, _, issued = cursor.partition('.')
+    try:
+        return int(seq), datetime.fromtimestamp(int(issued), tz=dt_timezone.utc)
+    except (ValueError, OverflowError, OSError):
+        raise CursorError(cursor)
+
+
+def notification_payload(notification):
+    return {
+        'id': notification.id,
+        'title': notification.title,
+        'excerpt': notification.short_content,
+        'content_html': notification.content_html,
+        'notification_type': notification.notification_type,
+        'group': notification.group_id,
+        'status': notification.status,
+        'is_important': notification.is_important,
+        'created_at': notification.created_at.isoformat(),
+        'updated_at': notification.updated_at.isoformat(),
+    }
+
+
+def oldest_open_write(using):
+    """
+    PostgreSQL: басқа сеанстардағы ең ескі жазатын транзакцияның басталған
+    уақыты (жоқ болса None). Басқа базаларда жазушылар кезекпен жұмыс
+    істейді, сондықтан commit болған жазбаның алдындағы аралық - кері
+    қайтарылған не ықшамдалған нөмір.
+    """
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT min(xact_start) FROM pg_stat_activity '
+            'WHERE datname = current_database() AND backend_xid IS NOT NULL AND pid <> pg_backend_pid()'
+        )
+        return cursor.fetchone()[0]
+
+
+def read_changes(user, cursor, limit=500, now=None):
+    """
+    `cursor`-дан кейінгі өзгерістер пакеті.
+
+    seq аралығында пакет тоқтайды, егер одан кейінгі жазба settle
+    уақытынан жас болса немесе сол жазбадан бұрын басталған жазатын
+    транзакция әлі ашық болса; әйтпесе аралық кері қайтарылған не
+    ықшамдалған деп саналады.
+    """
+    now = now or timezone.now()
+    since, issued_at = parse_cursor(cursor)
+    if issued_at is not None and issued_at < now - get_retention():
+        raise CursorExpired(cursor)
+
+    # Реплика емес: кешігу commit болмаған аралықты ескі етіп көрсетеді
+    using = router.db_for_write(NotificationChange)
+    rows = list(
+        NotificationChange.objects.using(using).filter(seq__gt=since)
+        .order_by('seq')
+        .values_list('seq', 'notification_id', 'action', 'recorded_at')[:limit + 1]
+    )
+    has_more = len(rows) > limit
+    settle_time = get_settle_time()
+    settled_before = now - settle_time
+
+    last_seq = since
+    actions = {}
+    open_since, open_checked = None, False
+    # Курсордан кейінгі жазбалардың ең ертесі осы уақыттан кейін жазылған
+    next_issued_at = settled_before
+    for seq, notification_id, action, recorded_at in rows[:limit]:
+        if seq != last_seq + 1:
+            if not open_checked:
+                open_since, open_checked = oldest_open_write(using), True
+            pending = open_since is not None and open_since <= recorded_at + settle_time
+            if recorded_at > settled_before or pending:
+                has_more = False
+                next_issued_at = min(settled_before, recorded_at, open_since or recorded_at)
+                break
+        last_seq = seq
+        actions.setdefault(notification_id, set()).add(action)
+        # Соңғы өзгеріс ретімен қайтару үшін
+        actions[notification_id] = actions.pop(notification_id)
+    else:
+        if has_more:
+            next_issued_at = min(settled_before, rows[limit][3])
+
+    current = Notification.objects.using(using).select_related('group').in_bulk(list(actions))
+    upserts, deletes = [], []
+    for notification_id, seen in actions.items():
+        notification = current.get(notification_id)
+        if notification is not None and notification.is_accessible_by(user):
+            upserts.append(notification_payload(notification))
+        elif notification is None or seen != {'create'}:
+            # Жаңа құрылған әрі көрінбейтін хабарландыру клиентте болған емес
+            deletes.append(notification_id)
+
+    return {
+        'cursor': make_cursor(last_seq, next_issued_at),
+        'has_more': has_more,
+        'upserts': upserts,
+        'deletes': deletes,
+    }
+
+
+def compact(now=None):
+    """Ескірген жазбаларды жою: {'superseded': n, 'tombstones': n}"""
+    now = now or timezone.now()
+    newer = NotificationChange.objects.filter(notification_id=OuterRef('notification_id'), seq__gt=OuterRef('seq'))
+    superseded, _ = NotificationChange.objects.filter(Exists(newer)).delete()
+    tombstones, _ = NotificationChange.objects.filter(
+        action='delete', recorded_at__lt=now - get_retention()
+    ).delete()
+    return {'superseded': superseded, 'tombstones': tombstones}
@@ -0,0 +1,48 @@
+"""
+Async көріністердегі тәуелсіз ORM сұрауларын орындау.
+
+Django-ның async ORM-і (`acount`, `aiterator`) әр сұрауды бір ортақ
+синхронды ағында кезекпен орындайды. PostgreSQL-де ASYNC_CONCURRENT_QUERIES
+қосулы болса, `gather_queries` әр сұрауды жеке ағында, өз қосылымымен
+қатар орындайды: беттің кідірісі сұраулардың қосындысы емес, ең
+баяуының уақыты болады. Басқа жағдайда (SQLite бір қосылымда жұмыс
+істейді, тесттердің транзакциясын басқа қосылым көрмейді) барлық сұрау
+бір ғана sync_to_async ауысуымен кезекпен орындалады.
+"""
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, close_old_connections, connections
+
+
+def concurrent_queries_enabled():
+    return (
+        getattr(settings, 'ASYNC_CONCURRENT_QUERIES', False)
+        and connections[DEFAULT_DB_ALIAS].vendor == 'postgresql'
+    )
+
+
+def _run_in_own_connection(query):
+    # Пул ағындарында сұрау циклі жоқ: CONN_MAX_AGE-ді өзіміз ескереміз
+    close_old_connections()
+    try:
+        return query()
+    finally:
+        close_old_connections()
+
+
+def _run_all(queries):
+    return {name: query() for name, query in queries.items()}
+
+
+async def gather_queries(**queries):
+    """{атауы: синхронды функция} -> {атауы: нәтиже}"""
+    if not concurrent_queries_enabled():
+        return await sync_to_async(_run_all)(queries)
+
+    results = await asyncio.gather(*(
+        sync_to_async(_run_in_own_connection, thread_sensitive=False)(query)
+        for query in queries.values()
+    ))
+    return dict(zip(queries, results))
@@ -0,0 +1,172 @@
+"""
+Хабарландыру мазмұнын сақтау кезінде HTML-ге айналдыру.
+
+Мазмұн - қарапайым мәтін, оған шектеулі белгілер рұқсат: сілтеме
+(<a href>), тізімдер (<ul>, <ol>, <li>) және мәтін пішімі (<strong>, <b>,
+<em>, <i>, <u>, <code>, <br>). Қалғаны тазаланады: рұқсат етілмеген тег
+алынып, ішіндегі мәтін қалады (<script>, <style> т.б. мәтінімен бірге
+алынады), мәтін толық escape етіледі, сілтемеде тек http(s), mailto және
+сайт ішіндегі жолдарға рұқсат. Бос жолдар абзацқа, жалғыз жаңа жол
+<br>-ге айналады (`linebreaks` сияқты).
+
+Нәтиже (content_html) мен қысқа мәтін (excerpt) Notification.save()-те
+бір рет есептеледі; шаблондар мен API оны қайта өңдемей береді.
+"""
+import re
+from html import escape
+from html.parser import HTMLParser
+
+EXCERPT_LENGTH = 150
+
+INLINE_TAGS = {'a', 'strong', 'b', 'em', 'i', 'u', 'code'}
+LIST_TAGS = {'ul', 'ol'}
+DROP_CONTENT_TAGS = {'script', 'style', 'iframe', 'object', 'embed', 'template', 'textarea', 'select', 'title'}
+ALLOWED_SCHEMES = ('http:', 'https:', 'mailto:')
+LINK_REL = 'nofollow noopener noreferrer'
+
+_paragraph_break = re.compile(r'\n\s*\n')
+_whitespace = re.compile(r'\s+')
+_control = re.compile(r'[\x00-\x20\x7f]+')
+
+
+def safe_href(value):
+    href = _control.sub('', value or '')
+    if href.startswith('//'):
+        return None
+    if href.startswith(('/', '#', '?')) or href.lower().startswith(ALLOWED_SCHEMES):
+        return href
+    # Схемасыз салыстырмалы жол (мысалы, "page.html"), бірақ "javascript:" емес
+    if href and ':' not in href.split('/', 1)[0]:
+        return href
+    return None
+
+
+class _Sanitizer(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.out = []
+        self.text = []
+        self.stack = []  # (тег, ашатын белгі)
+        self.paragraph_open = False
+        self.skip_depth = 0
+
+    # -- көмекшілер --------------------------------------------------
+    def in_list(self):
+        return any(tag in LIST_TAGS for tag, _ in self.stack)
+
+    def inline_stack(self):
+        return [(tag, opening) for tag, opening in self.stack if tag in INLINE_TAGS]
+
+    def open_paragraph(self):
+        if not self.paragraph_open and not self.in_list():
+            self.out.append('<p>')
+            self.out.extend(opening for _, opening in self.inline_stack())
+            self.paragraph_open = True
+
+    def close_paragraph(self):
+        if self.paragraph_open:
+            while self.out and self.out[-1] == '<br>':
+                self.out.pop()
+            self.out.extend(f'</{tag}>' for tag, _ in reversed(self.inline_stack()))
+            self.out.append('</p>')
+            self.paragraph_open = False
+
+    def close_until(self, tag):
+        while self.stack:
+            name, _ = self.stack.pop()
+            self.out.append(f'</{name}>')
+            if name == tag:
+                return
+
+    # -- HTMLParser ---------------------------------------------------
+    def handle_starttag(self, tag, attrs):
+        if tag in DROP_CONTENT_TAGS:
+            self.skip_depth += 1
+            return
+        if self.skip_depth:
+            return
+        if tag in {'br', 'li', 'p', 'div'} | LIST_TAGS:
+            # Қысқа мәтінде блоктар бір-біріне жабыспауы үшін
+            self.text.append(' ')
+        if tag == 'br':
+            self.open_paragraph()
+            self.out.append('<br>')
+        elif tag in INLINE_TAGS:
+            opening = f'<{tag}>'
+            if tag == 'a':
+                href = safe_href(dict(attrs).get('href'))
+                if href is None:
+                    opening = '<a>'
+                else:
+                    opening = f'<a href="{escape(href)}" rel="{LINK_REL}">'
+            self.open_paragraph()
+            self.out.append(opening)
+            self.stack.append((tag, opening))
+        elif tag in LIST_TAGS and not self.inline_stack():
+            self.close_paragraph()
+            self.out.append(f'<{tag}>')
+            self.stack.append((tag, f'<{tag}>'))
+        elif tag == 'li' and self.stack and self.stack[-1][0] in LIST_TAGS | {'li'}:
+            if self.stack[-1][0] == 'li':
+                self.close_until('li')
+            self.out.append('<li>')
+            self.stack.append(('li', '<li>'))
+
+    def handle_startendtag(self, tag, attrs):
+        if tag == 'br':
+            self.handle_starttag(tag, attrs)
+
+    def handle_endtag(self, tag):
+        if tag in DROP_CONTENT_TAGS:
+            self.skip_depth = max(0, self.skip_depth - 1)
+            return
+        if self.skip_depth or tag not in {name for name, _ in self.stack}:
+            return
+        self.close_until(tag)
+
+    def handle_data(self, data):
+        if self.skip_depth:
+            return
+        self.text.append(data)
+        if self.in_list():
+            # <ul>/<ol> ішіндегі бос орындар (жол аралары) HTML-ге кірмейді
+            if data.strip() or self.stack[-1][0] not in LIST_TAGS:
+                self.out.append(escape(_whitespace.sub(' ', data)))
+            return
+        for index, chunk in enumerate(_paragraph_break.split(data)):
+            if index:
+                self.close_paragraph()
+            if not self.paragraph_open:
+                chunk = chunk.lstrip()
+                if not chunk:
+                    continue
+                self.open_paragraph()
+            for number, line in enumerate(chunk.split('\n')):
+                if number:
+                    self.out.append('<br>')
+                if line:
+                    self.out.append(escape(line))
+
+    def result(self):
+        self.close()
+        self.close_paragraph()
+        if not self.in_list():
+            # Тізімнен тыс тек абзац ішіндегі белгілер қалады - олар абзацпен жабылды
+            self.stack.clear()
+        self.close_until(None)
+        return ''.join(self.out), ''.join(self.text)
+
+
+def make_excerpt(text, length=EXCERPT_LENGTH):
+    text = _whitespace.sub(' ', text).strip()
+    if len(text) > length:
+        return text[:length - 3].rstrip() + '...'
+    return text
+
+
+def render_content(content):
+    """(таза HTML, қысқа мәтін)"""
+    sanitizer = _Sanitizer()
+    sanitizer.feed(content or '')
+    html, text = sanitizer.result()
+    return html, make_excerpt(text)
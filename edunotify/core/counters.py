@@ -0,0 +1,40 @@
+"""Сақталған санауыштарды нақты мәндермен салыстыру және түзету"""
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_subquery(model, fk_name):
+    """`model` ішіндегі `fk_name`=OuterRef('pk') жазбаларының саны"""
+    return Coalesce(
+        Subquery(
+            model.objects.order_by()
+            .filter(**{fk_name: OuterRef('pk')})
+            .values(fk_name)
+            .annotate(total=Count('pk'))
+            .values('total'),
+            output_field=IntegerField(),
+        ),
+        0,
+    )
+
+
+def counter_specs(group_model, user_model, notification_model):
+    """(модель, санауыш өрісі, нақты мәнді есептейтін өрнек)"""
+    return [
+        (group_model, 'member_count', count_subquery(user_model, 'group')),
+        (group_model, 'notification_count', count_subquery(notification_model, 'group')),
+        (user_model, 'notifications_count', count_subquery(notification_model, 'created_by')),
+        (user_model, 'archived_notifications_count', count_subquery(notification_model, 'archived_by')),
+    ]
+
+
+def reconcile(group_model, user_model, notification_model):
+    """Сәйкес келмейтін санауыштарды түзету, {өріс: түзетілген жолдар} қайтарады"""
+    fixed = {}
+    for model, field, actual in counter_specs(group_model, user_model, notification_model):
+        fixed[f'{model.__name__}.{field}'] = (
+            model.objects.annotate(actual=actual)
+            .exclude(**{field: F('actual')})
+            .update(**{field: actual})
+        )
+    return fixed
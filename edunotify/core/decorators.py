@@ -1,4 +1,32 @@
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.contrib.auth.decorators import user_passes_test
+from django.contrib.auth.views import redirect_to_login
+from django.shortcuts import resolve_url
 
 def is_admin(user):
     return user.role == 'admin'
+
+
+async def aget_user(request):
+    """request.user-ді ағында жүктеу (сессия/кэш), кейін оны async кодта қолдануға болады"""
+    await sync_to_async(lambda: request.user.is_authenticated)()
+    return request.user
+
+
+def async_user_passes_test(test_func, login_url=None):
+    """user_passes_test-тің async көріністерге арналған нұсқасы (Django 4.2-дегісі тек синхронды)"""
+    def decorator(view_func):
+        @wraps(view_func)
+        async def wrapper(request, *args, **kwargs):
+            user = await aget_user(request)
+            if test_func(user):
+                return await view_func(request, *args, **kwargs)
+            return redirect_to_login(request.get_full_path(), resolve_url(login_url or settings.LOGIN_URL))
+        return wrapper
+    return decorator
+
+
+async_login_required = async_user_passes_test(lambda user: user.is_authenticated)
@@ -0,0 +1,375 @@
+"""
+Хабарландыруларды, оқу белгілерін және пайдаланушыларды CSV/XLSX-ке ағынмен экспорттау.
+
+Жолдар `.values_list().iterator(chunk_size=...)` арқылы бөлік-бөлігімен
+оқылады (PostgreSQL-де server-side cursor), модель объектілері
+құрылмайды және файл жадта жиналмайды: жад кесте өлшеміне тәуелсіз.
+
+XLSX сыртқы кітапханасыз жазылады: zipfile-ға seek жоқ ағын беріледі
+(деректер дескрипторы бар ZIP), жолдар inlineStr ретінде жазылады -
+sharedStrings кестесін жадта ұстау қажет емес.
+"""
+import csv
+import zipfile
+from datetime import datetime, time, timedelta
+from xml.sax.saxutils import escape
+
+from django import forms
+from django.conf import settings
+from django.db import router
+from django.utils import timezone
+
+from .catalogue import GroupChoiceField
+from .models import CustomUser, Group, Notification, NotificationView
+
+FORMATS = ('csv', 'xlsx')
+CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+# Жауапқа жіберілетін бөліктің шамамен өлшемі
+CHUNK_BYTES = 64 * 1024
+# Excel осы таңбалардан басталатын ұяшықты формула деп түсінеді
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def get_chunk_size():
+    return getattr(settings, 'EXPORT_CHUNK_SIZE', 2000)
+
+
+class Export:
+    """Экспорт сипаттамасы: бағандар (тақырып, lookup) және сүзгі өрістері"""
+
+    def __init__(self, model, columns, date_field, group_field, title):
+        self.model = model
+        self.columns = columns
+        self.date_field = date_field
+        self.group_field = group_field
+        self.title = title
+
+    @property
+    def headers(self):
+        return [header for header, _ in self.columns]
+
+    @property
+    def lookups(self):
+        return [lookup for _, lookup in self.columns]
+
+    def choices(self):
+        """{баған индексі: {код: атауы}} - таңдаулы өрістерді атауымен жазу үшін"""
+        displays = {}
+        for index, lookup in enumerate(self.lookups):
+            model = self.model
+            *relations, name = lookup.split('__')
+            for relation in relations:
+                model = model._meta.get_field(relation).related_model
+            field = model._meta.get_field(name)
+            if field.choices:
+                displays[index] = dict(field.flatchoices)
+        return displays
+
+
+EXPORTS = {
+    'notifications': Export(
+        Notification,
+        [
+            ('ID', 'id'),
+            ('Тақырып', 'title'),
+            ('Түрі', 'notification_type'),
+            ('Группа', 'group__name'),
+            ('Күйі', 'status'),
+            ('Маңызды', 'is_important'),
+            ('Авторы', 'created_by__username'),
+            ('Құрылған уақыты', 'created_at'),
+            ('Жариялану уақыты', 'publish_at'),
+            ('Аяқталу уақыты', 'expires_at'),
+            ('Оқығандар саны', 'read_count'),
+            ('Архивтеген', 'archived_by__username'),
+            ('Архивтелген күні', 'archive_date'),
+            ('Архивтеу себебі', 'archive_reason'),
+        ],
+        date_field='created_at',
+        group_field='group',
+        title='Хабарландырулар',
+    ),
+    'views': Export(
+        NotificationView,
+        [
+            ('Хабарландыру ID', 'notification_id'),
+            ('Хабарландыру', 'notification__title'),
+            ('Пайдаланушы', 'user__username'),
+            ('Аты', 'user__first_name'),
+            ('Тегі', 'user__last_name'),
+            ('Группа', 'user__group__name'),
+            ('Қаралған уақыты', 'viewed_at'),
+        ],
+        date_field='viewed_at',
+        group_field='user__group',
+        title='Оқу белгілері',
+    ),
+    'users': Export(
+        CustomUser,
+        [
+            ('ID', 'id'),
+            ('Логин', 'username'),
+            ('Аты', 'first_name'),
+            ('Тегі', 'last_name'),
+            ('Электронды пошта', 'email'),
+            ('Телефон', 'phone'),
+            ('Роль', 'role'),
+            ('Группа', 'group__name'),
+            ('Белсенді', 'is_active'),
+            ('Тіркелген уақыты', 'date_joined'),
+            ('Соңғы кіру', 'last_login'),
+            ('Хабарландырулар саны', 'notifications_count'),
+        ],
+        date_field='date_joined',
+        group_field='group',
+        title='Пайдаланушылар',
+    ),
+}
+
+
+class ExportFilterForm(forms.Form):
+    kind = forms.ChoiceField(
+        choices=[(kind, export.title) for kind, export in EXPORTS.items()], label='Дерек',
+        widget=forms.Select(attrs={'class': 'form-control'}),
+    )
+    file_format = forms.ChoiceField(choices=[(name, name.upper()) for name in FORMATS], initial='csv',
+                                    widget=forms.HiddenInput)
+    date_from = forms.DateField(
+        required=False, label='Басталу күні',
+        widget=forms.DateInput(format='%Y-%m-%d', attrs={'type': 'date', 'class': 'form-control'}),
+    )
+    date_to = forms.DateField(
+        required=False, label='Аяқталу күні',
+        widget=forms.DateInput(format='%Y-%m-%d', attrs={'type': 'date', 'class': 'form-control'}),
+    )
+    group = GroupChoiceField(
+        queryset=Group.objects.all(), required=False, empty_label='Барлық группалар', label='Группа',
+        widget=forms.Select(attrs={'class': 'form-control'}),
+    )
+
+    def clean(self):
+        cleaned_data = super().clean()
+        date_from, date_to = cleaned_data.get('date_from'), cleaned_data.get('date_to')
+        if date_from and date_to and date_from > date_to:
+            raise forms.ValidationError('Басталу күні аяқталу күнінен кейін болмауы керек')
+        return cleaned_data
+
+
+def _local_midnight(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def export_queryset(export, date_from=None, date_to=None, group=None, using=None):
+    """Экспорт жолдарының queryset-і; күндер жергілікті уақыт бойынша, date_to қоса"""
+    # Ағын көрініс қайтқаннан кейін оқылады, ол кезде replica_reads күйі
+    # жоқ: база осы жерде (көрініс ішінде) таңдалып, queryset-ке бекітіледі
+    queryset = export.model._default_manager.using(using or router.db_for_read(export.model))
+    # __date емес, жарты ашық ауқым: күн өрісіндегі индекс болса, сол қолданылады
+    if date_from:
+        queryset = queryset.filter(**{f'{export.date_field}__gte': _local_midnight(date_from)})
+    if date_to:
+        queryset = queryset.filter(**{f'{export.date_field}__lt': _local_midnight(date_to + timedelta(days=1))})
+    if group is not None:
+        queryset = queryset.filter(**{export.group_field: group})
+    return queryset.order_by('pk').values_list(*export.lookups)
+
+
+def iter_rows(export, queryset):
+    """Жолдарды бөліктермен оқу; таңдаулы өрістер атауымен, уақыт жергілікті"""
+    displays = export.choices()
+    for row in queryset.iterator(chunk_size=get_chunk_size()):
+        row = list(row)
+        for index, value in enumerate(row):
+            if isinstance(value, datetime):
+                row[index] = timezone.localtime(value).replace(tzinfo=None, microsecond=0)
+            elif index in displays and value in displays[index]:
+                row[index] = displays[index][value]
+        yield row
+
+
+def _csv_cell(value):
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 'Иә' if value else 'Жоқ'
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+class _Buffer:
+    """Жазылғанды жинап, bytes бөлігі ретінде қайтаратын seek-сіз ағын (csv мен zipfile үшін)"""
+
+    def __init__(self):
+        self.parts = []
+        self.size = 0
+        self.position = 0
+
+    def write(self, data):
+        if isinstance(data, str):
+            data = data.encode()
+        self.parts.append(data)
+        self.size += len(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.parts)
+        self.parts.clear()
+        self.size = 0
+        return data
+
+
+def stream_csv(export, rows):
+    # BOM: Excel UTF-8 файлын кириллицамен дұрыс ашады
+    buffer = _Buffer()
+    writer = csv.writer(buffer)
+    buffer.write('\ufeff')
+    writer.writerow(export.headers)
+    for row in rows:
+        writer.writerow([_csv_cell(value) for value in row])
+        if buffer.size >= CHUNK_BYTES:
+            yield buffer.drain()
+    yield buffer.drain()
+
+
+XLSX_PARTS = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '<Override PartName="/xl/styles.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Target="xl/workbook.xml" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"/>'
+        '</Relationships>'
+    ),
+    'xl/_rels/workbook.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Target="worksheets/sheet1.xml" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet"/>'
+        '<Relationship Id="rId2" Target="styles.xml" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles"/>'
+        '</Relationships>'
+    ),
+    # 0 - әдепкі, 1 - күн мен уақыт, 2 - қалың тақырып
+    'xl/styles.xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+        '<numFmts count="1"><numFmt numFmtId="164" formatCode="yyyy-mm-dd hh:mm:ss"/></numFmts>'
+        '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font>'
+        '<font><b/><sz val="11"/><name val="Calibri"/></font></fonts>'
+        '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+        '<fill><patternFill patternType="gray125"/></fill></fills>'
+        '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+        '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+        '<cellXfs count="3"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+        '<xf numFmtId="164" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+        '<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/></cellXfs>'
+        '</styleSheet>'
+    ),
+}
+SHEET_START = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<sheetViews><sheetView workbookViewId="0"><pane ySplit="1" topLeftCell="A2" state="frozen"/>'
+    '</sheetView></sheetViews><sheetData>'
+)
+SHEET_END = '</sheetData></worksheet>'
+EXCEL_EPOCH = datetime(1899, 12, 30)
+# XML 1.0-де рұқсат етілмеген басқару таңбалары
+ILLEGAL_XML_CHARS = dict.fromkeys(set(range(32)) - {9, 10, 13})
+
+
+def _column_letter(index):
+    letters = ''
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def _xlsx_cell(ref, value, style=0):
+    if value is None or value == '':
+        return ''
+    if isinstance(value, bool):
+        return f'<c r="{ref}" t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float)):
+        return f'<c r="{ref}"><v>{value}</v></c>'
+    if isinstance(value, datetime):
+        serial = (value - EXCEL_EPOCH) / timedelta(days=1)
+        return f'<c r="{ref}" s="1"><v>{serial:.8f}</v></c>'
+    text = escape(str(value).translate(ILLEGAL_XML_CHARS))
+    style = f' s="{style}"' if style else ''
+    return f'<c r="{ref}" t="inlineStr"{style}><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def _xlsx_row(number, letters, values, style=0):
+    cells = ''.join(_xlsx_cell(f'{letter}{number}', value, style) for letter, value in zip(letters, values))
+    return f'<row r="{number}">{cells}</row>'
+
+
+def stream_xlsx(export, rows):
+    buffer = _Buffer()
+    archive = zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED)
+    for name, content in XLSX_PARTS.items():
+        archive.writestr(name, content)
+    archive.writestr('xl/workbook.xml', (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        f'<sheets><sheet name="{escape(export.title[:31])}" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    ))
+    yield buffer.drain()
+
+    letters = [_column_letter(index) for index in range(len(export.columns))]
+    # Өлшемі алдын ала белгісіз: 4 ГБ-тан асуы мүмкін болғандықтан ZIP64
+    with archive.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as sheet:
+        sheet.write(SHEET_START.encode())
+        sheet.write(_xlsx_row(1, letters, export.headers, style=2).encode())
+        for number, row in enumerate(rows, start=2):
+            sheet.write(_xlsx_row(number, letters, row).encode())
+            if buffer.size >= CHUNK_BYTES:
+                yield buffer.drain()
+        sheet.write(SHEET_END.encode())
+    archive.close()
+    yield buffer.drain()
+
+
+WRITERS = {'csv': stream_csv, 'xlsx': stream_xlsx}
+
+
+def stream_export(export, file_format, queryset):
+    """Файл бөліктерінің генераторы (bytes)"""
+    return WRITERS[file_format](export, iter_rows(export, queryset))
+
+
+def export_filename(kind, file_format, date_from=None, date_to=None):
+    parts = [kind]
+    if date_from or date_to:
+        parts.append(f'{date_from or ""}_{date_to or ""}')
+    else:
+        parts.append(timezone.localdate().isoformat())
+    return '-'.join(parts) + f'.{file_format}'
@@ -0,0 +1,208 @@
+"""
+Группалар мен жалпы хабарландырулардың алдын ала жазылған Atom арналары.
+
+Feed оқырмандары бірнеше минут сайын сұрайды; оларды Django мен
+дерекқорға жеткізбеу үшін әр арна FEEDS_ROOT-та статикалық файл
+(және .gz/.br нұсқалары) ретінде сақталады. Файлды веб-сервер (nginx)
+береді, ол жоқ болса - сессия мен дерекқорсыз StaticFeedsMiddleware;
+ETag пен Last-Modified файлдың өзгерген уақытынан алынады.
+
+Хабарландыру өзгергенде (core.signals) тек оған қатысты арналар -
+'general' немесе 'group-<id>', группасы/түрі ауысса ескісі де - commit-тен
+кейін бір рет қайта жазылады. Мазмұны өзгермеген арна қайта жазылмайды,
+сондықтан оның ETag-і де өзгермейді.
+
+Файл атауында SECRET_KEY-ден алынған белгі бар: группа арнасының
+мекенжайын тек сол группаның мүшелері біледі (профиль және тізім
+беттерінде көрсетіледі). SECRET_KEY ауысса, `regenerate_feeds` іске қосыңыз.
+"""
+import logging
+import os
+import threading
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.urls import reverse
+from django.utils.crypto import salted_hmac
+from django.utils.feedgenerator import Atom1Feed
+
+from edunotify.storage import compressed_variants
+from .catalogue import get_group, group_catalogue
+from .models import Notification
+
+logger = logging.getLogger(__name__)
+
+GENERAL = 'general'
+# Бос арнаның <updated> мәні тұрақты болуы керек (әйтпесе әр жазуда ETag өзгереді)
+EMPTY_FEED_UPDATED = datetime(2000, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def feeds_root():
+    return getattr(settings, 'FEEDS_ROOT', None)
+
+
+def feed_key(notification_type, group_id):
+    if notification_type == 'group' and group_id is not None:
+        return f'group-{group_id}'
+    return GENERAL
+
+
+def feed_filename(key):
+    token = salted_hmac('core.feeds', key).hexdigest()[:20]
+    return f'{key}-{token}.xml'
+
+
+def feed_url(key):
+    return getattr(settings, 'FEEDS_URL', '/feeds/') + feed_filename(key)
+
+
+def feeds_for_user(user):
+    """Пайдаланушыға көрінетін арналар: [(атауы, URL)]"""
+    feeds = [('Жалпы хабарландырулар', feed_url(GENERAL))]
+    group = get_group(user.group_id) if user.group_id else None
+    if group is not None:
+        feeds.append((group.name, feed_url(feed_key('group', group.pk))))
+    return feeds
+
+
+class StaticAtomFeed(Atom1Feed):
+    def latest_post_date(self):
+        # Бос арнада Atom1Feed ағымдағы уақытты қояды
+        return super().latest_post_date() if self.items else EMPTY_FEED_UPDATED
+
+
+def build_feed(key):
+    """Арнаның XML мазмұны (bytes); группа жойылған болса None"""
+    site_url = getattr(settings, 'SITE_URL', '')
+    notifications = Notification.objects.filter(status='active')
+    if key == GENERAL:
+        title = 'EduNotify: жалпы хабарландырулар'
+        notifications = notifications.filter(notification_type='general')
+    else:
+        group = get_group(key.split('-', 1)[1])
+        if group is None:
+            return None
+        title = f'EduNotify: {group.name}'
+        notifications = notifications.filter(notification_type='group', group_id=group.pk)
+
+    feed = StaticAtomFeed(
+        title=title,
+        link=site_url + reverse('notifications'),
+        description=title,
+        feed_url=site_url + feed_url(key),
+        feed_guid=f'{site_url}/feeds/{key}',
+        language='kk',
+    )
+    notifications = notifications.only(
+        'id', 'title', 'content_html', 'is_important', 'created_at', 'updated_at',
+    ).order_by('-created_at')[:getattr(settings, 'FEED_ITEMS', 50)]
+    for notification in notifications:
+        link = site_url + reverse('notification_detail', args=[notification.pk])
+        feed.add_item(
+            title=notification.title,
+            link=link,
+            description=notification.content_html,
+            unique_id=link,
+            pubdate=notification.created_at,
+            updateddate=notification.updated_at,
+            categories=['Маңызды'] if notification.is_important else None,
+        )
+    return feed.writeString('utf-8').encode()
+
+
+def _write_atomic(path, data):
+    temporary = f'{path}.tmp{os.getpid()}.{threading.get_ident()}'
+    with open(temporary, 'wb') as file:
+        file.write(data)
+    os.replace(temporary, path)
+
+
+def _remove(path):
+    for candidate in (path, path + '.gz', path + '.br'):
+        try:
+            os.remove(candidate)
+        except FileNotFoundError:
+            pass
+
+
+def write_feed(key):
+    """Арнаны жазу; мазмұны өзгерсе ғана. Файл өзгерді ме?"""
+    root = feeds_root()
+    if not root:
+        return False
+    path = os.path.join(root, feed_filename(key))
+    data = build_feed(key)
+    if data is None:
+        existed = os.path.exists(path)
+        _remove(path)
+        return existed
+    try:
+        with open(path, 'rb') as file:
+            if file.read() == data:
+                return False
+    except FileNotFoundError:
+        os.makedirs(root, exist_ok=True)
+
+    # Сығылған нұсқалар алдымен: негізгі файл ауысқанда олар дайын тұрады
+    variants = dict(compressed_variants(data))
+    for suffix in ('.gz', '.br'):
+        if suffix in variants:
+            _write_atomic(path + suffix, variants[suffix])
+        elif os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    _write_atomic(path, data)
+    return True
+
+
+def all_feed_keys():
+    return [GENERAL] + [feed_key('group', group.pk) for group in group_catalogue()]
+
+
+def regenerate_all(prune=True):
+    """Барлық арнаны жазу; ескі (белгісі ауысқан, группасы жойылған) файлдарды өшіру"""
+    keys = all_feed_keys()
+    changed = sum(write_feed(key) for key in keys)
+    removed = 0
+    root = feeds_root()
+    if prune and root and os.path.isdir(root):
+        current = {feed_filename(key) for key in keys}
+        for name in os.listdir(root):
+            base = name.removesuffix('.gz').removesuffix('.br')
+            if base.endswith('.xml') and base not in current:
+                os.remove(os.path.join(root, name))
+                removed += 1
+    return changed, removed
+
+
+class _FeedUpdate:
+    """Транзакцияның on_commit тізіміндегі жалғыз арна жаңартуы"""
+
+    def __init__(self):
+        self.keys = set()
+        self.done = False
+
+    def __call__(self):
+        self.done = True
+        for key in sorted(self.keys):
+            try:
+                write_feed(key)
+            except Exception:
+                # Арна келесі өзгерісте немесе regenerate_feeds-те түзеледі
+                logger.exception('Арнаны жазу мүмкін болмады: %s', key)
+
+
+def update_on_commit(keys, using=None):
+    """Арналарды транзакция commit болғанда бір рет қайта жазу"""
+    if not keys or not feeds_root():
+        return
+    connection = connections[using or DEFAULT_DB_ALIAS]
+    # Пакеттік жариялау жүздеген хабарландыруды бір транзакцияда өзгертеді:
+    # бар жаңартуға кілттер қосылады. Rollback-те тізімді Django тазалайды
+    for _, callback, *_ in connection.run_on_commit:
+        if isinstance(callback, _FeedUpdate) and not callback.done:
+            callback.keys.update(keys)
+            return
+    update = _FeedUpdate()
+    update.keys.update(keys)
+    transaction.on_commit(update, using=using)
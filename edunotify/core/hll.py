@@ -0,0 +1,71 @@
+"""
+HyperLogLog: бекітілген көлемдегі жуық бірегей санауыш.
+
+2**precision бір байттық регистр (precision=12 үшін 4 КБ) кез келген
+көлемдегі аудиторияның бірегей санын ~1.04/sqrt(2**precision) (≈1.6%)
+қателікпен береді. Қайталанған элемент регистрлерді өзгертпейді, сондықтан
+`add` көп жағдайда ештеңе жазбайды; екі санауыш `merge` арқылы біріктіріледі.
+"""
+import math
+from hashlib import blake2b
+
+DEFAULT_PRECISION = 12
+
+
+def _hash(value):
+    return int.from_bytes(blake2b(str(value).encode(), digest_size=8).digest(), 'big')
+
+
+class HyperLogLog:
+    def __init__(self, precision=DEFAULT_PRECISION, registers=None):
+        self.precision = precision
+        self.size = 1 << precision
+        self.registers = bytearray(registers) if registers else bytearray(self.size)
+        if len(self.registers) != self.size:
+            raise ValueError('Регистрлер саны precision-ға сәйкес емес')
+
+    @classmethod
+    def from_bytes(cls, data, precision=DEFAULT_PRECISION):
+        return cls(precision, data)
+
+    def to_bytes(self):
+        return bytes(self.registers)
+
+    def _position(self, value):
+        hashed = _hash(value)
+        bits = 64 - self.precision
+        index = hashed >> bits
+        rest = hashed & ((1 << bits) - 1)
+        # Қалған биттердегі алғашқы 1-дің орны (бәрі нөл болса bits + 1)
+        rank = bits - rest.bit_length() + 1
+        return index, rank
+
+    def would_change(self, value):
+        index, rank = self._position(value)
+        return rank > self.registers[index]
+
+    def add(self, value):
+        """Элемент қосу; регистр өзгерсе True"""
+        index, rank = self._position(value)
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+            return True
+        return False
+
+    def merge(self, other):
+        if other.precision != self.precision:
+            raise ValueError('Әр түрлі precision')
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+    def count(self):
+        size = self.size
+        alpha = 0.7213 / (1 + 1.079 / size)
+        estimate = alpha * size * size / sum(2.0 ** -register for register in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * size and zeros:
+            # Аз элемент: сызықтық санау дәлірек
+            estimate = size * math.log(size / zeros)
+        return int(round(estimate))
+
+    def __len__(self):
+        return self.count()
@@ -0,0 +1,346 @@
+"""
+Нақты сұраулар бойынша индекс ұсыну (`manage.py advise_indexes`).
+
+Беттер өкілді пайдаланушылар (админ, группасы бар және группасыз
+пайдаланушы) атынан тест клиентімен ашылады, әр SELECT ұсталып, оның
+жоспары EXPLAIN-мен алынады (PostgreSQL: FORMAT JSON, SQLite: QUERY
+PLAN). Кестені толық оқу (seq scan) немесе бөлек сұрыптау (sort) бар
+сұраулардың пішіні SQL-ден алынады - теңдік сүзгілері, ORDER BY және
+ауқым сүзгісі - және одан композиттік индекс ұсынылады. Мәні тұрақты
+choices/boolean сүзгісі (status='active') индекс кілтіне емес, partial
+индекстің шартына (condition) айналады. Бар индекс сұрауды қамтыса,
+ұсыныс жасалмайды.
+
+Жоспар деректер көлеміне тәуелді: кіші кестеде PostgreSQL индексті
+қолданбауы мүмкін, сондықтан командан production көлеміндегі дерекпен
+іске қосқан жөн.
+"""
+import json
+import re
+from dataclasses import dataclass, field
+
+from django.apps import apps
+from django.db import models
+from django.db.backends.utils import names_digest, split_identifier
+
+CLAUSES = (' WHERE ', ' GROUP BY ', ' HAVING ', ' ORDER BY ', ' LIMIT ', ' OFFSET ')
+PREDICATE = re.compile(r'^"(\w+)"\."(\w+)" (=|<|<=|>|>=|IN|IS) (.+)$', re.S)
+ORDER_ITEM = re.compile(r'^"(\w+)"\."(\w+)"(?: (ASC|DESC))?')
+SQLITE_STEP = re.compile(
+    r'^(SCAN|SEARCH)(?: TABLE)? (\w+)(?: AS \w+)?(?: USING (?:(AUTOMATIC) )?(?:COVERING )?(?:INDEX (\w+)|INTEGER PRIMARY KEY))?'
+)
+PARTITION_SUFFIX = re.compile(r'_(p\d{4}_\d{2}|default)$')
+PG_INDEX_NODES = {'Index Scan', 'Index Only Scan', 'Bitmap Index Scan'}
+PG_SORT_NODES = {'Sort', 'Incremental Sort'}
+
+
+@dataclass
+class Plan:
+    seq_scans: set = field(default_factory=set)
+    indexes: set = field(default_factory=set)
+    sort: bool = False
+
+
+@dataclass
+class Shape:
+    """Сұраудың негізгі кестесі бойынша пішіні (өріс атаулары)"""
+    model: type
+    equal: dict
+    order: list
+    range: list
+
+    def condition_fields(self):
+        """Мәні тұрақты choices/boolean сүзгілері - partial индекс шарты"""
+        return {
+            name: value for name, value in self.equal.items()
+            if value is not None and (self.model._meta.get_field(name).choices
+                                      or isinstance(self.model._meta.get_field(name), models.BooleanField))
+        }
+
+
+def _scan(text, separators):
+    """Жақшадан және тырнақшадан тыс бөлгіштердің орындары"""
+    depth, quoted, positions = 0, False, []
+    for index, char in enumerate(text):
+        if char == "'":
+            quoted = not quoted
+        elif not quoted:
+            if char == '(':
+                depth += 1
+            elif char == ')':
+                depth -= 1
+            elif depth == 0:
+                for separator in separators:
+                    if text.startswith(separator, index):
+                        positions.append((index, separator))
+    return positions
+
+
+def _split(text, separator):
+    parts, start = [], 0
+    for index, _ in _scan(text, [separator]):
+        parts.append(text[start:index])
+        start = index + len(separator)
+    parts.append(text[start:])
+    return [part.strip() for part in parts]
+
+
+def _closing(text):
+    """text[0] '(' жақшасының жабылатын орны"""
+    depth, quoted = 0, False
+    for index, char in enumerate(text):
+        if char == "'":
+            quoted = not quoted
+        elif not quoted:
+            depth += (char == '(') - (char == ')')
+            if depth == 0:
+                return index
+    return -1
+
+
+def _unwrap(text):
+    """Бүкіл өрнекті қоршаған жақшаларды алу: (a AND (b)) -> a AND (b)"""
+    while text.startswith('(') and _closing(text) == len(text) - 1:
+        text = text[1:-1].strip()
+    return text
+
+
+def _clauses(sql):
+    """{'FROM': ..., 'WHERE': ..., 'ORDER BY': ...} жоғарғы деңгейдегі бөліктер"""
+    positions = sorted(_scan(sql, CLAUSES + (' FROM ',)))
+    result = {}
+    for number, (index, keyword) in enumerate(positions):
+        end = positions[number + 1][0] if number + 1 < len(positions) else len(sql)
+        result.setdefault(keyword.strip(), sql[index + len(keyword):end].strip())
+    return result
+
+
+def _literal(value):
+    value = value.strip()
+    if value.startswith("'") and value.endswith("'"):
+        return value[1:-1].replace("''", "'")
+    lowered = value.split('::')[0].lower()
+    if lowered in {'true', 'false'}:
+        return lowered == 'true'
+    try:
+        return int(lowered)
+    except ValueError:
+        return None
+
+
+def table_models():
+    return {model._meta.db_table: model for model in apps.get_models() if not model._meta.proxy}
+
+
+def query_shape(sql, models_by_table=None):
+    """SQL-ден (модель, теңдік, сұрыптау, ауқым) пішінін алу; жоба моделі болмаса None"""
+    models_by_table = models_by_table or table_models()
+    clauses = _clauses(sql)
+    match = re.match(r'"(\w+)"', clauses.get('FROM', ''))
+    model = match and models_by_table.get(match.group(1))
+    if model is None or model._meta.app_config.name.startswith('django.'):
+        return None
+    table = model._meta.db_table
+    columns = {item.column: item for item in model._meta.concrete_fields}
+
+    equal, ranges = {}, []
+    for part in _split(_unwrap(clauses.get('WHERE', '')), ' AND ') if clauses.get('WHERE') else []:
+        part = _unwrap(part)
+        if _scan(part, [' OR ']):
+            continue
+        predicate = PREDICATE.match(part)
+        if not predicate or predicate.group(1) != table or predicate.group(2) not in columns:
+            continue
+        name, operator, value = columns[predicate.group(2)].name, predicate.group(3), predicate.group(4)
+        if operator == '=':
+            literal = _literal(value)
+            if isinstance(columns[predicate.group(2)], models.BooleanField) and isinstance(literal, int):
+                literal = bool(literal)
+            equal[name] = literal
+        elif operator == 'IN':
+            equal[name] = None
+        elif operator != 'IS' and name not in ranges:
+            ranges.append(name)
+
+    order = []
+    for item in _split(clauses.get('ORDER BY', ''), ',') if clauses.get('ORDER BY') else []:
+        match = ORDER_ITEM.match(item)
+        if not match or match.group(1) != table or match.group(2) not in columns:
+            # Басқа кестенің/өрнектің сұрыптауы: бұл кестенің индексі көмектеспейді
+            order = []
+            break
+        name = columns[match.group(2)].name
+        order.append(f'-{name}' if match.group(3) == 'DESC' else name)
+    return Shape(model, equal, order, [name for name in ranges if name not in equal])
+
+
+def _parent_table(name):
+    return PARTITION_SUFFIX.sub('', name)
+
+
+def _walk(node, plan):
+    node_type = node.get('Node Type')
+    if node_type == 'Seq Scan':
+        plan.seq_scans.add(_parent_table(node['Relation Name']))
+    elif node_type in PG_INDEX_NODES:
+        plan.indexes.add(node['Index Name'])
+    elif node_type in PG_SORT_NODES:
+        plan.sort = True
+    for child in node.get('Plans', ()):
+        _walk(child, plan)
+
+
+def explain(connection, sql):
+    plan = Plan()
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}')
+            document = cursor.fetchone()[0]
+            if isinstance(document, str):
+                document = json.loads(document)
+            _walk(document[0]['Plan'], plan)
+        else:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            for row in cursor.fetchall():
+                detail = row[-1]
+                if detail.startswith('USE TEMP B-TREE FOR') and 'ORDER BY' in detail:
+                    plan.sort = True
+                step = SQLITE_STEP.match(detail)
+                if not step:
+                    continue
+                operation, table, automatic, index = step.groups()
+                if index and not automatic:
+                    plan.indexes.add(index)
+                elif operation == 'SCAN' or automatic:
+                    plan.seq_scans.add(table)
+    return plan
+
+
+def existing_indexes(model):
+    """[(атауы, өрістері ('-' кемуі), шарты)], бастапқы кілт пен FK индекстерін қоса"""
+    opts = model._meta
+    result = [('pk', (opts.pk.name,), None)]
+    for item in opts.concrete_fields:
+        if item.db_index or item.unique:
+            result.append((item.name, (item.name,), None))
+    for index in opts.indexes:
+        if index.fields:
+            fields = tuple(f'-{name}' if order else name for name, order in index.fields_orders)
+            result.append((index.name, fields, index.condition))
+    for constraint in opts.constraints:
+        if isinstance(constraint, models.UniqueConstraint) and constraint.fields:
+            result.append((constraint.name, tuple(constraint.fields), constraint.condition))
+    for fields in opts.unique_together:
+        result.append(('unique_together', tuple(fields), None))
+    return result
+
+
+def _reverse(order):
+    return [name[1:] if name.startswith('-') else f'-{name}' for name in order]
+
+
+def covers(fields, condition, shape):
+    """Индекс сұрауды сүзуді де, сұрыптауды да қамти ма?"""
+    needed = set(shape.equal)
+    if condition is not None:
+        if condition != _condition(shape):
+            return False
+        needed -= set(shape.condition_fields())
+    names = [name.lstrip('-') for name in fields]
+    if set(names[:len(needed)]) != needed:
+        return False
+    rest = list(fields[len(needed):])
+    if shape.order:
+        head = rest[:len(shape.order)]
+        return head == shape.order or head == _reverse(shape.order)
+    if shape.range:
+        return bool(rest) and rest[0].lstrip('-') == shape.range[0]
+    return bool(needed)
+
+
+def _condition(shape):
+    conditions = shape.condition_fields()
+    return models.Q(**dict(sorted(conditions.items()))) if conditions else None
+
+
+def index_name(model, fields, condition):
+    """Index.set_name_with_model() пішімі, хешке шарт та кіреді"""
+    _, table = split_identifier(model._meta.db_table)
+    columns = [model._meta.get_field(name.lstrip('-')).column for name in fields]
+    ordered = [f'-{column}' if name.startswith('-') else column for name, column in zip(fields, columns)]
+    digest = names_digest(table, *ordered, repr(condition), 'idx', length=6)
+    return f'{table[:11]}_{columns[0][:7]}_{digest}_idx'
+
+
+def propose(shape):
+    """Сұрауға арналған индекс (models.Index) немесе None"""
+    conditions = shape.condition_fields()
+    condition = _condition(shape)
+    keys = [name for name in shape.equal if name not in conditions]
+    if shape.order:
+        keys += shape.order
+    elif shape.range:
+        keys.append(shape.range[0])
+    if not keys or (not shape.order and not shape.range and condition is None):
+        return None
+    if any(covers(fields, existing, shape) for _, fields, existing in existing_indexes(shape.model)):
+        return None
+    return models.Index(fields=keys, condition=condition, name=index_name(shape.model, keys, condition))
+
+
+@dataclass
+class Finding:
+    label: str
+    sql: str
+    plan: Plan
+    shape: Shape = None
+    index: models.Index = None
+
+    @property
+    def flagged(self):
+        table = self.shape.model._meta.db_table if self.shape else None
+        return table in self.plan.seq_scans or (self.plan.sort and bool(self.shape and self.shape.order))
+
+
+def analyse(connection, captured):
+    """captured: [(бет, sql)] -> (findings, ұсынылған индекстер {(модель, атауы): (индекс, беттер)})"""
+    models_by_table = table_models()
+    findings, proposals = [], {}
+    for label, sql in captured:
+        if not sql.lstrip().upper().startswith('SELECT'):
+            continue
+        finding = Finding(label, sql, explain(connection, sql), query_shape(sql, models_by_table))
+        if finding.flagged:
+            finding.index = propose(finding.shape)
+            if finding.index is not None:
+                key = (finding.shape.model, finding.index.name)
+                proposals.setdefault(key, (finding.index, set()))[1].add(label)
+        findings.append(finding)
+    return findings, proposals
+
+
+def unused_indexes(findings, connection):
+    """
+    Жоба модельдерінің Meta.indexes-і ішінен ешбір жоспарда кездеспегендері
+    және (PostgreSQL) статистика бойынша бірде-бір рет қолданылмағандары.
+    """
+    used = set().union(*(finding.plan.indexes for finding in findings)) if findings else set()
+    declared = {
+        index.name: model for model in table_models().values()
+        if not model._meta.app_config.name.startswith('django.')
+        for index in model._meta.indexes
+    }
+    never_planned = sorted(name for name in declared if name not in used)
+    never_scanned = []
+    if connection.vendor == 'postgresql':
+        tables = [model._meta.db_table for model in set(declared.values())]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT s.indexrelname FROM pg_stat_user_indexes s '
+                'JOIN pg_index i ON i.indexrelid = s.indexrelid '
+                'WHERE s.idx_scan = 0 AND NOT i.indisunique AND NOT i.indisprimary AND s.relname = ANY(%s) '
+                'ORDER BY s.indexrelname',
+                [tables],
+            )
+            never_scanned = [row[0] for row in cursor.fetchall()]
+    return never_planned, never_scanned
@@ -0,0 +1,337 @@
+"""
+Дерекқордағы фондық тапсырмалар кезегі (бөлек брокерсіз).
+
+Тапсырма функциясы `@job` декораторымен тіркеледі де, `.delay(**kwargs)`
+арқылы кезекке қойылады: Job жолы ағымдағы транзакцияда жазылады, сондықтан
+worker оны тек commit-тен кейін көреді (rollback болса - тапсырма да жоқ).
+Аргументтер JSON-ға сериализацияланатын болуы керек.
+
+`run_jobs` worker-лері тапсырмаларды бумамен алады:
+PostgreSQL-де SELECT ... FOR UPDATE SKIP LOCKED (worker-лер бір-бірін
+күтпейді), SQLite-та - бір UPDATE ... WHERE id IN (SELECT ... LIMIT n),
+ол жазу құлпының астында атомарлы орындалады. Алынған тапсырманың run_at-і
+көріну уақытына (timeout) жылжиды: worker құласа, тапсырма сол уақыттан
+кейін басқа worker-ге көрінеді. Сондықтан тапсырма кемінде бір рет
+орындалады - функциялар қайталауға төзімді болуы керек.
+
+Сәтсіз тапсырма кідіріспен (exponential backoff + jitter) қайталанады,
+max_attempts-тен кейін 'failed' күйінде қалады (админде қайта қоюға болады).
+Әрекет алынған кезде саналады: worker құлаған не көріну уақытынан ұзақ
+орындалған әрекет те шекке кіреді.
+"""
+import logging
+import multiprocessing
+import os
+import random
+import signal
+import socket
+import uuid
+from datetime import timedelta
+from importlib import import_module
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, close_old_connections, connections, router, transaction
+from django.db.models import F, Min, Subquery
+from django.utils import timezone
+
+from . import wakeup
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+JOBS_CHANNEL = 'edunotify_jobs'
+LEASE_EXPIRED_ERROR = 'Көріну уақыты өтті: worker тапсырманы аяқтамады'
+
+_registry = {}
+
+
+class PermanentJobError(Exception):
+    """Қайталаудың мәні жоқ қате: тапсырма бірден 'failed' болады"""
+
+
+def get_batch_size():
+    return getattr(settings, 'JOB_BATCH_SIZE', 20)
+
+
+def get_default_timeout():
+    return getattr(settings, 'JOB_VISIBILITY_TIMEOUT', 300)
+
+
+def get_max_attempts():
+    return getattr(settings, 'JOB_MAX_ATTEMPTS', 5)
+
+
+def get_poll_seconds():
+    return getattr(settings, 'JOB_POLL_SECONDS', 5)
+
+
+def retry_delay(attempts):
+    """Қайталау кідірісі (с): exponential backoff, equal jitter"""
+    base = getattr(settings, 'JOB_RETRY_BASE', 10)
+    ceiling = getattr(settings, 'JOB_RETRY_MAX', 3600)
+    delay = min(ceiling, base * 2 ** (attempts - 1))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+class JobSpec:
+    """Тіркелген тапсырма: функцияның өзін шақыруға да болады"""
+
+    def __init__(self, func, name, priority, max_attempts, timeout):
+        self.func = func
+        self.name = name
+        self.priority = priority
+        self.max_attempts = max_attempts
+        self.timeout = timeout
+        self.__doc__ = func.__doc__
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def delay(self, **kwargs):
+        return enqueue(self.name, kwargs)
+
+    def schedule(self, run_at, priority=None, **kwargs):
+        return enqueue(self.name, kwargs, run_at=run_at, priority=priority)
+
+
+def job(name=None, priority=0, max_attempts=None, timeout=None):
+    """
+    Функцияны тапсырма ретінде тіркеу. Атауы әдепкіде 'модуль.функция':
+    worker тапсырманы атауындағы модульді импорттап табады.
+    """
+    def decorator(func):
+        spec = JobSpec(func, name or f'{func.__module__}.{func.__qualname__}', priority, max_attempts, timeout)
+        _registry[spec.name] = spec
+        return spec
+    return decorator
+
+
+def get_spec(name):
+    """Атау бойынша тапсырма; модулі әлі импортталмаған болса импорттайды"""
+    if name not in _registry:
+        module, _, _ = name.rpartition('.')
+        try:
+            import_module(module)
+        except ImportError:
+            return None
+    return _registry.get(name)
+
+
+def _build(name, payload=None, run_at=None, priority=None):
+    spec = get_spec(name)
+    if spec is None:
+        raise LookupError(f'Тапсырма тіркелмеген: {name}')
+    return Job(
+        name=name,
+        payload=payload or {},
+        priority=spec.priority if priority is None else priority,
+        run_at=run_at or timezone.now(),
+        max_attempts=spec.max_attempts or get_max_attempts(),
+        timeout=spec.timeout or get_default_timeout(),
+    )
+
+
+def enqueue(name, payload=None, run_at=None, priority=None, using=None):
+    """Тапсырманы кезекке қою (ағымдағы транзакцияның ішінде)"""
+    queued = _build(name, payload, run_at, priority)
+    queued.save(using=using)
+    notify_workers(using or DEFAULT_DB_ALIAS)
+    return queued
+
+
+def enqueue_many(name, payloads, run_at=None, priority=None, using=None):
+    """Бір тапсырманы көп аргументпен кезекке қою (bulk_create)"""
+    jobs = Job.objects.using(using or DEFAULT_DB_ALIAS).bulk_create(
+        (_build(name, payload, run_at, priority) for payload in payloads), batch_size=1000,
+    )
+    notify_workers(using or DEFAULT_DB_ALIAS)
+    return jobs
+
+
+def notify_workers(using=DEFAULT_DB_ALIAS):
+    """Worker-лерді ояту (core.wakeup)"""
+    wakeup.notify(JOBS_CHANNEL, using)
+
+
+def listen_for_jobs(using=DEFAULT_DB_ALIAS):
+    wakeup.listen(JOBS_CHANNEL, using)
+
+
+def wait_for_jobs(timeout, using=DEFAULT_DB_ALIAS):
+    wakeup.wait(JOBS_CHANNEL, timeout, using)
+
+
+def worker_id():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def _due(now):
+    return Job.objects.filter(status='queued', run_at__lte=now).order_by('-priority', 'run_at', 'pk')
+
+
+def claim(batch_size=None, now=None, worker=None):
+    """
+    Уақыты келген тапсырмаларды басымдық бойынша алу. Алынғандардың
+    run_at-і көріну уақытына жылжиды, locked_by - осы бумаға бірегей белгі.
+    Көріну уақыты бүкіл бумаға ортақ: batch_size * тапсырма ұзақтығы одан аз болсын.
+    """
+    batch_size = batch_size or get_batch_size()
+    now = now or timezone.now()
+    token = f'{(worker or worker_id())[:80]}:{uuid.uuid4().hex[:8]}'
+    lease = {
+        'locked_by': token,
+        'attempts': F('attempts') + 1,
+        'run_at': now + timedelta(seconds=get_default_timeout()),
+    }
+    using = router.db_for_write(Job)
+    connection = connections[using]
+    with transaction.atomic(using=using):
+        # Әрекеттері біткен, бірақ көріну уақыты өтіп қайта көрінген тапсырма
+        # (worker құлаған не timeout-тан ұзақ орындалған) қайта алынбайды
+        _due(now).filter(attempts__gte=F('max_attempts')).update(
+            status='failed', last_error=LEASE_EXPIRED_ERROR, locked_by='',
+        )
+        due = _due(now).filter(attempts__lt=F('max_attempts'))
+        if connection.features.has_select_for_update_skip_locked:
+            ids = list(due.select_for_update(skip_locked=True).values_list('pk', flat=True)[:batch_size])
+            if not ids:
+                return []
+            Job.objects.filter(pk__in=ids).update(**lease)
+        elif not Job.objects.filter(pk__in=Subquery(due.values('pk')[:batch_size])).update(**lease):
+            return []
+        jobs = list(Job.objects.filter(locked_by=token).order_by('-priority', 'run_at', 'pk'))
+        # Өз timeout-ы бар тапсырмалардың көріну уақытын түзету
+        adjusted = [queued for queued in jobs if queued.timeout != get_default_timeout()]
+        for queued in adjusted:
+            queued.run_at = now + timedelta(seconds=queued.timeout)
+        Job.objects.bulk_update(adjusted, ['run_at'])
+    return jobs
+
+
+def execute(queued):
+    """Тапсырманы орындау: (тапсырма, қате мәтіні немесе None, қайталау керек пе)"""
+    spec = get_spec(queued.name)
+    if spec is None:
+        return queued, f'Тапсырма тіркелмеген: {queued.name}', False
+    try:
+        spec.func(**queued.payload)
+    except Exception as exc:
+        logger.exception('Тапсырма сәтсіз: %s #%s', queued.name, queued.pk)
+        return queued, f'{type(exc).__name__}: {exc}', not isinstance(exc, PermanentJobError)
+    return queued, None, False
+
+
+def record_results(results, now=None):
+    """
+    Орындалғандарды жою, сәтсіздерін кейінге қалдыру немесе 'failed' ету.
+    Көріну уақыты өтіп, басқа worker алған тапсырмаға (locked_by өзгерген) тиіспейміз.
+    """
+    now = now or timezone.now()
+    done = {}
+    failed = retried = 0
+    for queued, error, retry in results:
+        if error is None:
+            done.setdefault(queued.locked_by, []).append(queued.pk)
+            continue
+        mine = Job.objects.filter(pk=queued.pk, locked_by=queued.locked_by)
+        if retry and queued.attempts < queued.max_attempts:
+            retried += mine.update(
+                run_at=now + timedelta(seconds=retry_delay(queued.attempts)), last_error=error, locked_by='',
+            )
+        else:
+            failed += mine.update(status='failed', last_error=error, locked_by='')
+    completed = 0
+    for token, ids in done.items():
+        completed += Job.objects.filter(pk__in=ids, locked_by=token).delete()[0]
+    return {'done': completed, 'retried': retried, 'failed': failed}
+
+
+def run_batch(batch_size=None, worker=None):
+    """Бір буманы алып, орындап, нәтижесін жазу"""
+    jobs = claim(batch_size, worker=worker)
+    if not jobs:
+        return {'claimed': 0, 'done': 0, 'retried': 0, 'failed': 0}
+    result = record_results([execute(queued) for queued in jobs])
+    result['claimed'] = len(jobs)
+    return result
+
+
+def next_run_time():
+    return Job.objects.filter(status='queued').aggregate(next_at=Min('run_at'))['next_at']
+
+
+def requeue_failed(queryset=None):
+    """Сәтсіз тапсырмаларды қайта кезекке қою"""
+    queryset = Job.objects.all() if queryset is None else queryset
+    return queryset.filter(status='failed').update(
+        status='queued', attempts=0, run_at=timezone.now(), locked_by='',
+    )
+
+
+def work(batch_size=None, once=False, should_stop=None, on_batch=None):
+    """
+    Worker циклі. `once` - уақыты келген тапсырмалар біткенде шығу.
+    Өңделген тапсырмалар санын қайтарады.
+    """
+    should_stop = should_stop or (lambda: False)
+    worker = worker_id()
+    processed = 0
+    while not should_stop():
+        close_old_connections()
+        # Қосылым жабылған болса, LISTEN жаңа қосылымда қайталанады (буманы алудан бұрын)
+        listen_for_jobs()
+        result = run_batch(batch_size, worker=worker)
+        processed += result['claimed']
+        if result['claimed']:
+            if on_batch:
+                on_batch(result)
+            continue
+        if once:
+            break
+        next_at = next_run_time()
+        delay = get_poll_seconds() if next_at is None else (next_at - timezone.now()).total_seconds()
+        wait_for_jobs(min(max(delay, 0.05), get_poll_seconds()))
+    return processed
+
+
+def _process_main(stop, counter, batch_size, once):
+    """Пулдағы бір процесс: өз қосылымымен жеке worker"""
+    import django
+    django.setup()
+    # Ctrl+C бүкіл процесс тобына келеді: ағымдағы буманы аяқтап шығамыз
+    signal.signal(signal.SIGINT, lambda *args: stop.set())
+    signal.signal(signal.SIGTERM, lambda *args: stop.set())
+    processed = work(batch_size, once, should_stop=stop.is_set)
+    with counter.get_lock():
+        counter.value += processed
+    connections.close_all()
+
+
+def run_pool(processes, batch_size=None, once=False):
+    """
+    `processes` жеке worker процесін іске қосу (0 - барлық ядро). Процестер
+    бір-бірімен SKIP LOCKED арқылы ғана үйлеседі. Өңделгендер саны.
+    """
+    processes = processes or os.cpu_count() or 1
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context('fork' if 'fork' in methods else 'spawn')
+    stop, counter = context.Event(), context.Value('q', 0)
+    # Ата-процестің қосылымы балаларға өтпеуі керек
+    connections.close_all()
+    children = [
+        context.Process(target=_process_main, args=(stop, counter, batch_size, once), name=f'jobs-{number}')
+        for number in range(processes)
+    ]
+    previous = signal.signal(signal.SIGTERM, lambda *args: stop.set())
+    try:
+        for child in children:
+            child.start()
+        for child in children:
+            while child.is_alive():
+                try:
+                    child.join()
+                except KeyboardInterrupt:
+                    stop.set()
+    finally:
+        signal.signal(signal.SIGTERM, previous)
+    return counter.value
@@ -0,0 +1,140 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.migrations import AddIndex, Migration
+from django.db.migrations.autodetector import MigrationAutodetector
+from django.db.migrations.loader import MigrationLoader
+from django.db.migrations.writer import MigrationWriter
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.index_advisor import analyse, unused_indexes
+from core.models import CustomUser, Notification
+
+# (URL атауы, query string); 'notification' - хабарландыру ID-і керек беттер
+PAGES = [
+    ('home', None, ''),
+    ('notifications', None, 'status=active'),
+    ('notifications', None, 'status=archived'),
+    ('notification_archive', None, ''),
+    ('notification_detail', 'notification', ''),
+    ('notification_changes', None, ''),
+    ('profile', None, ''),
+]
+ADMIN_PAGES = [
+    ('notifications', None, 'status=all'),
+    ('admin_dashboard', None, ''),
+    ('manage_groups', None, ''),
+    ('user_management', None, ''),
+    ('least_read_notifications', None, ''),
+    ('edit_notification', 'notification', ''),
+]
+
+
+class Command(BaseCommand):
+    help = ('Беттерді өкілді пайдаланушылар атынан ашып, сұраулардың EXPLAIN жоспарын талдау: '
+            'seq scan мен сұрыптауды көрсету, индекс ұсыну және қолданылмайтын индекстерді табу')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', action='append', dest='users', default=[],
+                            help='Осы пайдаланушы атынан ашу (бірнеше рет беруге болады)')
+        parser.add_argument('--write', action='store_true', help='Ұсынылған индекстердің миграциясын жазу')
+
+    def handle(self, *args, **options):
+        users = self.get_users(options['users'])
+        if not users:
+            raise CommandError('Пайдаланушылар жоқ: --user беріңіз немесе дерек жүктеңіз')
+
+        captured = []
+        for user in users:
+            captured.extend(self.replay(user))
+        findings, proposals = analyse(connection, captured)
+
+        flagged = [finding for finding in findings if finding.flagged]
+        self.stdout.write(f'{len(findings)} SELECT талданды, {len(flagged)} сұрауда seq scan немесе сұрыптау бар')
+        for finding in flagged:
+            problems = [f'SEQ SCAN {table}' for table in sorted(finding.plan.seq_scans)]
+            if finding.plan.sort:
+                problems.append('SORT')
+            self.stdout.write(f'  [{finding.label}] {", ".join(problems)}')
+            if options['verbosity'] > 1:
+                self.stdout.write(f'    {finding.sql}')
+
+        self.stdout.write('')
+        if proposals:
+            self.stdout.write(self.style.WARNING('Ұсынылған индекстер (Meta.indexes-ке қосыңыз):'))
+            for (model, _), (index, labels) in proposals.items():
+                self.stdout.write(f'  {model.__name__}: {self.describe(index)}')
+                self.stdout.write(f'    беттер: {", ".join(sorted(labels))}')
+        else:
+            self.stdout.write(self.style.SUCCESS('Жаңа индекс қажет емес'))
+
+        never_planned, never_scanned = unused_indexes(findings, connection)
+        if never_planned:
+            self.stdout.write('Ешбір жоспарда қолданылмаған Meta.indexes: ' + ', '.join(never_planned))
+        if never_scanned:
+            self.stdout.write('pg_stat_user_indexes бойынша ешқашан оқылмаған: ' + ', '.join(never_scanned))
+
+        if options['write'] and proposals:
+            for path in self.write_migrations(proposals):
+                self.stdout.write(self.style.SUCCESS(f'Миграция жазылды: {path}'))
+
+    def get_users(self, usernames):
+        if usernames:
+            users = list(CustomUser.objects.filter(username__in=usernames))
+            missing = set(usernames) - {user.username for user in users}
+            if missing:
+                raise CommandError(f'Пайдаланушы табылмады: {", ".join(sorted(missing))}')
+            return users
+        active = CustomUser.objects.filter(is_active=True).order_by('pk')
+        candidates = [
+            active.filter(role='admin').first(),
+            active.filter(role='user', group__isnull=False).first(),
+            active.filter(role='user', group__isnull=True).first(),
+        ]
+        return [user for user in candidates if user is not None]
+
+    def replay(self, user):
+        """[(бет, sql)]: беттер транзакция ішінде ашылады, өзгерістер кері қайтарылады"""
+        notification = Notification.objects.filter(status='active').order_by('-created_at').first()
+        pages = PAGES + (ADMIN_PAGES if user.is_admin else [])
+        client = Client()
+        client.force_login(user)
+        captured = []
+        with override_settings(ALLOWED_HOSTS=['testserver'], REPLICA_DATABASES=[]):
+            for name, argument, query in pages:
+                if argument == 'notification' and notification is None:
+                    continue
+                kwargs = {'notification_id': notification.pk} if argument else {}
+                url = reverse(name, kwargs=kwargs) + (f'?{query}' if query else '')
+                label = f'{user.role}:{url}'
+                with transaction.atomic(), CaptureQueriesContext(connection) as queries:
+                    client.get(url)
+                    transaction.set_rollback(True)
+                captured.extend((label, query['sql']) for query in queries.captured_queries)
+        return captured
+
+    def describe(self, index):
+        condition = f', condition=Q({", ".join(f"{k}={v!r}" for k, v in index.condition.children)})' \
+            if index.condition else ''
+        return f'models.Index(fields={index.fields!r}{condition}, name={index.name!r})'
+
+    def write_migrations(self, proposals):
+        loader = MigrationLoader(None, ignore_no_migrations=True)
+        by_app = {}
+        for (model, _), (index, _) in proposals.items():
+            by_app.setdefault(model._meta.app_label, []).append(AddIndex(model._meta.model_name, index))
+        paths = []
+        for app_label, operations in by_app.items():
+            leaf = max(loader.graph.leaf_nodes(app_label))
+            number = (MigrationAutodetector.parse_number(leaf[1]) or 0) + 1
+            migration = Migration(f'{number:04d}_advised_indexes', app_label)
+            migration.dependencies = [leaf]
+            migration.operations = operations
+            writer = MigrationWriter(migration)
+            with open(writer.path, 'w', encoding='utf-8') as file:
+                file.write(writer.as_string())
+            paths.append(os.path.relpath(writer.path))
+        return paths
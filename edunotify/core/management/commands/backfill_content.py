@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.content import render_content
+from core.models import Notification
+
+
+class Command(BaseCommand):
+    help = 'Бар хабарландырулардың content_html және excerpt өрістерін бөліктермен толтыру'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500)
+        parser.add_argument('--all', action='store_true',
+                            help='Толтырылғандарын да қайта есептеу (тазалау ережелері өзгергенде)')
+
+    def handle(self, *args, **options):
+        notifications = Notification.objects.only('id', 'content').order_by('pk')
+        if not options['all']:
+            notifications = notifications.filter(content_html='').exclude(content='')
+
+        last_pk = 0
+        total = 0
+        while True:
+            # pk бойынша жылжу: OFFSET-сіз, әр бөлік индекспен оқылады
+            chunk = list(notifications.filter(pk__gt=last_pk)[:options['chunk_size']])
+            if not chunk:
+                break
+            for notification in chunk:
+                notification.content_html, notification.excerpt = render_content(notification.content)
+            # bulk_update сигнал жібермейді және updated_at-ті өзгертпейді
+            with transaction.atomic():
+                Notification.objects.bulk_update(chunk, ['content_html', 'excerpt'])
+            last_pk = chunk[-1].pk
+            total += len(chunk)
+            self.stdout.write(f'{total} хабарландыру өңделді')
+
+        self.stdout.write(self.style.SUCCESS(f'Дайын: {total}'))
@@ -0,0 +1,129 @@
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.db import connections
+from django.test import AsyncClient, Client, override_settings
+
+from django.core.management.base import BaseCommand
+from core.concurrency import concurrent_queries_enabled
+from core.models import CustomUser, Group, Notification
+
+PAGES = ['/', '/admin-dashboard/', '/notifications/']
+
+PREFIX = 'bench-async'
+
+
+class Command(BaseCommand):
+    help = 'Басты бет, админ панелі және хабарландырулар тізімінің кідірісін WSGI (синхронды) және ASGI (async) жолдарымен салыстыру'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--notifications', type=int, default=2000)
+        parser.add_argument('--requests', type=int, default=50, help='Әр бет пен жолға сұраулар саны')
+        parser.add_argument('--concurrency', type=int, default=1, help='Бір уақыттағы сұраулар саны')
+
+    def handle(self, *args, **options):
+        # Қатар сұраулар бөлек қосылымдарда орындалады, олар тек commit
+        # болған деректерді көреді - сондықтан деректер соңында жойылады
+        admin = self._seed(options['notifications'])
+        try:
+            with override_settings(ALLOWED_HOSTS=['testserver'], REPLICA_DATABASES=[], ASYNC_CONCURRENT_QUERIES=True):
+                self._run(admin, options)
+        finally:
+            CustomUser.objects.filter(username__startswith=PREFIX).delete()
+            Group.objects.filter(name__startswith=PREFIX).delete()
+            self.stdout.write('Тест деректері жойылды.')
+
+    def _seed(self, count):
+        group = Group.objects.create(name=f'{PREFIX}-group')
+        admin = CustomUser.objects.create_user(
+            username=f'{PREFIX}-admin', email=f'{PREFIX}-admin@example.com', role='admin', group=group,
+        )
+        notifications = [
+            Notification(title=f'Хабарландыру {i}', content='Мазмұны ' * 30,
+                         notification_type='group', group=group, created_by=admin)
+            for i in range(count)
+        ]
+        # bulk_create save()-ті шақырмайды
+        for notification in notifications:
+            notification.render_content()
+        Notification.objects.bulk_create(notifications, batch_size=2000)
+        # bulk_create сигнал жібермейді: жоюда санауыштар теріс кетпеуі үшін
+        Group.objects.filter(pk=group.pk).update(notification_count=count)
+        CustomUser.objects.filter(pk=admin.pk).update(notifications_count=count)
+        return admin
+
+    def _run(self, admin, options):
+        client = Client()
+        client.force_login(admin)
+        cookies = client.cookies
+
+        self.stdout.write(
+            f'База: {connections["default"].vendor}, қатар сұраулар: '
+            f'{"иә" if concurrent_queries_enabled() else "жоқ"}, concurrency: {options["concurrency"]}'
+        )
+        self.stdout.write(
+            f'{"page":<22} {"WSGI ms":>9} {"p95":>7} {"ASGI ms":>9} {"p95":>7} {"gain":>7}'
+        )
+        for page in PAGES:
+            wsgi = self._wsgi_latencies(page, cookies, options)
+            with override_settings(ROOT_URLCONF='edunotify.urls_asgi'):
+                asgi = asyncio.run(self._asgi_latencies(page, cookies, options))
+            wsgi_mean, asgi_mean = statistics.mean(wsgi), statistics.mean(asgi)
+            self.stdout.write(
+                f'{page:<22} {wsgi_mean:>9.2f} {percentile(wsgi, 95):>7.2f} '
+                f'{asgi_mean:>9.2f} {percentile(asgi, 95):>7.2f} {1 - asgi_mean / wsgi_mean:>7.1%}'
+            )
+
+    def _wsgi_latencies(self, page, cookies, options):
+        def worker(count):
+            client = Client()
+            client.cookies = cookies
+            latencies = timed_requests(lambda: client.get(page), count)
+            connections.close_all()
+            return latencies
+
+        with ThreadPoolExecutor(options['concurrency']) as pool:
+            results = pool.map(worker, split(options['requests'], options['concurrency']))
+        return [latency for latencies in results for latency in latencies]
+
+    async def _asgi_latencies(self, page, cookies, options):
+        async def worker(count):
+            client = AsyncClient()
+            client.cookies = cookies
+            await client.get(page)
+            latencies = []
+            for _ in range(count):
+                started = time.perf_counter()
+                await client.get(page)
+                latencies.append((time.perf_counter() - started) * 1000)
+            return latencies
+
+        results = await asyncio.gather(*(
+            worker(count) for count in split(options['requests'], options['concurrency'])
+        ))
+        await sync_to_async(connections.close_all)()
+        return [latency for latencies in results for latency in latencies]
+
+
+def timed_requests(request, count):
+    # Бірінші сұрау (шаблон компиляциясы, қосылым) есепке кірмейді
+    request()
+    latencies = []
+    for _ in range(count):
+        started = time.perf_counter()
+        request()
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+def split(total, parts):
+    return [total // parts + (1 if i < total % parts else 0) for i in range(parts)]
+
+
+def percentile(values, pct):
+    if len(values) < 2:
+        return values[0]
+    return statistics.quantiles(values, n=100)[pct - 1]
@@ -0,0 +1,50 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.jobs import enqueue_many, job, run_pool, work
+from core.models import Job
+
+
+@job()
+def spin(milliseconds):
+    """CPU-ны `milliseconds` бойы жүктейтін бенчмарк тапсырмасы"""
+    deadline = time.perf_counter() + milliseconds / 1000
+    while time.perf_counter() < deadline:
+        pass
+
+
+class Command(BaseCommand):
+    help = 'Тапсырмалар кезегінің өткізу қабілетін (тапсырма/с) әр түрлі процесс санымен өлшеу'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--jobs', type=int, default=2000)
+        parser.add_argument('--work-ms', type=float, default=0, help='Әр тапсырманың CPU жұмысы (мс)')
+        parser.add_argument('--processes', default=f'1,2,{os.cpu_count() or 1}',
+                            help='Үтір арқылы процестер саны (0 - барлық ядро)')
+        parser.add_argument('--batch-size', type=int, default=None)
+
+    def handle(self, *args, **options):
+        try:
+            counts = [int(value) or os.cpu_count() or 1 for value in options['processes'].split(',')]
+        except ValueError:
+            raise CommandError('--processes: сандар, үтір арқылы')
+        if Job.objects.filter(status='queued').exclude(name=spin.name).exists():
+            raise CommandError('Кезекте басқа тапсырмалар бар: бенчмаркты бос кезекте іске қосыңыз')
+
+        self.stdout.write(f'{options["jobs"]} тапсырма, әрқайсысы {options["work_ms"]} мс CPU')
+        try:
+            for processes in dict.fromkeys(counts):
+                enqueue_many(spin.name, [{'milliseconds': options['work_ms']}] * options['jobs'])
+                started = time.perf_counter()
+                if processes == 1:
+                    processed = work(options['batch_size'], once=True)
+                else:
+                    processed = run_pool(processes, options['batch_size'], once=True)
+                elapsed = time.perf_counter() - started
+                self.stdout.write(f'{processes} процесс: {processed} тапсырма, {elapsed:.2f} с, '
+                                  f'{processed / elapsed:.0f} тапсырма/с')
+        finally:
+            Job.objects.filter(name=spin.name).delete()
+            self.stdout.write('Тест деректері жойылды.')
@@ -0,0 +1,73 @@
+import asyncio
+import time
+
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+from core.models import WebhookDelivery, WebhookEndpoint
+from core.webhook_server import WebhookReceiver
+from core.webhooks import deliver_due, send_all
+
+PREFIX = 'bench-webhooks'
+
+
+class Command(BaseCommand):
+    help = 'Webhook жіберудің өткізу қабілетін жергілікті қабылдаушыда өлшеу (кезекпен және қатар)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--deliveries', type=int, default=1000)
+        parser.add_argument('--endpoints', type=int, default=4)
+        parser.add_argument('--latency', type=float, default=20, help='Қабылдаушының жауап кідірісі (мс)')
+        parser.add_argument('--endpoint-concurrency', type=int, default=16)
+
+    def handle(self, *args, **options):
+        with WebhookReceiver(latency=options['latency'] / 1000) as receiver:
+            endpoints = [
+                WebhookEndpoint.objects.create(
+                    name=f'{PREFIX}-{number}', url=receiver.url, secret='benchmark',
+                    max_concurrency=options['endpoint_concurrency'],
+                )
+                for number in range(options['endpoints'])
+            ]
+            try:
+                self._sequential(endpoints, receiver, min(options['deliveries'], 100))
+                self._concurrent(endpoints, receiver, options['deliveries'])
+            finally:
+                WebhookEndpoint.objects.filter(name__startswith=PREFIX).delete()
+                self.stdout.write('Тест деректері жойылды.')
+
+    def _seed(self, endpoints, count):
+        payload = {'event': 'published', 'notification': {'id': 1, 'title': 'Бенчмарк', 'excerpt': 'x' * 150}}
+        WebhookDelivery.objects.bulk_create(
+            [WebhookDelivery(endpoint=endpoints[number % len(endpoints)], event='published', payload=payload)
+             for number in range(count)],
+            batch_size=1000,
+        )
+
+    def _report(self, label, count, elapsed, connections):
+        self.stdout.write(f'{label}: {count} жіберілім, {elapsed:.2f} с, {count / elapsed:.0f}/с, '
+                          f'{connections} TCP қосылым')
+
+    def _sequential(self, endpoints, receiver, count):
+        # Салыстыру үшін: бір-бірден, әр жіберілімге жаңа қосылым
+        self._seed(endpoints, count)
+        deliveries = list(WebhookDelivery.objects.select_related('endpoint').filter(endpoint__in=endpoints))
+        opened = receiver.connections
+        started = time.perf_counter()
+        for delivery in deliveries:
+            asyncio.run(send_all([delivery]))
+        self._report('Кезекпен', count, time.perf_counter() - started, receiver.connections - opened)
+        WebhookDelivery.objects.filter(endpoint__in=endpoints).delete()
+
+    def _concurrent(self, endpoints, receiver, count):
+        self._seed(endpoints, count)
+        opened = receiver.connections
+        started = time.perf_counter()
+        delivered = 0
+        with override_settings(WEBHOOK_BATCH_SIZE=count):
+            while True:
+                result = deliver_due()
+                delivered += result['delivered']
+                if not result['claimed']:
+                    break
+        self._report('Қатар (deliver_due)', delivered, time.perf_counter() - started, receiver.connections - opened)
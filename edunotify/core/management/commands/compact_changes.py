@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from core.changes import compact
+
+
+class Command(BaseCommand):
+    help = 'Өзгерістер ағынын ықшамдау: ескірген жазбалар мен мерзімі өткен tombstone-дарды жою'
+
+    def handle(self, *args, **options):
+        removed = compact()
+        self.stdout.write(
+            f'Ескірген жазбалар: {removed["superseded"]}, tombstone-дар: {removed["tombstones"]}'
+        )
+        self.stdout.write(self.style.SUCCESS('Өзгерістер ағыны ықшамдалды'))
@@ -0,0 +1,46 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, connection
+from django.utils import timezone
+
+from core.webhooks import deliver_due, next_attempt_time, requeue_dead
+
+RETRY_SECONDS = 5
+
+
+class Command(BaseCommand):
+    help = 'Кезектегі webhook-тарды жіберу және сәтсіздерін қайталау (worker)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Уақыты келгендерін бір рет жіберіп, шығу')
+        parser.add_argument('--requeue-dead', action='store_true',
+                            help='Жеткізілмеген оқиғаларды кезекке қайта қою')
+        parser.add_argument('--batch-size', type=int, default=None)
+
+    def handle(self, *args, **options):
+        if options['requeue_dead']:
+            self.stdout.write(f'Кезекке қайта қойылды: {requeue_dead()}')
+        max_sleep = getattr(settings, 'WEBHOOK_POLL_SECONDS', 5)
+        while True:
+            try:
+                while True:
+                    result = deliver_due(batch_size=options['batch_size'])
+                    if not result['claimed']:
+                        break
+                    self.stdout.write(
+                        f'{timezone.localtime():%d.%m.%Y %H:%M:%S} жеткізілді: {result["delivered"]}, '
+                        f'қайталанады: {result["retried"]}, тоқтатылды: {result["dead"]}'
+                    )
+                if options['once']:
+                    return
+                next_at = next_attempt_time()
+                delay = max_sleep if next_at is None else (next_at - timezone.now()).total_seconds()
+                time.sleep(min(max(delay, 0.1), max_sleep))
+            except DatabaseError as exc:
+                if options['once']:
+                    raise
+                self.stderr.write(f'Дерекқор қатесі: {exc}')
+                connection.close()
+                time.sleep(RETRY_SECONDS)
@@ -0,0 +1,33 @@
+import json
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from core.jobs import enqueue
+
+
+class Command(BaseCommand):
+    help = 'Тапсырманы кезекке қою (мысалы cron-нан: enqueue_job core.tasks.compact_changes)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('name', help='Тапсырма атауы (модуль.функция)')
+        parser.add_argument('--payload', default='{}', help='Аргументтер, JSON объект')
+        parser.add_argument('--delay', type=int, default=0, help='Неше секундтан кейін орындау')
+        parser.add_argument('--priority', type=int, default=None)
+
+    def handle(self, *args, **options):
+        try:
+            payload = json.loads(options['payload'])
+        except ValueError as exc:
+            raise CommandError(f'--payload JSON емес: {exc}')
+        if not isinstance(payload, dict):
+            raise CommandError('--payload JSON объект болуы керек')
+        try:
+            queued = enqueue(
+                options['name'], payload, run_at=timezone.now() + timedelta(seconds=options['delay']),
+                priority=options['priority'],
+            )
+        except LookupError as exc:
+            raise CommandError(str(exc))
+        self.stdout.write(self.style.SUCCESS(f'Кезекке қойылды: {queued}'))
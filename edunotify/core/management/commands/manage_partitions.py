@@ -0,0 +1,55 @@
+from datetime import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from core.models import Notification
+from core.partitioning import (
+    detach_partitions, ensure_partitions, get_interval, is_partitioned, partitioning_enabled,
+    retention_cutoff,
+)
+
+
+class Command(BaseCommand):
+    help = 'Хабарландыру кестесінің алдағы бөлімдерін құру және ескі бөлімдерін ажырату'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--ahead', type=int, default=getattr(settings, 'NOTIFICATION_PARTITIONS_AHEAD', 3),
+            help='Ағымдағыдан кейін неше кезеңнің бөлімі дайын тұруы керек',
+        )
+        parser.add_argument('--retain', type=int, help='Ағымдағыдан бұрынғы неше кезеңді сақтау')
+        parser.add_argument('--detach-before', help='Осы күнге (YYYY-MM-DD) дейін аяқталатын бөлімдерді ажырату')
+        parser.add_argument('--drop', action='store_true', help='Ажыратылған бөлімдерді жою')
+
+    def handle(self, *args, **options):
+        table = Notification._meta.db_table
+        if not partitioning_enabled(connection) or not is_partitioned(connection, table):
+            self.stdout.write('Бөлімдеу қосылмаған (NOTIFICATION_PARTITIONING, PostgreSQL) - әрекет жоқ')
+            return
+
+        before = self.get_cutoff(options)
+        with connection.schema_editor() as schema_editor:
+            created = ensure_partitions(schema_editor, Notification, options['ahead'])
+            detached = detach_partitions(schema_editor, Notification, before, options['drop']) if before else []
+
+        for name in created:
+            self.stdout.write(f'Құрылды: {name}')
+        for name in detached:
+            self.stdout.write(f'{"Жойылды" if options["drop"] else "Ажыратылды"}: {name}')
+        self.stdout.write(self.style.SUCCESS(f'{len(created)} бөлім құрылды, {len(detached)} бөлім ажыратылды'))
+
+    def get_cutoff(self, options):
+        if options['retain'] is not None and options['detach_before']:
+            raise CommandError('--retain және --detach-before бірге берілмейді')
+        if options['retain'] is not None:
+            return retention_cutoff(options['retain'], get_interval())
+        if options['detach_before']:
+            try:
+                day = datetime.strptime(options['detach_before'], '%Y-%m-%d')
+            except ValueError:
+                raise CommandError('--detach-before пішімі: YYYY-MM-DD')
+            return timezone.make_aware(day)
+        return None
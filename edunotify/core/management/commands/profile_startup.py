@@ -0,0 +1,80 @@
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+# Бөлек процесте орындалады: импорттар "суық" күйде өлшенеді
+STARTUP_SCRIPT = """
+import json, time
+started = time.perf_counter()
+import django
+django.setup()
+setup_done = time.perf_counter()
+from django.urls import get_resolver
+get_resolver().url_patterns
+urls_done = time.perf_counter()
+from edunotify.warmup import warm_templates
+compiled, _, _ = warm_templates()
+templates_done = time.perf_counter()
+print(json.dumps({
+    'django.setup()': setup_done - started,
+    'URLconf': urls_done - setup_done,
+    f'templates ({compiled})': templates_done - urls_done,
+}))
+"""
+
+
+def parse_importtime(stderr):
+    """`-X importtime` шығысы: [(модуль, self мкс, cumulative мкс)]"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, module = line[len('import time:'):].split('|')
+        rows.append((module.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+class Command(BaseCommand):
+    help = 'Worker іске қосылу уақытын қосымшалар және модульдер бойынша өлшеу'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=20, help='Ең баяу модульдер саны')
+
+    def handle(self, *args, **options):
+        env = {**os.environ, 'DJANGO_SETTINGS_MODULE': os.environ.get(
+            'DJANGO_SETTINGS_MODULE', 'edunotify.settings')}
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', STARTUP_SCRIPT],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+        )
+        if result.returncode != 0:
+            self.stderr.write(result.stderr[-2000:])
+            return
+
+        phases = json.loads(result.stdout.strip().splitlines()[-1])
+        self.stdout.write(self.style.MIGRATE_HEADING('Кезеңдер'))
+        for phase, seconds in phases.items():
+            self.stdout.write(f'  {phase:<30} {seconds * 1000:>9.1f} ms')
+
+        rows = parse_importtime(result.stderr)
+        by_package = defaultdict(int)
+        for module, self_us, _ in rows:
+            by_package[module.split('.')[0]] += self_us
+
+        local_apps = {app.split('.')[0] for app in settings.INSTALLED_APPS} - {'django'} | {'edunotify'}
+        self.stdout.write(self.style.MIGRATE_HEADING('Импорт уақыты, пакеттер бойынша (self)'))
+        for package, total_us in sorted(by_package.items(), key=lambda item: -item[1])[:options['top']]:
+            marker = '*' if package in local_apps else ' '
+            self.stdout.write(f' {marker}{package:<30} {total_us / 1000:>9.1f} ms')
+
+        self.stdout.write(self.style.MIGRATE_HEADING('Ең баяу модульдер (cumulative)'))
+        for module, _, cumulative_us in sorted(rows, key=lambda row: -row[2])[:options['top']]:
+            self.stdout.write(f'  {module:<50} {cumulative_us / 1000:>9.1f} ms')
+
+        total_us = sum(self_us for _, self_us, _ in rows)
+        self.stdout.write(f'Барлық импорт: {total_us / 1000:.1f} ms ({len(rows)} модуль)')
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.reach import approximate_enabled, rebuild
+
+
+class Command(BaseCommand):
+    help = 'Хабарландыру таралымының жиынтықтарын NotificationView-дан қайта есептеу'
+
+    def handle(self, *args, **options):
+        if approximate_enabled():
+            # Жуық режимде оқу жолдары жазылмайды: HyperLogLog регистрлері жоғалады
+            raise CommandError('REACH_APPROXIMATE қосулы - жиынтықтарды қайта есептеу мүмкін емес')
+        fixed = rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Таралым қайта есептелді, {fixed} хабарландыру түзетілді'))
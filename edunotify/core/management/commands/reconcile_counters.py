@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.counters import reconcile
+from core.models import CustomUser, Group, Notification
+
+
+class Command(BaseCommand):
+    help = 'Группа және пайдаланушы санауыштарын нақты мәндермен түзету'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            fixed = reconcile(Group, CustomUser, Notification)
+        for field, rows in fixed.items():
+            self.stdout.write(f'{field}: {rows} жол түзетілді')
+        self.stdout.write(self.style.SUCCESS('Санауыштар тексерілді'))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from core.feeds import feeds_root, regenerate_all
+
+
+class Command(BaseCommand):
+    help = 'Барлық Atom арналарын қайта жазу және ескі арна файлдарын өшіру (FEEDS_ROOT)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--keep-stale', action='store_true', help='Ескі файлдарды өшірмеу')
+
+    def handle(self, *args, **options):
+        if not feeds_root():
+            self.stdout.write('FEEDS_ROOT бапталмаған - әрекет жоқ')
+            return
+        changed, removed = regenerate_all(prune=not options['keep_stale'])
+        self.stdout.write(self.style.SUCCESS(f'{changed} арна жаңартылды, {removed} ескі файл өшірілді'))
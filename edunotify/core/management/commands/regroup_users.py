@@ -0,0 +1,77 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import CustomUser, Group
+from core.regrouping import RegroupError, merge_groups, move_users, read_split_csv, split_group
+from core.search import filter_users
+
+
+class Command(BaseCommand):
+    help = ('Пайдаланушыларды группалар арасында жаппай ауыстыру, группаларды біріктіру '
+            'және CSV бойынша бөлу (бір транзакция, тұрақты санды UPDATE)')
+
+    def add_arguments(self, parser):
+        subparsers = parser.add_subparsers(dest='action', required=True)
+
+        move = subparsers.add_parser('move', help='Сүзгіге сәйкес пайдаланушыларды группаға ауыстыру')
+        move.add_argument('--to', required=True, help="Мақсат группа (ID немесе атауы; 'none' - группасыз)")
+        move.add_argument('--from', dest='source', help="Қазіргі группасы (ID немесе атауы; 'none' - группасыз)")
+        move.add_argument('--users', help='Логиндер, үтір арқылы')
+        move.add_argument('--q', default='', help='Іздеу (логин, email, аты, тегі)')
+        move.add_argument('--role', choices=[role for role, _ in CustomUser.ROLE_CHOICES])
+
+        merge = subparsers.add_parser('merge', help='SOURCE группасын TARGET-ке біріктіріп, SOURCE-ты жою')
+        merge.add_argument('source', help='ID немесе атауы')
+        merge.add_argument('target', help='ID немесе атауы')
+
+        split = subparsers.add_parser('split', help='Группа мүшелерін CSV бойынша бөлу (username/email, group)')
+        split.add_argument('source', help='ID немесе атауы')
+        split.add_argument('csv_path', help='CSV файлы')
+        split.add_argument('--create-groups', action='store_true', help='Жоқ группаларды құру')
+
+    def handle(self, *args, **options):
+        try:
+            getattr(self, f'handle_{options["action"]}')(options)
+        except RegroupError as exc:
+            raise CommandError(str(exc))
+
+    def get_group(self, value, allow_none=False):
+        if allow_none and value.lower() == 'none':
+            return None
+        groups = list(Group.objects.filter(pk=int(value)) if value.isdigit() else Group.objects.filter(name=value))
+        if not groups:
+            raise CommandError(f'Группа табылмады: {value}')
+        if len(groups) > 1:
+            raise CommandError(f'Бұл атаумен бірнеше группа бар, ID беріңіз: {value}')
+        return groups[0]
+
+    def handle_move(self, options):
+        if not any(options[name] for name in ('source', 'users', 'q', 'role')):
+            raise CommandError('Кемінде бір сүзгі беріңіз: --from, --users, --q немесе --role')
+        target = self.get_group(options['to'], allow_none=True)
+        params = {'q': options['q'], 'role': options['role']}
+        if options['source']:
+            source = self.get_group(options['source'], allow_none=True)
+            params['group'] = str(source.pk) if source else 'none'
+        users, _ = filter_users(CustomUser.objects.all(), params)
+        if options['users']:
+            users = users.filter(username__in=[name.strip() for name in options['users'].split(',')])
+        moved = move_users(users, target)
+        name = target.name if target else 'группасыз'
+        self.stdout.write(self.style.SUCCESS(f'{len(moved)} пайдаланушы ауыстырылды ({name})'))
+
+    def handle_merge(self, options):
+        source, target = self.get_group(options['source']), self.get_group(options['target'])
+        users, notifications = merge_groups(source, target)
+        self.stdout.write(self.style.SUCCESS(
+            f'{source.name} -> {target.name}: {users} пайдаланушы, {notifications} хабарландыру ауыстырылды'
+        ))
+
+    def handle_split(self, options):
+        source = self.get_group(options['source'])
+        try:
+            with open(options['csv_path'], encoding='utf-8-sig', newline='') as file:
+                rows = read_split_csv(file)
+        except OSError as exc:
+            raise CommandError(f'CSV оқылмады: {exc}')
+        moved = split_group(source, rows, create_groups=options['create_groups'])
+        self.stdout.write(self.style.SUCCESS(f'{source.name}: {moved} пайдаланушы бөлінді'))
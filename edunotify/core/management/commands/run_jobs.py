@@ -0,0 +1,49 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, connection
+from django.utils import timezone
+
+from core.jobs import requeue_failed, run_pool, work
+
+RETRY_SECONDS = 5
+
+
+class Command(BaseCommand):
+    help = 'Дерекқордағы фондық тапсырмаларды орындау (worker, --processes - бірнеше процесс)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Уақыты келгендерін орындап, шығу')
+        parser.add_argument('--batch-size', type=int, default=None)
+        parser.add_argument('--processes', type=int, default=1,
+                            help='Worker процестерінің саны (0 - барлық ядро)')
+        parser.add_argument('--requeue-failed', action='store_true', help='Сәтсіз тапсырмаларды кезекке қайта қою')
+
+    def handle(self, *args, **options):
+        if options['requeue_failed']:
+            self.stdout.write(f'Кезекке қайта қойылды: {requeue_failed()}')
+        if options['processes'] != 1:
+            processed = run_pool(options['processes'], options['batch_size'], options['once'])
+            self.stdout.write(f'Өңделді: {processed}')
+            return
+        while True:
+            try:
+                processed = work(options['batch_size'], options['once'], on_batch=self.report)
+                if options['once']:
+                    self.stdout.write(f'Өңделді: {processed}')
+                    return
+            except DatabaseError as exc:
+                if options['once']:
+                    raise
+                # Қосылым үзілсе, қайта қосылып LISTEN-ді жаңарту
+                self.stderr.write(f'Дерекқор қатесі: {exc}')
+                connection.close()
+                time.sleep(RETRY_SECONDS)
+            except KeyboardInterrupt:
+                return
+
+    def report(self, result):
+        self.stdout.write(
+            f'{timezone.localtime():%d.%m.%Y %H:%M:%S} орындалды: {result["done"]}, '
+            f'қайталанады: {result["retried"]}, сәтсіз: {result["failed"]}'
+        )
@@ -0,0 +1,22 @@
+# Generated by Django 4.2 on 2026-10-19 11:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_notificationview_alter_customuser_options_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='digest_frequency',
+            field=models.CharField(choices=[('none', 'Жібермеу'), ('daily', 'Күнделікті'), ('weekly', 'Апта сайын')], default='none', max_length=10, verbose_name='Хабарландыру дайджесті'),
+        ),
+        migrations.AddIndex(
+            model_name='customuser',
+            index=models.Index(fields=['digest_frequency', 'group'], name='core_custom_digest__359e2c_idx'),
+        ),
+    ]
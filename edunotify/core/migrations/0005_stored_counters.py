@@ -0,0 +1,61 @@
+# Generated by Django 4.2 on 2026-10-19 12:01
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_subquery(model, fk_name):
+    return Coalesce(
+        Subquery(
+            model.objects.order_by().filter(**{fk_name: OuterRef('pk')})
+            .values(fk_name).annotate(total=Count('pk')).values('total'),
+            output_field=IntegerField(),
+        ),
+        0,
+    )
+
+
+def populate_counters(apps, schema_editor):
+    Group = apps.get_model('core', 'Group')
+    CustomUser = apps.get_model('core', 'CustomUser')
+    Notification = apps.get_model('core', 'Notification')
+    Group.objects.update(
+        member_count=count_subquery(CustomUser, 'group'),
+        notification_count=count_subquery(Notification, 'group'),
+    )
+    CustomUser.objects.update(
+        notifications_count=count_subquery(Notification, 'created_by'),
+        archived_notifications_count=count_subquery(Notification, 'archived_by'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_customuser_digest_frequency'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='archived_notifications_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Архивке қойған хабарландырулар саны'),
+        ),
+        migrations.AddField(
+            model_name='customuser',
+            name='notifications_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Жарияланған хабарландырулар саны'),
+        ),
+        migrations.AddField(
+            model_name='group',
+            name='member_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Мүшелер саны'),
+        ),
+        migrations.AddField(
+            model_name='group',
+            name='notification_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Хабарландырулар саны'),
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 4.2 on 2026-10-19 12:03
+
+from django.db import migrations, models
+
+TRIGRAM_FIELDS = ('username', 'email', 'first_name', 'last_name')
+
+
+def trigram_index_name(field):
+    return f'core_customuser_{field}_trgm'
+
+
+def create_trigram_indexes(apps, schema_editor):
+    """PostgreSQL: UPPER(...) LIKE іздеуіне арналған pg_trgm GIN индекстері"""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for field in TRIGRAM_FIELDS:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {trigram_index_name(field)} '
+            f'ON core_customuser USING gin (UPPER("{field}"::text) gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for field in TRIGRAM_FIELDS:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {trigram_index_name(field)}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_stored_counters'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='customuser',
+            index=models.Index(fields=['role', '-date_joined'], name='core_custom_role_3a38e1_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customuser',
+            index=models.Index(fields=['group', '-date_joined'], name='core_custom_group_i_ac4e70_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customuser',
+            index=models.Index(fields=['last_name', 'first_name'], name='core_custom_last_na_4203c9_idx'),
+        ),
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2 on 2026-10-19 12:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_user_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['-created_at'], name='core_notifi_created_f19d5e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notificationarchive',
+            index=models.Index(fields=['-archived_at'], name='core_notifi_archive_40ed78_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notificationview',
+            index=models.Index(fields=['-viewed_at'], name='core_notifi_viewed__e673c2_idx'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2 on 2026-10-19 12:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_admin_date_hierarchy_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='expires_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Аяқталу уақыты'),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='publish_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Жариялану уақыты'),
+        ),
+        migrations.AlterField(
+            model_name='notification',
+            name='status',
+            field=models.CharField(choices=[('scheduled', 'Жоспарланған'), ('active', 'Белсенді'), ('archived', 'Архивтелген'), ('deleted', 'Жойылған')], default='active', max_length=20, verbose_name='Статус'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['status', 'publish_at'], name='core_notifi_status_257deb_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['status', 'expires_at'], name='core_notifi_status_232531_idx'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2 on 2026-10-19 12:20
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_notification_scheduling'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationChange',
+            fields=[
+                ('seq', models.BigAutoField(primary_key=True, serialize=False)),
+                ('notification_id', models.BigIntegerField(verbose_name='Хабарландыру ID')),
+                ('action', models.CharField(choices=[('create', 'Құрылды'), ('update', 'Өзгертілді'), ('publish', 'Жарияланды'), ('archive', 'Архивтелді'), ('restore', 'Қалпына келтірілді'), ('delete', 'Жойылды')], max_length=10, verbose_name='Әрекет')),
+                ('recorded_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Уақыты')),
+            ],
+            options={
+                'verbose_name': 'Хабарландыру өзгерісі',
+                'verbose_name_plural': 'Хабарландыру өзгерістері',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='notificationchange',
+            index=models.Index(fields=['notification_id', 'seq'], name='core_notifi_notific_38684c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notificationchange',
+            index=models.Index(fields=['action', 'recorded_at'], name='core_notifi_action_0d4cd3_idx'),
+        ),
+    ]
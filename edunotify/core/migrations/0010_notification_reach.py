@@ -0,0 +1,41 @@
+# Generated by Django 4.2 on 2026-10-19 12:24
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_notification_change_feed'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='read_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Оқығандар саны'),
+        ),
+        migrations.CreateModel(
+            name='NotificationReach',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('read_count', models.PositiveIntegerField(default=0, verbose_name='Оқығандар саны')),
+                ('sketch', models.BinaryField(blank=True, null=True, verbose_name='HyperLogLog')),
+                ('group', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='notification_reach', to='core.group', verbose_name='Группа')),
+                ('notification', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reach', to='core.notification', verbose_name='Хабарландыру')),
+            ],
+            options={
+                'verbose_name': 'Хабарландыру таралымы',
+                'verbose_name_plural': 'Хабарландыру таралымдары',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='notificationreach',
+            constraint=models.UniqueConstraint(fields=('notification', 'group'), name='unique_notification_reach'),
+        ),
+        migrations.AddConstraint(
+            model_name='notificationreach',
+            constraint=models.UniqueConstraint(condition=models.Q(('group__isnull', True)), fields=('notification',), name='unique_notification_reach_no_group'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2 on 2026-10-19 12:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_notification_reach'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='content_html',
+            field=models.TextField(blank=True, editable=False, verbose_name='Мазмұны (HTML)'),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='excerpt',
+            field=models.CharField(blank=True, editable=False, max_length=150, verbose_name='Қысқаша мазмұны'),
+        ),
+    ]
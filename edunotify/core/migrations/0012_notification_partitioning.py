@@ -0,0 +1,99 @@
+# core_notification кестесін PARTITION BY RANGE (created_at) кестесіне айналдыру
+# (тек PostgreSQL, NOTIFICATION_PARTITIONING миграция кезінде қосулы болса).
+# Барлық жолдар DEFAULT бөлімге көшеді; кезеңдік бөлімдерді
+# `manage.py manage_partitions` құрып, жолдарды оларға ауыстырады.
+# DDL осында бекітілген: core.partitioning өзгерсе де миграция өзгермейді.
+
+from django.conf import settings
+from django.db import migrations
+
+TABLE = 'core_notification'
+DEFAULT_PARTITION = 'core_notification_default'
+
+
+def is_partitioned(connection):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid '
+            'WHERE c.relname = %s AND pg_table_is_visible(c.oid)',
+            [TABLE],
+        )
+        return cursor.fetchone() is not None
+
+
+def copy_rows(schema_editor, model, source, target):
+    quote = schema_editor.quote_name
+    columns = ', '.join(field.column for field in model._meta.concrete_fields)
+    schema_editor.execute(
+        f'INSERT INTO {quote(target)} ({columns}) OVERRIDING SYSTEM VALUE SELECT {columns} FROM {quote(source)}'
+    )
+
+
+def replace_table(schema_editor, model, staging, primary_key):
+    quote = schema_editor.quote_name
+    pk = model._meta.pk.column
+    # CASCADE сілтейтін кестелердің FK шектеулерін де алады
+    schema_editor.execute(f'DROP TABLE {quote(TABLE)} CASCADE')
+    schema_editor.execute(f'ALTER TABLE {quote(staging)} RENAME TO {quote(TABLE)}')
+    schema_editor.execute(f'ALTER TABLE {quote(TABLE)} ADD PRIMARY KEY ({primary_key})')
+    schema_editor.execute(
+        f'SELECT setval(pg_get_serial_sequence(%s, %s), COALESCE((SELECT MAX({quote(pk)}) FROM {quote(TABLE)}), 1))',
+        [TABLE, pk],
+    )
+    for statement in schema_editor._model_indexes_sql(model):
+        schema_editor.execute(statement)
+    for field in model._meta.concrete_fields:
+        if field.remote_field and field.db_constraint:
+            schema_editor.execute(schema_editor._create_fk_sql(model, field, '_fk_%(to_table)s_%(to_column)s'))
+
+
+def forwards(apps, schema_editor):
+    connection = schema_editor.connection
+    if (connection.vendor != 'postgresql' or not getattr(settings, 'NOTIFICATION_PARTITIONING', False)
+            or is_partitioned(connection)):
+        return
+    model = apps.get_model('core', 'Notification')
+    quote = schema_editor.quote_name
+    staging = f'{TABLE}_partitioned'
+    schema_editor.execute(
+        f'CREATE TABLE {quote(staging)} (LIKE {quote(TABLE)} INCLUDING DEFAULTS INCLUDING IDENTITY '
+        f'INCLUDING CONSTRAINTS) PARTITION BY RANGE (created_at)'
+    )
+    schema_editor.execute(f'CREATE TABLE {quote(DEFAULT_PARTITION)} PARTITION OF {quote(staging)} DEFAULT')
+    copy_rows(schema_editor, model, TABLE, staging)
+    # Бастапқы кілт бөлімдеу кілтін қамтуы керек
+    replace_table(schema_editor, model, staging, f'{quote(model._meta.pk.column)}, created_at')
+
+
+def backwards(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'postgresql' or not is_partitioned(connection):
+        return
+    model = apps.get_model('core', 'Notification')
+    quote = schema_editor.quote_name
+    staging = f'{TABLE}_plain'
+    schema_editor.execute(
+        f'CREATE TABLE {quote(staging)} (LIKE {quote(TABLE)} INCLUDING DEFAULTS INCLUDING IDENTITY '
+        f'INCLUDING CONSTRAINTS)'
+    )
+    copy_rows(schema_editor, model, TABLE, staging)
+    replace_table(schema_editor, model, staging, quote(model._meta.pk.column))
+    for relation in model._meta.related_objects:
+        field = relation.field
+        if field.concrete and field.db_constraint:
+            schema_editor.execute(
+                schema_editor._create_fk_sql(relation.related_model, field, '_fk_%(to_table)s_%(to_column)s')
+            )
+
+
+class Migration(migrations.Migration):
+    # Кестені көшіру бір транзакцияда өтеді
+    atomic = True
+
+    dependencies = [
+        ('core', '0011_notification_content_html'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards, elidable=False),
+    ]
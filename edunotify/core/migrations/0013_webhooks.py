@@ -0,0 +1,72 @@
+# Generated by Django 4.2 on 2026-10-19 12:40
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_notification_partitioning'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WebhookEndpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, verbose_name='Атауы')),
+                ('url', models.URLField(max_length=500, verbose_name='URL')),
+                ('secret', models.CharField(max_length=128, verbose_name='HMAC кілті')),
+                ('events', models.JSONField(blank=True, default=list, verbose_name='Оқиғалар')),
+                ('max_concurrency', models.PositiveSmallIntegerField(default=4, verbose_name='Қатар жіберулер шегі')),
+                ('is_active', models.BooleanField(default=True, verbose_name='Белсенді')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Құрылған уақыты')),
+                ('group', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='webhooks', to='core.group', verbose_name='Группа')),
+            ],
+            options={
+                'verbose_name': 'Webhook',
+                'verbose_name_plural': 'Webhook-тар',
+            },
+        ),
+        migrations.CreateModel(
+            name='WebhookDelivery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event', models.CharField(choices=[('published', 'Жарияланды'), ('archived', 'Архивтелді'), ('restored', 'Қалпына келтірілді')], max_length=20, verbose_name='Оқиға')),
+                ('payload', models.JSONField(verbose_name='Дерек')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Әрекеттер саны')),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Келесі әрекет')),
+                ('last_error', models.TextField(blank=True, verbose_name='Соңғы қате')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Құрылған уақыты')),
+                ('endpoint', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='deliveries', to='core.webhookendpoint', verbose_name='Webhook')),
+            ],
+            options={
+                'verbose_name': 'Webhook жіберілімі',
+                'verbose_name_plural': 'Webhook жіберілімдері',
+            },
+        ),
+        migrations.CreateModel(
+            name='WebhookDeadLetter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event', models.CharField(choices=[('published', 'Жарияланды'), ('archived', 'Архивтелді'), ('restored', 'Қалпына келтірілді')], max_length=20, verbose_name='Оқиға')),
+                ('payload', models.JSONField(verbose_name='Дерек')),
+                ('attempts', models.PositiveIntegerField(verbose_name='Әрекеттер саны')),
+                ('last_error', models.TextField(blank=True, verbose_name='Соңғы қате')),
+                ('created_at', models.DateTimeField(verbose_name='Құрылған уақыты')),
+                ('failed_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Тоқтатылған уақыты')),
+                ('endpoint', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='dead_letters', to='core.webhookendpoint', verbose_name='Webhook')),
+            ],
+            options={
+                'verbose_name': 'Жеткізілмеген webhook',
+                'verbose_name_plural': 'Жеткізілмеген webhook-тар',
+                'ordering': ['-failed_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='webhookdelivery',
+            index=models.Index(fields=['next_attempt_at'], name='core_webhoo_next_at_553bdc_idx'),
+        ),
+    ]
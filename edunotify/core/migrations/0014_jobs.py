@@ -0,0 +1,39 @@
+# Generated by Django 4.2 on 2026-10-19 12:57
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_webhooks'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200, verbose_name='Тапсырма')),
+                ('payload', models.JSONField(blank=True, default=dict, verbose_name='Аргументтер')),
+                ('priority', models.SmallIntegerField(default=0, verbose_name='Басымдық')),
+                ('status', models.CharField(choices=[('queued', 'Кезекте'), ('failed', 'Сәтсіз')], default='queued', max_length=10, verbose_name='Күйі')),
+                ('run_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Орындалу уақыты')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Әрекеттер саны')),
+                ('max_attempts', models.PositiveSmallIntegerField(default=5, verbose_name='Әрекеттер шегі')),
+                ('timeout', models.PositiveIntegerField(default=300, verbose_name='Көріну уақыты (с)')),
+                ('locked_by', models.CharField(blank=True, max_length=100, verbose_name='Worker')),
+                ('last_error', models.TextField(blank=True, verbose_name='Соңғы қате')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Құрылған уақыты')),
+            ],
+            options={
+                'verbose_name': 'Фондық тапсырма',
+                'verbose_name_plural': 'Фондық тапсырмалар',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(condition=models.Q(('status', 'queued')), fields=['-priority', 'run_at'], name='core_job_due_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2 on 2026-10-19 14:10
+
+from django.db import migrations
+from django.utils import timezone
+
+BATCH_SIZE = 1000
+
+
+def seed_changes(apps, schema_editor):
+    """Ағынға дейін құрылған хабарландыруларға бір 'create' жазбасы (толық синхрондау оларды да алады)"""
+    Notification = apps.get_model('core', 'Notification')
+    NotificationChange = apps.get_model('core', 'NotificationChange')
+    recorded = set(NotificationChange.objects.values_list('notification_id', flat=True).distinct())
+    now = timezone.now()
+    batch = []
+    for notification_id in Notification.objects.order_by('pk').values_list('pk', flat=True).iterator(BATCH_SIZE):
+        if notification_id in recorded:
+            continue
+        batch.append(NotificationChange(notification_id=notification_id, action='create', recorded_at=now))
+        if len(batch) >= BATCH_SIZE:
+            NotificationChange.objects.bulk_create(batch)
+            batch = []
+    NotificationChange.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_jobs'),
+    ]
+
+    operations = [
+        migrations.RunPython(seed_changes, migrations.RunPython.noop),
+    ]
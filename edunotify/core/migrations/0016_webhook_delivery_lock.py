@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-19 13:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_seed_notification_changes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='webhookdelivery',
+            name='locked_by',
+            field=models.CharField(blank=True, editable=False, max_length=100, verbose_name='Алған worker'),
+        ),
+    ]
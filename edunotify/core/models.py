@@ -1,8 +1,10 @@
-from django.db import models
+from django.db import models, router
 from django.contrib.auth.models import AbstractUser
 from django.utils import timezone
 import os
 from django.utils.text import slugify 
+from .content import EXCERPT_LENGTH, render_content
+from .uploads import delete_files_later, reserve_pk
 
 def notification_image_path(instance, filename):
     """
@@ -23,10 +25,28 @@ def notification_image_path(instance, filename):
     
     return os.path.join('notifications', folder_name, safe_name)
 
-class Group(models.Model):
+class CounterFieldsMixin:
+    """
+    Сақталған санауыштар тек F() өрнектерімен жаңартылады (core.signals).
+    Толық save() оларды ескі мәнмен қайта жазбауы үшін бұл өрістер UPDATE
+    сұранысынан шығарылады; save() семантикасы (update_fields, жоқ жолды
+    INSERT ету) өзгермейді.
+    """
+    counter_fields = ()
+    
+    def _do_update(self, base_qs, using, pk_val, values, update_fields, forced_update):
+        values = [value for value in values if value[0].name not in self.counter_fields]
+        return super()._do_update(base_qs, using, pk_val, values, update_fields, forced_update)
+
+class Group(CounterFieldsMixin, models.Model):
     name = models.CharField(max_length=100, verbose_name="Группа аты")
     description = models.TextField(blank=True, verbose_name="Сипаттама")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Құрылған уақыты")
+    member_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Мүшелер саны")
+    notification_count = models.PositiveIntegerField(default=0, editable=False,
+                                                     verbose_name="Хабарландырулар саны")
+    
+    counter_fields = ('member_count', 'notification_count')
     
     class Meta:
         verbose_name = "Группа"
@@ -34,29 +54,44 @@ class Group(models.Model):
     
     def __str__(self):
         return self.name
-    
-    @property
-    def member_count(self):
-        """Группадағы мүшелер саны"""
-        return self.customuser_set.count()
 
-class CustomUser(AbstractUser):
+class CustomUser(CounterFieldsMixin, AbstractUser):
     ROLE_CHOICES = (
         ('admin', 'Админ'),
         ('user', 'Пайдаланушы'),
     )
     
+    DIGEST_CHOICES = (
+        ('none', 'Жібермеу'),
+        ('daily', 'Күнделікті'),
+        ('weekly', 'Апта сайын'),
+    )
+    
     role = models.CharField(max_length=20, choices=ROLE_CHOICES, default='user', verbose_name="Роль")
     group = models.ForeignKey(Group, on_delete=models.SET_NULL, null=True, blank=True, 
                               verbose_name="Группа", related_name='members')
     email = models.EmailField(unique=True, verbose_name="Электронды пошта")
     phone = models.CharField(max_length=20, blank=True, verbose_name="Телефон")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Тіркелген уақыты")
+    digest_frequency = models.CharField(max_length=10, choices=DIGEST_CHOICES, default='none',
+                                        verbose_name="Хабарландыру дайджесті")
+    notifications_count = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name="Жарияланған хабарландырулар саны")
+    archived_notifications_count = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name="Архивке қойған хабарландырулар саны")
+    
+    counter_fields = ('notifications_count', 'archived_notifications_count')
     
     class Meta:
         verbose_name = "Пайдаланушы"
         verbose_name_plural = "Пайдаланушылар"
         ordering = ['-date_joined']
+        indexes = [
+            models.Index(fields=['digest_frequency', 'group']),
+            models.Index(fields=['role', '-date_joined']),
+            models.Index(fields=['group', '-date_joined']),
+            models.Index(fields=['last_name', 'first_name']),
+        ]
     
     def __str__(self):
         full_name = self.get_full_name()
@@ -68,23 +103,14 @@ class CustomUser(AbstractUser):
     def is_admin(self):
         return self.role == 'admin'
     
-    @property
-    def notifications_count(self):
-        """Пайдаланушының жарияланған хабарландыруларының саны"""
-        return self.notifications_created.count()
-    
-    @property
-    def archived_notifications_count(self):
-        """Пайдаланушының архивке қойған хабарландыруларының саны"""
-        return self.notifications_archived.count()
-
-class Notification(models.Model):
+class Notification(CounterFieldsMixin, models.Model):
     TYPE_CHOICES = (
         ('general', 'Жалпы хабарландыру'),
         ('group', 'Группаға арналған хабарландыру'),
     )
     
     STATUS_CHOICES = (
+        ('scheduled', 'Жоспарланған'),
         ('active', 'Белсенді'),
         ('archived', 'Архивтелген'),
         ('deleted', 'Жойылған'),
@@ -92,6 +118,10 @@ class Notification(models.Model):
     
     title = models.CharField(max_length=200, verbose_name="Тақырып")
     content = models.TextField(verbose_name="Мазмұны")
+    # save()-те content-тен есептеледі (core.content)
+    content_html = models.TextField(blank=True, editable=False, verbose_name="Мазмұны (HTML)")
+    excerpt = models.CharField(max_length=EXCERPT_LENGTH, blank=True, editable=False,
+                               verbose_name="Қысқаша мазмұны")
     notification_type = models.CharField(max_length=20, choices=TYPE_CHOICES, 
                                         verbose_name="Түрі", default='general')
     group = models.ForeignKey(Group, on_delete=models.CASCADE, null=True, blank=True, 
@@ -104,6 +134,10 @@ class Notification(models.Model):
                              verbose_name="Статус")
     is_important = models.BooleanField(default=False, verbose_name="Маңызды")
     
+    # Жоспарланған хабарландыруларды core.scheduling белсендіреді/архивтейді
+    publish_at = models.DateTimeField(null=True, blank=True, verbose_name="Жариялану уақыты")
+    expires_at = models.DateTimeField(null=True, blank=True, verbose_name="Аяқталу уақыты")
+    
 
     created_by = models.ForeignKey(CustomUser, on_delete=models.CASCADE, 
                                   verbose_name="Құрушы", related_name='notifications_created')
@@ -117,6 +151,11 @@ class Notification(models.Model):
     archive_date = models.DateTimeField(null=True, blank=True, verbose_name="Архивтелген күні")
     archive_reason = models.TextField(blank=True, null=True, verbose_name="Архивтеу себебі")
     
+    # Оқыған аудитория мүшелерінің саны (core.reach)
+    read_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Оқығандар саны")
+    
+    counter_fields = ('read_count',)
+    
     class Meta:
         verbose_name = "Хабарландыру"
         verbose_name_plural = "Хабарландырулар"
@@ -126,6 +165,9 @@ class Notification(models.Model):
             models.Index(fields=['notification_type', 'status']),
             models.Index(fields=['group', 'status']),
             models.Index(fields=['is_important', 'status']),
+            models.Index(fields=['-created_at']),
+            models.Index(fields=['status', 'publish_at']),
+            models.Index(fields=['status', 'expires_at']),
         ]
         permissions = [
             ("can_archive", "Хабарландыруды архивке қоюға болады"),
@@ -135,14 +177,34 @@ class Notification(models.Model):
     def __str__(self):
         return self.title
     
+    def render_content(self):
+        """content_html мен excerpt-ті мазмұннан қайта есептеу"""
+        self.content_html, self.excerpt = render_content(self.content)
+    
     def save(self, *args, **kwargs):
-        if self.pk is None:
-            super().save(*args, **kwargs)
-            if self.image and hasattr(self.image, 'name'):
-                self.image.name = notification_image_path(self, self.image.name)
-                super().save(update_fields=['image'])
-        else:
-            super().save(*args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        if 'content' not in self.get_deferred_fields() and (update_fields is None or 'content' in update_fields):
+            self.render_content()
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'content_html', 'excerpt'}
+        
+        image = self.image
+        if self.pk is None and image and not image._committed:
+            # Файл бірден notifications/<id>/ ішіне жазылуы үшін ID алдын ала алынады
+            using = kwargs.get('using') or router.db_for_write(Notification, instance=self)
+            self.pk = reserve_pk(Notification, using)
+            if self.pk is None:
+                # Sequence жоқ базалар (SQLite): алдымен суретсіз жазып, ID алу
+                self.image = None
+                super().save(*args, **kwargs)
+                self.image = image
+                # Файл жолы сигналсыз жазылады: post_save екінші рет өңдеу ретінде келмейді
+                image = self._meta.get_field('image').pre_save(self, False)
+                Notification.objects.using(using).filter(pk=self.pk).update(image=image.name)
+                return
+            else:
+                kwargs['force_insert'] = True
+        super().save(*args, **kwargs)
     
     def archive(self, user=None, reason=''):
         """Хабарландыруды архивке ауыстыру"""
@@ -166,6 +228,9 @@ class Notification(models.Model):
         self.archived_by = None
         self.archive_date = None
         self.archive_reason = ''
+        # Мерзімі өтіп кеткен болса, scheduler оны қайта архивтеп жібереді
+        if self.expires_at and self.expires_at <= timezone.now():
+            self.expires_at = None
         self.save()
 
         NotificationArchive.objects.filter(notification=self).delete()
@@ -203,6 +268,9 @@ class Notification(models.Model):
         if self.status == 'deleted':
             return False
         
+        if self.status == 'scheduled':
+            return self.created_by == user
+        
         if self.status == 'archived':
             return self.archived_by == user
         
@@ -215,20 +283,25 @@ class Notification(models.Model):
         return False
     
     def delete_image(self):
-        """Хабарландыру суретін жою"""
+        """Хабарландыру суретін жою (файл commit-тен кейін өшіріледі)"""
         if self.image:
-            if os.path.exists(self.image.path):
-                try:
-                    os.remove(self.image.path)
-                except:
-                    pass
-            
-            self.image.delete(save=True)
+            name, storage = self.image.name, self.image.storage
+            self.image = None
+            self.save(update_fields=['image'])
+            delete_files_later(storage, [name])
     
     @property
     def has_image(self):
         return bool(self.image)
     
+    def is_publish_pending(self, now=None):
+        """Жариялану уақыты әлі келмеген бе?"""
+        return self.publish_at is not None and self.publish_at > (now or timezone.now())
+    
+    @property
+    def is_scheduled(self):
+        return self.status == 'scheduled'
+    
     @property
     def is_archived(self):
         return self.status == 'archived'
@@ -239,10 +312,10 @@ class Notification(models.Model):
     
     @property
     def short_content(self):
-        """Қысқартылған мазмұн"""
-        if len(self.content) > 150:
-            return self.content[:147] + '...'
-        return self.content
+        """Қысқартылған мазмұн (backfill_content-ке дейін сақталмаған жолдар үшін есептеледі)"""
+        if self.excerpt or 'excerpt' in self.get_deferred_fields():
+            return self.excerpt
+        return render_content(self.content)[1]
     
     @property
     def can_be_edited_by(self, user):
@@ -272,6 +345,9 @@ class NotificationArchive(models.Model):
         verbose_name = "Архив жазбасы"
         verbose_name_plural = "Архив жазбалары"
         ordering = ['-archived_at']
+        indexes = [
+            models.Index(fields=['-archived_at']),
+        ]
     
     def __str__(self):
         return f"Архив: {self.notification.title}"
@@ -298,6 +374,9 @@ class NotificationView(models.Model):
         verbose_name_plural = "Қаралған хабарландырулар"
         unique_together = ['user', 'notification']
         ordering = ['-viewed_at']
+        indexes = [
+            models.Index(fields=['-viewed_at']),
+        ]
     
     def __str__(self):
         return f"{self.user} - {self.notification}"
@@ -309,4 +388,170 @@ class NotificationView(models.Model):
             user=user,
             notification=notification,
             defaults={'viewed_at': timezone.now()}
-        )
\ No newline at end of file
+        )
+
+class NotificationReach(models.Model):
+    """
+    Хабарландыруды оқыған аудитория мүшелерінің группа бойынша саны
+    (core.reach). `group` - оқыған кездегі пайдаланушының группасы;
+    `sketch` - REACH_APPROXIMATE режиміндегі HyperLogLog регистрлері.
+    """
+    notification = models.ForeignKey(Notification, on_delete=models.CASCADE,
+                                     related_name='reach', verbose_name="Хабарландыру")
+    group = models.ForeignKey(Group, on_delete=models.CASCADE, null=True, blank=True,
+                              related_name='notification_reach', verbose_name="Группа")
+    read_count = models.PositiveIntegerField(default=0, verbose_name="Оқығандар саны")
+    sketch = models.BinaryField(null=True, blank=True, verbose_name="HyperLogLog")
+    
+    class Meta:
+        verbose_name = "Хабарландыру таралымы"
+        verbose_name_plural = "Хабарландыру таралымдары"
+        constraints = [
+            models.UniqueConstraint(fields=['notification', 'group'], name='unique_notification_reach'),
+            # NULL группа UNIQUE-та бір-біріне тең емес
+            models.UniqueConstraint(fields=['notification'], condition=models.Q(group__isnull=True),
+                                    name='unique_notification_reach_no_group'),
+        ]
+    
+    def __str__(self):
+        return f"{self.notification_id} / {self.group_id}: {self.read_count}"
+
+class NotificationChange(models.Model):
+    """
+    Хабарландырулардың өзгеріс журналы (core.changes).
+
+    `seq` - монотонды курсор; `delete` жазбалары - жойылған
+    хабарландырулардың tombstone-дары. Сыртқы кілт емес, себебі жазба
+    хабарландыру жойылғаннан кейін де сақталуы керек.
+    """
+    ACTION_CHOICES = (
+        ('create', 'Құрылды'),
+        ('update', 'Өзгертілді'),
+        ('publish', 'Жарияланды'),
+        ('archive', 'Архивтелді'),
+        ('restore', 'Қалпына келтірілді'),
+        ('delete', 'Жойылды'),
+    )
+    
+    seq = models.BigAutoField(primary_key=True)
+    notification_id = models.BigIntegerField(verbose_name="Хабарландыру ID")
+    action = models.CharField(max_length=10, choices=ACTION_CHOICES, verbose_name="Әрекет")
+    recorded_at = models.DateTimeField(default=timezone.now, verbose_name="Уақыты")
+    
+    class Meta:
+        verbose_name = "Хабарландыру өзгерісі"
+        verbose_name_plural = "Хабарландыру өзгерістері"
+        indexes = [
+            models.Index(fields=['notification_id', 'seq']),
+            models.Index(fields=['action', 'recorded_at']),
+        ]
+    
+    def __str__(self):
+        return f"#{self.seq} {self.get_action_display()}: {self.notification_id}"
+
+class WebhookEndpoint(models.Model):
+    """
+    Хабарландыру оқиғаларына сыртқы жазылым (core.webhooks): LMS,
+    мессенджер боттары. `group` бос болса - барлық группалар мен жалпы
+    хабарландырулар; `events` бос болса - барлық оқиғалар.
+    """
+    EVENT_CHOICES = (
+        ('published', 'Жарияланды'),
+        ('archived', 'Архивтелді'),
+        ('restored', 'Қалпына келтірілді'),
+    )
+    
+    name = models.CharField(max_length=100, verbose_name="Атауы")
+    url = models.URLField(max_length=500, verbose_name="URL")
+    secret = models.CharField(max_length=128, verbose_name="HMAC кілті")
+    events = models.JSONField(default=list, blank=True, verbose_name="Оқиғалар")
+    group = models.ForeignKey(Group, on_delete=models.CASCADE, null=True, blank=True,
+                              related_name='webhooks', verbose_name="Группа")
+    max_concurrency = models.PositiveSmallIntegerField(default=4, verbose_name="Қатар жіберулер шегі")
+    is_active = models.BooleanField(default=True, verbose_name="Белсенді")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Құрылған уақыты")
+    
+    class Meta:
+        verbose_name = "Webhook"
+        verbose_name_plural = "Webhook-тар"
+    
+    def __str__(self):
+        return self.name
+    
+    def accepts(self, event, group_id):
+        return (not self.events or event in self.events) and (self.group_id is None or self.group_id == group_id)
+
+class WebhookDelivery(models.Model):
+    """Жіберілуі күтілетін оқиға (outbox): сәтті жіберілгенде жойылады"""
+    endpoint = models.ForeignKey(WebhookEndpoint, on_delete=models.CASCADE,
+                                 related_name='deliveries', verbose_name="Webhook")
+    event = models.CharField(max_length=20, choices=WebhookEndpoint.EVENT_CHOICES, verbose_name="Оқиға")
+    payload = models.JSONField(verbose_name="Дерек")
+    attempts = models.PositiveIntegerField(default=0, verbose_name="Әрекеттер саны")
+    next_attempt_at = models.DateTimeField(default=timezone.now, verbose_name="Келесі әрекет")
+    last_error = models.TextField(blank=True, verbose_name="Соңғы қате")
+    locked_by = models.CharField(max_length=100, blank=True, editable=False, verbose_name="Алған worker")
+    created_at = models.DateTimeField(default=timezone.now, verbose_name="Құрылған уақыты")
+    
+    class Meta:
+        verbose_name = "Webhook жіберілімі"
+        verbose_name_plural = "Webhook жіберілімдері"
+        indexes = [
+            models.Index(fields=['next_attempt_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.endpoint_id}: {self.event} #{self.pk}"
+
+class WebhookDeadLetter(models.Model):
+    """Барлық әрекеттен кейін жеткізілмеген оқиғалар (қолмен қайта жіберуге болады)"""
+    endpoint = models.ForeignKey(WebhookEndpoint, on_delete=models.CASCADE,
+                                 related_name='dead_letters', verbose_name="Webhook")
+    event = models.CharField(max_length=20, choices=WebhookEndpoint.EVENT_CHOICES, verbose_name="Оқиға")
+    payload = models.JSONField(verbose_name="Дерек")
+    attempts = models.PositiveIntegerField(verbose_name="Әрекеттер саны")
+    last_error = models.TextField(blank=True, verbose_name="Соңғы қате")
+    created_at = models.DateTimeField(verbose_name="Құрылған уақыты")
+    failed_at = models.DateTimeField(default=timezone.now, verbose_name="Тоқтатылған уақыты")
+    
+    class Meta:
+        verbose_name = "Жеткізілмеген webhook"
+        verbose_name_plural = "Жеткізілмеген webhook-тар"
+        ordering = ['-failed_at']
+    
+    def __str__(self):
+        return f"{self.endpoint_id}: {self.event} ({self.last_error[:50]})"
+
+
+class Job(models.Model):
+    """
+    Дерекқордағы фондық тапсырма (core.jobs). Орындалғанда жойылады;
+    алынған тапсырманың run_at-і `timeout`-қа жылжиды (көріну уақыты):
+    worker құласа, тапсырма сол уақыттан кейін қайта алынады.
+    """
+    STATUS_CHOICES = (
+        ('queued', 'Кезекте'),
+        ('failed', 'Сәтсіз'),
+    )
+    
+    name = models.CharField(max_length=200, verbose_name="Тапсырма")
+    payload = models.JSONField(default=dict, blank=True, verbose_name="Аргументтер")
+    priority = models.SmallIntegerField(default=0, verbose_name="Басымдық")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued', verbose_name="Күйі")
+    run_at = models.DateTimeField(default=timezone.now, verbose_name="Орындалу уақыты")
+    attempts = models.PositiveIntegerField(default=0, verbose_name="Әрекеттер саны")
+    max_attempts = models.PositiveSmallIntegerField(default=5, verbose_name="Әрекеттер шегі")
+    timeout = models.PositiveIntegerField(default=300, verbose_name="Көріну уақыты (с)")
+    locked_by = models.CharField(max_length=100, blank=True, verbose_name="Worker")
+    last_error = models.TextField(blank=True, verbose_name="Соңғы қате")
+    created_at = models.DateTimeField(default=timezone.now, verbose_name="Құрылған уақыты")
+    
+    class Meta:
+        verbose_name = "Фондық тапсырма"
+        verbose_name_plural = "Фондық тапсырмалар"
+        indexes = [
+            models.Index(fields=['-priority', 'run_at'], condition=models.Q(status='queued'), name='core_job_due_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.name} #{self.pk}"
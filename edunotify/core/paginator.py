@@ -0,0 +1,181 @@
+"""
+Үлкен кестелерге арналған пагинатор.
+
+Толық `COUNT(*)` орнына жалпы сан келесі ретпен анықталады:
+
+1. Сүзгі қолтаңбасы (SQL + параметрлер) бойынша кэштелген нақты сан
+   (тек үлкен нәтижелер үшін, TTL - ESTIMATED_COUNT_CACHE_TTL).
+2. PostgreSQL: сүзгісіз queryset үшін `pg_class.reltuples`, сүзгілі
+   queryset үшін `EXPLAIN` жоспарындағы жолдар бағасы.
+3. Шектелген санау: `SELECT COUNT(*) FROM (... LIMIT n)`. Нәтиже шектен
+   аз болса - бұл нақты сан, әйтпесе төменгі шек ретінде көрсетіледі.
+
+Бағаланған жағдайда нақты сан фондық ағында есептеліп кэшке жазылады,
+сондықтан кэш бос болса да бірінші бет күтпей ашылады.
+"""
+import hashlib
+import json
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Page, Paginator
+from django.db import connections
+from django.db.models import QuerySet
+from django.utils.formats import number_format
+from django.utils.functional import cached_property
+
+
+def get_estimate_threshold():
+    """Осыдан кіші кестелер/нәтижелер нақты саналады"""
+    return getattr(settings, 'ESTIMATED_COUNT_THRESHOLD', 10000)
+
+
+def get_count_cache_ttl():
+    return getattr(settings, 'ESTIMATED_COUNT_CACHE_TTL', 300)
+
+
+def table_row_estimate(model, using):
+    """pg_class статистикасындағы жолдар саны (белгісіз болса None)"""
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+            [connection.ops.quote_name(model._meta.db_table)],
+        )
+        row = cursor.fetchone()
+    if row is None or row[0] < 0:
+        return None
+    return row[0]
+
+
+def explain_row_estimate(queryset):
+    """PostgreSQL жоспарлаушысының нәтиже жолдарына бағасы"""
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def is_unfiltered(queryset):
+    query = queryset.query
+    return not query.where and not query.distinct and not query.is_sliced and not query.combinator
+
+
+def estimate_count(queryset):
+    """PostgreSQL статистикасы бойынша бағаланған сан, болмаса None"""
+    if not isinstance(queryset, QuerySet):
+        return None
+    if is_unfiltered(queryset):
+        estimate = table_row_estimate(queryset.model, queryset.db)
+    else:
+        estimate = explain_row_estimate(queryset)
+    if estimate is None or estimate < get_estimate_threshold():
+        return None
+    return estimate
+
+
+def count_cache_key(queryset):
+    """
+    Сүзгі қолтаңбасы: SQL және параметрлер. Базаның аты кірмейді -
+    replica_reads кезінде ол әр сұрауда кездейсоқ реплика, ал сан бәрінде бірдей.
+    """
+    sql, params = queryset.order_by().query.sql_with_params()
+    digest = hashlib.sha1(f'{sql}|{params!r}'.encode()).hexdigest()
+    return f'paginator:count:{digest}'
+
+
+def _count_and_cache(queryset, key):
+    try:
+        cache.set(key, queryset.count(), get_count_cache_ttl())
+    finally:
+        cache.delete(f'{key}:pending')
+
+
+def _count_in_thread(queryset, key):
+    """Фондық ағын өз қосылымдарын ашады, сондықтан соңында жабады"""
+    try:
+        _count_and_cache(queryset, key)
+    finally:
+        connections.close_all()
+
+
+def schedule_exact_count(queryset, key):
+    """Нақты санды фондық ағында есептеу (бір сүзгіге бір ғана ағын)"""
+    if not cache.add(f'{key}:pending', 1, get_count_cache_ttl()):
+        return
+    if getattr(settings, 'ESTIMATED_COUNT_BACKGROUND', True):
+        threading.Thread(target=_count_in_thread, args=(queryset.all(), key), daemon=True).start()
+    else:
+        _count_and_cache(queryset.all(), key)
+
+
+class EstimatedPage(Page):
+    @property
+    def nearby_page_numbers(self):
+        """Ағымдағы беттің екі жағындағы бет нөмірлері (page_range бойынша цикл орнына)"""
+        first = max(self.number - 2, 1)
+        last = min(self.number + 2, self.paginator.num_pages)
+        return range(first, last + 1)
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Жалпы санды бағалайтын Paginator.
+
+    `is_estimated` True болса, `count` - шамамен алынған мән; шаблондарда
+    `count_display` ("шамамен N") қолданыңыз.
+    """
+    is_estimated = False
+    _requested_page = 1
+
+    def validate_number(self, number):
+        try:
+            self._requested_page = max(int(number), 1)
+        except (TypeError, ValueError):
+            pass
+        return super().validate_number(number)
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not isinstance(queryset, QuerySet):
+            return super().count
+
+        key = count_cache_key(queryset)
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+        estimate = estimate_count(queryset)
+        if estimate is not None:
+            self.is_estimated = True
+            schedule_exact_count(queryset, key)
+            return estimate
+
+        # Сұралған бетті көрсетуге жеткілікті жолдарды ғана санау
+        limit = max(get_estimate_threshold(), self._requested_page * self.per_page + 1)
+        bounded = queryset.order_by()[:limit].count()
+        if bounded < limit:
+            # Кіші нәтижелер кэштелмейді: оларды санау арзан, ал ескі сан соңғы бетті қысқартып жібереді
+            return bounded
+
+        self.is_estimated = True
+        schedule_exact_count(queryset, key)
+        return bounded
+
+    def _get_page(self, *args, **kwargs):
+        return EstimatedPage(*args, **kwargs)
+
+    @property
+    def count_display(self):
+        total = number_format(self.count, force_grouping=True)
+        return f'шамамен {total}' if self.is_estimated else total
@@ -0,0 +1,225 @@
+"""
+core_notification кестесін created_at бойынша бөлімдеу (тек PostgreSQL).
+
+NOTIFICATION_PARTITIONING қосулы болса, 0012 миграциясы бар кестені
+`PARTITION BY RANGE (created_at)` кестесіне айналдырып, жолдарды DEFAULT
+бөлімге көшіреді; `manage_partitions` әр айға (немесе оқу жартыжылдығына,
+NOTIFICATION_PARTITION_INTERVAL='term') жеке бөлім құрып, жолдарды
+DEFAULT бөлімнен соларға ауыстырады. Әр бөлімнің индекстері кішкентай
+болып қалады; created_at шекарасы бар сұраулар (дайджест, админ панелі)
+тек қажет бөлімдерді оқиды, ал `ORDER BY created_at DESC LIMIT` лента
+сұраулары жаңа бөлімнен бастап реттелген түрде оқылып, ерте тоқтайды.
+
+PostgreSQL-дің шектеулері:
+- бастапқы кілт бөлімдеу кілтін қамтуы керек: PK - (id, created_at),
+  id-дің бірегейлігін identity sequence қамтамасыз етеді;
+- бөлімделген кестеге сілтейтін сыртқы кілт id-ге ғана сілтей алмайды,
+  сондықтан NotificationView/NotificationArchive/NotificationReach
+  FK шектеулері базадан алынады (CASCADE-ті Django өзі орындайды).
+
+`manage.py manage_partitions` алдағы бөлімдерді құрады және ескілерін
+ажыратады (detach) не жояды. Басқа базаларда бәрі әрекетсіз.
+"""
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import connection as default_connection
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+# Жартыжылдықтар басталатын айлар: күзгі (қыркүйек) және көктемгі (ақпан)
+TERM_START_MONTHS = (2, 9)
+DEFAULT_SUFFIX = 'default'
+
+
+def partitioning_enabled(connection=None):
+    connection = connection or default_connection
+    return getattr(settings, 'NOTIFICATION_PARTITIONING', False) and connection.vendor == 'postgresql'
+
+
+def get_interval():
+    return getattr(settings, 'NOTIFICATION_PARTITION_INTERVAL', 'month')
+
+
+def period_start(moment, interval):
+    """`moment` жататын кезеңнің басы (жергілікті уақыт бойынша)"""
+    local = timezone.localtime(moment)
+    if interval == 'term':
+        month = max((m for m in TERM_START_MONTHS if m <= local.month), default=None)
+        year = local.year
+        if month is None:
+            month, year = TERM_START_MONTHS[-1], year - 1
+    else:
+        month, year = local.month, local.year
+    return timezone.make_aware(datetime(year, month, 1))
+
+
+def next_period(start, interval):
+    local = timezone.localtime(start)
+    if interval == 'term':
+        later = [m for m in TERM_START_MONTHS if m > local.month]
+        year, month = (local.year, later[0]) if later else (local.year + 1, TERM_START_MONTHS[0])
+    else:
+        year, month = (local.year + 1, 1) if local.month == 12 else (local.year, local.month + 1)
+    return timezone.make_aware(datetime(year, month, 1))
+
+
+def partition_name(table, start):
+    return f'{table}_p{timezone.localtime(start):%Y_%m}'
+
+
+def plan_partitions(first, last, interval):
+    """`first`-тен `last`-ты қамтитын кезеңге дейінгі (басы, соңы) жұптары"""
+    start = period_start(first, interval)
+    end_at = period_start(last, interval)
+    while start <= end_at:
+        end = next_period(start, interval)
+        yield start, end
+        start = end
+
+
+def _literal(moment):
+    # DDL параметр қабылдамайды; мән өзіміз құрған datetime
+    return f"'{moment.isoformat()}'"
+
+
+def is_partitioned(connection, table):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid '
+            'WHERE c.relname = %s AND pg_table_is_visible(c.oid)',
+            [table],
+        )
+        return cursor.fetchone() is not None
+
+
+def list_partitions(connection, table):
+    """Қосулы бөлімдер: [(атауы, басы, соңы)], DEFAULT бөлімсіз"""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT child.relname, pg_get_expr(child.relpartbound, child.oid) '
+            'FROM pg_inherits i '
+            'JOIN pg_class parent ON parent.oid = i.inhparent '
+            'JOIN pg_class child ON child.oid = i.inhrelid '
+            'WHERE parent.relname = %s AND pg_table_is_visible(parent.oid)',
+            [table],
+        )
+        rows = cursor.fetchall()
+    partitions = []
+    for name, bound in rows:
+        if bound == 'DEFAULT':
+            continue
+        # FOR VALUES FROM ('2025-09-01 00:00:00+05') TO ('2025-10-01 00:00:00+05')
+        lower, upper = bound.split("'")[1], bound.split("'")[3]
+        partitions.append((name, parse_datetime(lower), parse_datetime(upper)))
+    return sorted(partitions, key=lambda partition: partition[1])
+
+
+def create_partition(schema_editor, table, start, end):
+    """Бөлім құру; DEFAULT бөлімде осы ауқымның жолдары болса, оларды көшіру"""
+    quote = schema_editor.quote_name
+    name = partition_name(table, start)
+    default = f'{table}_{DEFAULT_SUFFIX}'
+    bounds = f'FROM ({_literal(start)}) TO ({_literal(end)})'
+    in_range = f'created_at >= {_literal(start)} AND created_at < {_literal(end)}'
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f'SELECT EXISTS (SELECT 1 FROM {quote(default)} WHERE {in_range})')
+        default_has_rows = cursor.fetchone()[0]
+    if not default_has_rows:
+        schema_editor.execute(f'CREATE TABLE {quote(name)} PARTITION OF {quote(table)} FOR VALUES {bounds}')
+        return name
+
+    # DEFAULT бөлімде ауқымның жолдары тұрғанда жаңа бөлім құрылмайды
+    schema_editor.execute(f'ALTER TABLE {quote(table)} DETACH PARTITION {quote(default)}')
+    schema_editor.execute(f'CREATE TABLE {quote(name)} PARTITION OF {quote(table)} FOR VALUES {bounds}')
+    schema_editor.execute(f'INSERT INTO {quote(table)} SELECT * FROM {quote(default)} WHERE {in_range}')
+    schema_editor.execute(f'DELETE FROM {quote(default)} WHERE {in_range}')
+    schema_editor.execute(f'ALTER TABLE {quote(table)} ATTACH PARTITION {quote(default)} DEFAULT')
+    return name
+
+
+def ensure_partitions(schema_editor, model, ahead, now=None):
+    """
+    DEFAULT бөлімдегі ең ескі жолдан ағымдағы және алдағы `ahead` кезеңге
+    дейінгі бөлімдерді құру, құрылғандарын қайтарады
+    """
+    table = model._meta.db_table
+    interval = get_interval()
+    now = now or timezone.now()
+    existing = {start for _, start, _ in list_partitions(schema_editor.connection, table)}
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f'SELECT MIN(created_at) FROM {schema_editor.quote_name(f"{table}_{DEFAULT_SUFFIX}")}')
+        earliest = cursor.fetchone()[0]
+    first = min(earliest, now) if earliest else now
+    last = now
+    for _ in range(ahead):
+        last = next_period(period_start(last, interval), interval)
+    return [
+        create_partition(schema_editor, table, start, end)
+        for start, end in plan_partitions(first, last, interval)
+        if start not in existing
+    ]
+
+
+def subtract_counters(connection, partition):
+    """Бөлімдегі хабарландыруларды сақталған санауыштардан алу (core.counters)"""
+    from .models import CustomUser, Group
+    from .signals import adjust_counter
+
+    quote = connection.ops.quote_name
+    for model, field, column in [
+        (Group, 'notification_count', 'group_id'),
+        (CustomUser, 'notifications_count', 'created_by_id'),
+        (CustomUser, 'archived_notifications_count', 'archived_by_id'),
+    ]:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT {quote(column)}, COUNT(*) FROM {quote(partition)} '
+                f'WHERE {quote(column)} IS NOT NULL GROUP BY {quote(column)}'
+            )
+            for pk, total in cursor.fetchall():
+                adjust_counter(model, pk, field, -total)
+
+
+def detach_partitions(schema_editor, model, before, drop=False):
+    """
+    Соңы `before`-дан ерте бөлімдерді ажырату. Олардағы хабарландырулар
+    тізімдерден жоғалады: тәуелді жолдар (қаралымдар, архив жазбалары,
+    таралым) жойылып, санауыштар азайтылады және өзгерістер ағынына
+    tombstone жазылады. Ажыратылған кесте архив ретінде қалады (`drop`
+    болса, жойылады).
+    """
+    from .changes import record_changes
+
+    table = model._meta.db_table
+    quote = schema_editor.quote_name
+    detached = []
+    for name, start, end in list_partitions(schema_editor.connection, table):
+        if end > before:
+            continue
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute(f'SELECT {quote(model._meta.pk.column)} FROM {quote(name)}')
+            ids = [row[0] for row in cursor.fetchall()]
+        for relation in model._meta.related_objects:
+            related = relation.related_model._meta
+            for offset in range(0, len(ids), 1000):
+                schema_editor.execute(
+                    f'DELETE FROM {quote(related.db_table)} WHERE {quote(relation.field.column)} = ANY(%s)',
+                    [ids[offset:offset + 1000]],
+                )
+        subtract_counters(schema_editor.connection, name)
+        record_changes(ids, 'delete')
+        schema_editor.execute(f'ALTER TABLE {quote(table)} DETACH PARTITION {quote(name)}')
+        if drop:
+            schema_editor.execute(f'DROP TABLE {quote(name)}')
+        detached.append(name)
+    return detached
+
+
+def retention_cutoff(keep, interval, now=None):
+    """Ағымдағыдан бұрынғы `keep` кезеңді сақтағанда, одан ерте бөлімдердің шекарасы"""
+    start = period_start(now or timezone.now(), interval)
+    for _ in range(keep):
+        start = period_start(start - timedelta(days=1), interval)
+    return start
@@ -0,0 +1,168 @@
+"""
+Хабарландырулардың таралымы: аудиторияның қанша бөлігі оқығаны.
+
+Оқу кезінде (notification_detail) екі жиынтық F() өрнектерімен
+жаңартылады: Notification.read_count және NotificationReach-тағы
+(хабарландыру, оқырманның группасы) санауышы. Аналитика NotificationView
+кестесін Group.members-пен қосып санамайды - үлес тек сақталған
+санауыштардан есептеледі (group.member_count немесе жалпы аудитория).
+
+Нақты режимде оқырманның бірегейлігін NotificationView-дағы
+(user, notification) UNIQUE индексі тексереді. Өте үлкен аудиторияда
+REACH_APPROXIMATE қосылады: әр оқу жолын жазудың орнына NotificationReach
+ішіндегі HyperLogLog регистрлері жаңартылады (core.hll) - қайталап оқу
+көп жағдайда тек бір SELECT, сақталатын көлем оқырман санына тәуелсіз.
+
+Аудиторияға админдер мен хабарландырудың авторы кірмейді.
+"""
+from django.conf import settings
+from django.db import IntegrityError, router, transaction
+from django.db.models import Case, Count, F, FloatField, IntegerField, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Cast, Coalesce, NullIf
+
+from edunotify.db_router import unpinned_writes
+from .hll import HyperLogLog
+from .models import CustomUser, Notification, NotificationReach, NotificationView
+from .signals import adjust_counter
+
+
+def approximate_enabled():
+    return getattr(settings, 'REACH_APPROXIMATE', False)
+
+
+def is_audience_member(user, notification):
+    return not user.is_admin and notification.created_by_id != user.pk
+
+
+def record_view(user, notification):
+    """
+    Оқуды тіркеу; таралымға жаңа оқырман қосылса True.
+
+    Бұл жазбалар оқырманды негізгі базаға бекітпейді - әйтпесе бір
+    хабарландыруды ашу тізім беттерін де репликадан алып тастайды.
+    """
+    with unpinned_writes():
+        return _record_view(user, notification)
+
+
+def _record_view(user, notification):
+    if approximate_enabled():
+        return is_audience_member(user, notification) and _add_to_sketch(user, notification)
+
+    _, created = NotificationView.objects.get_or_create(user=user, notification=notification)
+    if not created or not is_audience_member(user, notification):
+        return False
+    adjust_counter(Notification, notification.pk, 'read_count', 1)
+    _increment_reach(notification.pk, user.group_id)
+    return True
+
+
+def _increment_reach(notification_id, group_id):
+    rows = NotificationReach.objects.filter(notification_id=notification_id, group_id=group_id)
+    if rows.update(read_count=F('read_count') + 1):
+        return
+    try:
+        with transaction.atomic():
+            NotificationReach.objects.create(notification_id=notification_id, group_id=group_id, read_count=1)
+    except IntegrityError:
+        # Жолды қатар сұрау бізден бұрын құрды
+        rows.update(read_count=F('read_count') + 1)
+
+
+def _add_to_sketch(user, notification):
+    using = router.db_for_write(NotificationReach)
+    lookup = {'notification_id': notification.pk, 'group_id': user.group_id}
+    # Қайталап оқу регистрлерді өзгертпейді: құлыпсыз тексеріп, жазбай шығамыз
+    current = NotificationReach.objects.using(using).filter(**lookup).values_list('sketch', flat=True).first()
+    if current and not HyperLogLog.from_bytes(current).would_change(user.pk):
+        return False
+
+    with transaction.atomic(using=using):
+        reach, _ = NotificationReach.objects.using(using).select_for_update().get_or_create(**lookup)
+        sketch = HyperLogLog.from_bytes(reach.sketch) if reach.sketch else HyperLogLog()
+        if not sketch.add(user.pk):
+            return False
+        estimate = sketch.count()
+        delta = estimate - reach.read_count
+        reach.sketch = sketch.to_bytes()
+        reach.read_count = estimate
+        reach.save(update_fields=['sketch', 'read_count'])
+        adjust_counter(Notification, notification.pk, 'read_count', delta)
+    return True
+
+
+def general_audience_size():
+    return CustomUser.objects.filter(role='user').count()
+
+
+def audience_size(notification, general_audience=None):
+    if notification.notification_type == 'group':
+        return notification.group.member_count if notification.group else 0
+    return general_audience_size() if general_audience is None else general_audience
+
+
+def share(read_count, audience):
+    return min(read_count / audience, 1.0) if audience else None
+
+
+def least_read_important(limit=10):
+    """Белсенді маңызды хабарландырулар, оқылу үлесі бойынша өсу ретімен"""
+    audience = Case(
+        When(notification_type='group', then=F('group__member_count')),
+        default=Value(general_audience_size()),
+        output_field=IntegerField(),
+    )
+    return list(
+        Notification.objects.filter(is_important=True, status='active')
+        .select_related('group')
+        .annotate(audience=audience)
+        .annotate(reach_share=Cast('read_count', FloatField()) / Cast(NullIf('audience', 0), FloatField()))
+        .order_by(F('reach_share').asc(nulls_last=True), '-created_at')[:limit]
+    )
+
+
+def group_breakdown(notification):
+    """Хабарландыруды оқығандардың группалар бойынша бөлінісі"""
+    rows = NotificationReach.objects.filter(notification=notification).select_related('group').order_by('-read_count')
+    return [
+        {
+            'group': row.group.name if row.group else None,
+            'read_count': row.read_count,
+            'member_count': row.group.member_count if row.group else None,
+            'share': share(row.read_count, row.group.member_count) if row.group else None,
+        }
+        for row in rows
+    ]
+
+
+def rebuild():
+    """
+    Нақты жиынтықтарды NotificationView-дан қайта есептеу. Оқырман
+    қазіргі группасына жатқызылады (оқыған кездегісі сақталмаған).
+    """
+    views = (
+        NotificationView.objects.exclude(user__role='admin')
+        .exclude(user=F('notification__created_by'))
+        .values('notification_id', 'user__group_id')
+        .annotate(total=Count('pk'))
+        .order_by()
+    )
+    total = Coalesce(
+        Subquery(
+            NotificationReach.objects.filter(notification=OuterRef('pk'))
+            .values('notification').annotate(total=Sum('read_count')).values('total'),
+            output_field=IntegerField(),
+        ),
+        0,
+    )
+    with transaction.atomic():
+        NotificationReach.objects.all().delete()
+        NotificationReach.objects.bulk_create(
+            (
+                NotificationReach(notification_id=row['notification_id'], group_id=row['user__group_id'],
+                                  read_count=row['total'])
+                for row in views.iterator()
+            ),
+            batch_size=1000,
+        )
+        return Notification.objects.annotate(actual=total).exclude(read_count=F('actual')).update(read_count=total)
@@ -0,0 +1,220 @@
+"""
+Пайдаланушыларды группалар арасында жаппай ауыстыру, группаларды
+біріктіру және CSV бойынша бөлу.
+
+edit_user пайдаланушыны бір-бірден жүктеп сақтайды; мұнда әр әрекет бір
+транзакцияда тұрақты санды UPDATE-пен орындалады: пайдаланушылар бір
+CASE-UPDATE-пен ауысады, Group.member_count санауыштары тағы бір
+UPDATE-пен түзетіледі. QuerySet.update() сигнал жібермейді, сондықтан
+core.signals орындайтын жұмыс осында қолмен жасалады: санауыштар,
+`users_regrouped` (accounts кэштегі көшірмелерді өшіреді), біріктіруде
+өзгерістер ағыны мен Atom арнасы.
+
+NotificationReach оқырманды оқыған кездегі группасына жатқызады, сондықтан
+пайдаланушыны ауыстыру таралымды өзгертпейді. Біріктіруде хабарландырулар
+жаңа группаға өтетіндіктен, жиынтықтары да көшіріледі.
+"""
+import csv
+from collections import Counter
+from functools import reduce
+from operator import or_
+
+from django.db import transaction
+from django.db.models import Case, Count, F, IntegerField, Q, Value, When
+from django.utils import timezone
+
+from .changes import record_changes
+from .feeds import feed_key, update_on_commit as update_feeds_on_commit
+from .hll import HyperLogLog
+from .models import CustomUser, Group, Notification, NotificationReach, WebhookEndpoint
+from .signals import adjust_counter, users_regrouped
+
+
+class RegroupError(ValueError):
+    """Әрекетті орындау мүмкін емес (деректер өзгертілмеді)"""
+
+
+def _by_pk(values):
+    """{pk: мән} -> CASE өрнегі (басқа жолдарға 0)"""
+    return Case(
+        *[When(pk=pk, then=Value(value)) for pk, value in values.items()],
+        default=Value(0), output_field=IntegerField(),
+    )
+
+
+def _adjust_member_counts(deltas):
+    deltas = {pk: delta for pk, delta in deltas.items() if pk is not None and delta}
+    if deltas:
+        Group.objects.filter(pk__in=deltas).update(member_count=F('member_count') + _by_pk(deltas))
+
+
+def reassign_users(assignments):
+    """
+    {группа (None - группасыз): пайдаланушылар queryset-і} бойынша ауыстыру.
+    Бірнеше queryset-ке кірген пайдаланушы біріншісіне ауысады.
+    Ауыстырылған пайдаланушылардың ID тізімін қайтарады.
+
+    UPDATE queryset-тердің ішкі сұрауларымен сүзіледі: параметрлер саны
+    ауыстырылатын пайдаланушылар санына емес, группалар санына тәуелді.
+    """
+    targets = [(group.pk if group is not None else None, users) for group, users in assignments.items()]
+    if not targets:
+        return []
+    moving, earlier, whens = [], [], []
+    for group_id, users in targets:
+        condition = Q(pk__in=users.order_by().values('pk'))
+        # Басқа группадағы және бұрынғы queryset-терге кірмеген пайдаланушылар
+        move = condition & ~Q(group_id=group_id)
+        if earlier:
+            move &= ~reduce(or_, earlier)
+        moving.append(move)
+        earlier.append(condition)
+        whens.append(When(condition, then=Value(group_id)))
+    moving = reduce(or_, moving)
+    target = Case(*whens, output_field=IntegerField())
+
+    with transaction.atomic():
+        # Жолдарды құлыптау; ID-лер тек кэшті өшіру сигналына керек
+        user_ids = list(CustomUser.objects.select_for_update().filter(moving).values_list('pk', flat=True))
+        if not user_ids:
+            return []
+        deltas = Counter()
+        for group_id, group_target, total in (
+            CustomUser.objects.filter(moving).annotate(target=target).order_by()
+            .values_list('group_id', 'target').annotate(total=Count('pk'))
+        ):
+            deltas[group_id] -= total
+            deltas[group_target] += total
+        CustomUser.objects.filter(moving).update(group_id=target)
+        _adjust_member_counts(deltas)
+        users_regrouped.send(sender=CustomUser, user_ids=user_ids)
+    return user_ids
+
+
+def move_users(users, group):
+    """Пайдаланушыларды (queryset) бір группаға (None - группасыз) ауыстыру"""
+    return reassign_users({group: users})
+
+
+def _merge_reach(source_id, target_id):
+    """Екі группаның таралым жолдарын біріктіру; жуық режимде регистрлер қосылады"""
+    source_rows = NotificationReach.objects.filter(group_id=source_id)
+    overlapping = {
+        row.notification_id: row
+        for row in NotificationReach.objects.select_for_update().filter(
+            group_id=target_id, notification_id__in=source_rows.values('notification_id'),
+        )
+    }
+    if overlapping:
+        read_deltas = {}
+        for notification_id, read_count, sketch in (
+            source_rows.filter(notification_id__in=list(overlapping))
+            .values_list('notification_id', 'read_count', 'sketch')
+        ):
+            row = overlapping[notification_id]
+            total = row.read_count + read_count
+            if row.sketch and sketch:
+                # Екі группаны да оқыған (ауыстырылған) пайдаланушы бір рет саналады
+                merged = HyperLogLog.from_bytes(row.sketch)
+                merged.merge(HyperLogLog.from_bytes(sketch))
+                row.sketch = merged.to_bytes()
+                row.read_count = merged.count()
+                read_deltas[notification_id] = row.read_count - total
+            else:
+                row.read_count = total
+        NotificationReach.objects.bulk_update(overlapping.values(), ['read_count', 'sketch'])
+        source_rows.filter(notification_id__in=list(overlapping)).delete()
+        read_deltas = {pk: delta for pk, delta in read_deltas.items() if delta}
+        if read_deltas:
+            Notification.objects.filter(pk__in=read_deltas).update(read_count=F('read_count') + _by_pk(read_deltas))
+    source_rows.update(group_id=target_id)
+
+
+def merge_groups(source, target):
+    """
+    `source` группасын `target`-ке біріктіру: мүшелер, хабарландырулар,
+    таралым жиынтықтары және webhook жазылымдары ауысады, `source` жойылады.
+    (ауыстырылған пайдаланушылар саны, хабарландырулар саны) қайтарады.
+    """
+    if source.pk == target.pk:
+        raise RegroupError('Группаны өзімен біріктіру мүмкін емес')
+    with transaction.atomic():
+        user_ids = reassign_users({target: CustomUser.objects.filter(group_id=source.pk)})
+
+        notification_ids = list(
+            Notification.objects.select_for_update().filter(group_id=source.pk).values_list('pk', flat=True)
+        )
+        if notification_ids:
+            Notification.objects.filter(group_id=source.pk).update(group_id=target.pk, updated_at=timezone.now())
+            adjust_counter(Group, target.pk, 'notification_count', len(notification_ids))
+            record_changes(notification_ids, 'update')
+            update_feeds_on_commit({feed_key('group', target.pk)})
+        _merge_reach(source.pk, target.pk)
+        WebhookEndpoint.objects.filter(group_id=source.pk).update(group_id=target.pk)
+        # Сигналдар каталогты жаңартып, ескі арнаны өшіреді
+        source.delete()
+    return len(user_ids), len(notification_ids)
+
+
+def read_split_csv(file):
+    """
+    CSV жолдары: [(логин немесе email, группа атауы)]. Тақырып жолында
+    'group' және 'username' немесе 'email' бағандары болуы керек.
+    """
+    reader = csv.DictReader(file)
+    columns = {name.strip().lower(): name for name in reader.fieldnames or ()}
+    user_column = columns.get('username') or columns.get('email')
+    if user_column is None or 'group' not in columns:
+        raise RegroupError("CSV-де 'username' (немесе 'email') және 'group' бағандары болуы керек")
+    rows = []
+    for line, row in enumerate(reader, start=2):
+        user, group = (row[user_column] or '').strip(), (row[columns['group']] or '').strip()
+        if not user or not group:
+            raise RegroupError(f'{line}-жол толық емес')
+        rows.append((user, group))
+    return rows
+
+
+def split_group(source, rows, create_groups=False):
+    """
+    `source` мүшелерін CSV жолдары бойынша группаларға бөлу. Кез келген
+    жол қате болса, ештеңе өзгертілмейді. Ауыстырылғандар саны.
+    """
+    by_group = {}
+    seen = set()
+    for user, group_name in rows:
+        key = user.lower()
+        if key in seen:
+            raise RegroupError(f'Пайдаланушы бірнеше рет көрсетілген: {user}')
+        seen.add(key)
+        by_group.setdefault(group_name, []).append(user)
+
+    with transaction.atomic():
+        groups = {}
+        for group in Group.objects.filter(name__in=by_group):
+            if group.name in groups:
+                raise RegroupError(f'Бұл атаумен бірнеше группа бар: {group.name}')
+            groups[group.name] = group
+        missing = [name for name in by_group if name not in groups]
+        if missing and not create_groups:
+            raise RegroupError(f'Группа табылмады: {", ".join(missing)}')
+        for name in missing:
+            groups[name] = Group.objects.create(name=name)
+
+        members = CustomUser.objects.filter(group_id=source.pk)
+        assignments = {}
+        for name, users in by_group.items():
+            assignments[groups[name]] = members.filter(
+                Q(username__in=[user for user in users if '@' not in user])
+                | Q(email__in=[user for user in users if '@' in user])
+            )
+
+        identifiers = [user for user, _ in rows]
+        found = set()
+        for pair in members.filter(Q(username__in=identifiers) | Q(email__in=identifiers)) \
+                .values_list('username', 'email'):
+            found.update(pair)
+        unknown = sorted(user for user, _ in rows if user not in found)
+        if unknown:
+            raise RegroupError(f'{source.name} группасында жоқ пайдаланушылар: {", ".join(unknown[:10])}')
+        return len(reassign_users(assignments))
@@ -0,0 +1,125 @@
+"""
+Хабарландыруларды жоспар бойынша жариялау және мерзімі өткенде архивтеу.
+
+Жариялану уақыты болашақта болатын хабарландыру `scheduled` статусымен
+сақталады, сондықтан лента сұраулары (`status='active'`) оны қосымша
+шартсыз, бұрынғы индекстермен өткізіп жібереді. Worker (`run_scheduler`)
+келесі уақытты (status, publish_at) / (status, expires_at) индекстерінен
+бір жолмен алып, сол уақытқа дейін ұйықтайды. PostgreSQL-де жаңа
+жоспарланған хабарландыру LISTEN/NOTIFY арқылы worker-ді ерте оятады;
+басқа базаларда ұйқы SCHEDULER_MAX_SLEEP-пен шектеледі.
+
+Белсендірілгенде `created_at` жариялану уақытына ауысады: лента мен
+дайджесттер хабарландыруды жаңа жарияланған ретінде көреді.
+"""
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.utils import timezone
+
+from . import wakeup
+from .changes import record_changes
+from .feeds import feed_key, update_on_commit as update_feeds_on_commit
+from .models import Notification
+from .signals import notification_published
+
+SCHEDULER_CHANNEL = 'edunotify_scheduler'
+EXPIRED_REASON = 'Көрсету мерзімі аяқталды'
+
+
+def get_batch_size():
+    return getattr(settings, 'SCHEDULER_BATCH_SIZE', 500)
+
+
+def get_max_sleep():
+    """Оятусыз ең ұзақ ұйқы (секунд)"""
+    return getattr(settings, 'SCHEDULER_MAX_SLEEP', 60)
+
+
+def activate_due(now=None, batch_size=None):
+    """Уақыты келген хабарландыруларды пакетпен жариялау, санын қайтарады"""
+    now = now or timezone.now()
+    batch_size = batch_size or get_batch_size()
+    activated = 0
+    while True:
+        with transaction.atomic():
+            # Бірнеше worker бір пакетті екі рет жарияламауы үшін
+            batch = list(
+                Notification.objects.select_for_update(skip_locked=True)
+                .filter(status='scheduled', publish_at__lte=now)
+                .order_by('publish_at')[:batch_size]
+            )
+            for notification in batch:
+                notification.status = 'active'
+                notification.created_at = notification.publish_at
+            Notification.objects.bulk_update(batch, ['status', 'created_at'])
+            # bulk_update сигнал жібермейді
+            record_changes([notification.pk for notification in batch], 'publish')
+            update_feeds_on_commit({
+                feed_key(notification.notification_type, notification.group_id) for notification in batch
+            })
+            transaction.on_commit(lambda batch=batch: send_published(batch))
+        activated += len(batch)
+        if len(batch) < batch_size:
+            return activated
+
+
+def send_published(notifications):
+    for notification in notifications:
+        notification_published.send(sender=Notification, notification=notification)
+
+
+def expire_due(now=None, batch_size=None):
+    """Көрсету мерзімі өткен белсенді хабарландыруларды архивтеу"""
+    now = now or timezone.now()
+    batch_size = batch_size or get_batch_size()
+    expired = 0
+    while True:
+        with transaction.atomic():
+            # Қатар жұмыс істейтін scheduler бір жолды екі рет архивтемеуі үшін
+            batch = list(
+                Notification.objects.select_for_update(skip_locked=True)
+                .filter(status='active', expires_at__lte=now)
+                .order_by('expires_at')[:batch_size]
+            )
+            for notification in batch:
+                # archive() архив жазбасын және санауыштарды жаңартады
+                notification.archive(reason=EXPIRED_REASON)
+        expired += len(batch)
+        if len(batch) < batch_size:
+            return expired
+
+
+def next_due_time():
+    """Келесі жариялау немесе архивтеу уақыты (жоқ болса None)"""
+    publish_at = (
+        Notification.objects.filter(status='scheduled')
+        .order_by('publish_at').values_list('publish_at', flat=True).first()
+    )
+    expires_at = (
+        Notification.objects.filter(status='active', expires_at__isnull=False)
+        .order_by('expires_at').values_list('expires_at', flat=True).first()
+    )
+    due = [value for value in (publish_at, expires_at) if value is not None]
+    return min(due) if due else None
+
+
+def seconds_until(due, now=None):
+    """Келесі уақытқа дейінгі ұйқы, SCHEDULER_MAX_SLEEP-тен аспайды"""
+    max_sleep = get_max_sleep()
+    if due is None:
+        return max_sleep
+    return min(max(0.0, (due - (now or timezone.now())).total_seconds()), max_sleep)
+
+
+def notify_schedule_changed(using=DEFAULT_DB_ALIAS):
+    """Worker-ді ояту (core.wakeup)"""
+    wakeup.notify(SCHEDULER_CHANNEL, using)
+
+
+def listen_for_schedule_changes(using=DEFAULT_DB_ALIAS):
+    wakeup.listen(SCHEDULER_CHANNEL, using)
+
+
+def wait_for_schedule_change(timeout, using=DEFAULT_DB_ALIAS):
+    wakeup.wait(SCHEDULER_CHANNEL, timeout, using)
@@ -0,0 +1,59 @@
+"""
+Пайдаланушыларды сервер жағында іздеу.
+
+PostgreSQL-де `pg_trgm` GIN индекстері (0006 миграциясы) UPPER(...) LIKE
+сұрауларын қолдайды, сондықтан ішкі мәтін бойынша (icontains) іздеу
+индексті пайдаланады. SQLite-та префикс (istartswith) іздеуі қолданылады.
+"""
+from django.db import connection
+from django.db.models import Q
+
+USER_SEARCH_FIELDS = ('username', 'email', 'first_name', 'last_name')
+
+USER_SORT_FIELDS = {
+    'date_joined': ('date_joined', 'id'),
+    '-date_joined': ('-date_joined', '-id'),
+    'username': ('username',),
+    '-username': ('-username',),
+    'email': ('email',),
+    '-email': ('-email',),
+    'last_name': ('last_name', 'first_name', 'id'),
+    '-last_name': ('-last_name', '-first_name', '-id'),
+    'last_login': ('last_login', 'id'),
+    '-last_login': ('-last_login', '-id'),
+}
+DEFAULT_USER_SORT = '-date_joined'
+
+
+def uses_trigram_search():
+    return connection.vendor == 'postgresql'
+
+
+def search_users(queryset, query):
+    """Логин, email, аты және тегі бойынша іздеу"""
+    query = query.strip()
+    if not query:
+        return queryset
+    lookup = 'icontains' if uses_trigram_search() else 'istartswith'
+    condition = Q()
+    for field in USER_SEARCH_FIELDS:
+        condition |= Q(**{f'{field}__{lookup}': query})
+    return queryset.filter(condition)
+
+
+def filter_users(queryset, params):
+    """Іздеу, рөл және группа сүзгілері, сұрыптау"""
+    queryset = search_users(queryset, params.get('q', ''))
+
+    role = params.get('role')
+    if role:
+        queryset = queryset.filter(role=role)
+
+    group = params.get('group')
+    if group == 'none':
+        queryset = queryset.filter(group__isnull=True)
+    elif group and group.isdigit():
+        queryset = queryset.filter(group_id=int(group))
+
+    sort = params.get('sort') if params.get('sort') in USER_SORT_FIELDS else DEFAULT_USER_SORT
+    return queryset.order_by(*USER_SORT_FIELDS[sort]), sort
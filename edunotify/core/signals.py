@@ -0,0 +1,191 @@
+"""
+Сақталған санауыштарды (Group.member_count, Group.notification_count,
+CustomUser.notifications_count, CustomUser.archived_notifications_count)
+F() өрнектерімен атомарлы жаңарту.
+
+Әр данада жүктелген кездегі сыртқы кілттер есте сақталады, сондықтан
+пайдаланушыны басқа группаға ауыстыру немесе хабарландыруды архивтеу
+кезінде ескі және жаңа жазбалар бір UPDATE-пен түзетіледі.
+QuerySet.update()/bulk_create() сигнал жібермейді - олардан кейін
+`reconcile_counters` командасын іске қосыңыз.
+
+`notification_published` - хабарландыру оқырмандарға көрінген сәт:
+create_notification-да бірден, жоспарланғандар үшін core.scheduling
+белсендіргенде жіберіледі. Ол, сондай-ақ архивтеу мен қалпына келтіру,
+webhook жазылымдарына кезекке қойылады (core.webhooks).
+
+`users_regrouped` - пайдаланушылар группасы жаппай (UPDATE-пен) ауысқанда
+core.regrouping жібереді: `user_ids` - ауыстырылғандар.
+"""
+from django.db.models import F
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import Signal, receiver
+
+from .catalogue import invalidate_on_change
+from .changes import record_change
+from .feeds import feed_key, update_on_commit as update_feeds_on_commit
+from .models import CustomUser, Group, Notification
+from .webhooks import enqueue as enqueue_webhooks
+
+notification_published = Signal()
+users_regrouped = Signal()
+
+WEBHOOK_EVENTS = {'archive': 'archived', 'restore': 'restored'}
+
+TRACKED_FIELDS = {
+    CustomUser: ('group_id',),
+    Notification: ('group_id', 'created_by_id', 'archived_by_id', 'status', 'notification_type'),
+}
+
+
+def adjust_counter(model, pk, field, delta):
+    """`field` санауышын `delta`-ға атомарлы өзгерту"""
+    if pk is None or not delta:
+        return
+    model.objects.filter(pk=pk).update(**{field: F(field) + delta})
+
+
+def move_counter(model, field, old_pk, new_pk):
+    """Санауышты ескі жазбадан жаңасына ауыстыру"""
+    if old_pk != new_pk:
+        adjust_counter(model, old_pk, field, -1)
+        adjust_counter(model, new_pk, field, 1)
+
+
+def _loaded_value(instance, attname):
+    return instance._counter_snapshot.get(attname)
+
+
+@receiver(post_init, sender=CustomUser)
+@receiver(post_init, sender=Notification)
+def remember_loaded_keys(sender, instance, **kwargs):
+    deferred = instance.get_deferred_fields()
+    instance._counter_snapshot = {
+        attname: getattr(instance, attname)
+        for attname in TRACKED_FIELDS[sender]
+        if attname not in deferred
+    }
+
+
+def _refresh_snapshot(instance):
+    remember_loaded_keys(type(instance), instance)
+
+
+@receiver(post_save, sender=CustomUser)
+def update_member_counts(sender, instance, created, update_fields=None, **kwargs):
+    if created:
+        adjust_counter(Group, instance.group_id, 'member_count', 1)
+    elif 'group_id' in instance._counter_snapshot and (update_fields is None or 'group' in update_fields):
+        move_counter(Group, 'member_count', _loaded_value(instance, 'group_id'), instance.group_id)
+    _refresh_snapshot(instance)
+
+
+@receiver(post_delete, sender=CustomUser)
+def decrement_member_count(sender, instance, **kwargs):
+    adjust_counter(Group, instance.group_id, 'member_count', -1)
+
+
+def change_action(instance, created):
+    """Өзгерістер ағыны үшін әрекет атауы (core.changes)"""
+    if created:
+        return 'create'
+    previous = instance._counter_snapshot.get('status', instance.status)
+    if previous != instance.status:
+        if instance.status == 'archived':
+            return 'archive'
+        if previous == 'archived' and instance.status == 'active':
+            return 'restore'
+        if previous == 'scheduled' and instance.status == 'active':
+            return 'publish'
+    return 'update'
+
+
+# update_notification_counts-тан бұрын тіркелуі керек: ол алдыңғы статусты жаңартады
+@receiver(post_save, sender=Notification)
+def record_notification_change(sender, instance, created, **kwargs):
+    record_change(instance.pk, change_action(instance, created))
+
+
+# Бұл да update_notification_counts-тан бұрын (алдыңғы статус керек)
+@receiver(post_save, sender=Notification)
+def queue_status_webhooks(sender, instance, created, **kwargs):
+    event = WEBHOOK_EVENTS.get(change_action(instance, created))
+    if event:
+        enqueue_webhooks(instance, event)
+
+
+# Алдыңғы группа/түр/статус керек: update_notification_counts-тан бұрын
+@receiver(post_save, sender=Notification)
+def queue_feed_update(sender, instance, created, using, **kwargs):
+    """Хабарландыру көрінетін (бұрын көрінген) Atom арналарын жаңарту (core.feeds)"""
+    keys = set()
+    if instance.status == 'active':
+        keys.add(feed_key(instance.notification_type, instance.group_id))
+    snapshot = instance._counter_snapshot
+    if not created and snapshot.get('status') == 'active':
+        keys.add(feed_key(snapshot.get('notification_type', instance.notification_type),
+                          snapshot.get('group_id', instance.group_id)))
+    if keys:
+        update_feeds_on_commit(keys, using)
+
+
+@receiver(notification_published)
+def queue_published_webhooks(sender, notification, **kwargs):
+    enqueue_webhooks(notification, 'published')
+
+
+@receiver(post_delete, sender=Notification)
+def record_notification_tombstone(sender, instance, **kwargs):
+    record_change(instance.pk, 'delete')
+
+
+@receiver(post_delete, sender=Notification)
+def remove_from_feed(sender, instance, using, **kwargs):
+    if instance.status == 'active':
+        update_feeds_on_commit({feed_key(instance.notification_type, instance.group_id)}, using)
+
+
+@receiver(post_save, sender=Notification)
+def update_notification_counts(sender, instance, created, **kwargs):
+    if created:
+        adjust_counter(Group, instance.group_id, 'notification_count', 1)
+        adjust_counter(CustomUser, instance.created_by_id, 'notifications_count', 1)
+        adjust_counter(CustomUser, instance.archived_by_id, 'archived_notifications_count', 1)
+    else:
+        snapshot = instance._counter_snapshot
+        if 'group_id' in snapshot:
+            move_counter(Group, 'notification_count', snapshot['group_id'], instance.group_id)
+        if 'created_by_id' in snapshot:
+            move_counter(CustomUser, 'notifications_count', snapshot['created_by_id'], instance.created_by_id)
+        if 'archived_by_id' in snapshot:
+            move_counter(CustomUser, 'archived_notifications_count',
+                         snapshot['archived_by_id'], instance.archived_by_id)
+    _refresh_snapshot(instance)
+
+
+@receiver(post_delete, sender=Notification)
+def decrement_notification_counts(sender, instance, **kwargs):
+    adjust_counter(Group, instance.group_id, 'notification_count', -1)
+    adjust_counter(CustomUser, instance.created_by_id, 'notifications_count', -1)
+    adjust_counter(CustomUser, instance.archived_by_id, 'archived_notifications_count', -1)
+
+
+@receiver(post_save, sender=Notification)
+def wake_scheduler(sender, instance, using, **kwargs):
+    """Жаңа жариялау/аяқталу уақыты worker-дің ұйқысын қысқартуы мүмкін"""
+    if instance.status == 'scheduled' or (instance.status == 'active' and instance.expires_at):
+        from .scheduling import notify_schedule_changed
+        notify_schedule_changed(using)
+
+
+@receiver([post_save, post_delete], sender=Group)
+def invalidate_group_catalogue(sender, instance, using, **kwargs):
+    invalidate_on_change(using)
+
+
+# Каталогтан кейін тіркеледі: арна commit-тен кейінгі жаңа каталогпен жазылады
+@receiver([post_save, post_delete], sender=Group)
+def update_group_feed(sender, instance, using, created=False, **kwargs):
+    """Атауы өзгерген группаның арнасын қайта жазу, жойылғанның файлын өшіру"""
+    if not created:
+        update_feeds_on_commit({feed_key('group', instance.pk)}, using)
@@ -0,0 +1,46 @@
+"""
+Сұрау жолынан шығарылатын фондық тапсырмалар (core.jobs).
+
+Тазалау және жиынтықтарды қайта есептеу тапсырмалары қайталауға төзімді.
+Cron-нан: `manage.py enqueue_job core.tasks.compact_changes`.
+"""
+from django.core.files.storage import default_storage
+from django.db import transaction
+
+from .changes import compact
+from .counters import reconcile
+from .feeds import feeds_root, regenerate_all
+from .jobs import job
+from .models import CustomUser, Group, Notification
+from .reach import approximate_enabled, rebuild
+from .uploads import _delete_files
+
+
+@job(priority=-10)
+def delete_files(names):
+    """Ауыстырылған/жойылған файлдарды (default storage) өшіру"""
+    _delete_files(default_storage, names)
+
+
+@job(priority=-20)
+def compact_changes():
+    compact()
+
+
+@job(priority=-20)
+def reconcile_counters():
+    with transaction.atomic():
+        reconcile(Group, CustomUser, Notification)
+
+
+@job(priority=-20, timeout=3600)
+def rebuild_reach():
+    # Жуық режимде оқу жолдары жоқ, қайта есептеу регистрлерді жояды
+    if not approximate_enabled():
+        rebuild()
+
+
+@job(priority=-20)
+def regenerate_feeds():
+    if feeds_root():
+        regenerate_all()
@@ -1,3 +1,1306 @@
-from django.test import TestCase
+import gzip
+import io
+import os
+import shutil
+import tempfile
+import zipfile
+from datetime import datetime, timedelta
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib import admin
+from django.core.cache import cache
+from django.core.management.base import CommandError
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.db.models import Q, signals
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from xml.etree import ElementTree
+
+from edunotify.compression import HtmlMinifyMiddleware, ResponseCompressionMiddleware, brotli, minify_html
+from accounts.backends import CachedModelBackend, user_cache_key
+from edunotify.db_router import (
+    PIN_COOKIE_NAME, PrimaryReplicaRouter, ReplicaPinningMiddleware, read_from_replica, replica_reads,
+)
+from edunotify.static_middleware import PrecompressedStaticMiddleware
+from edunotify.storage import compress_file
+from edunotify.warmup import warm_up
+from . import wakeup
+from .catalogue import get_group, group_catalogue
+from .content import render_content
+from .exports import CONTENT_TYPES, EXPORTS, export_queryset
+from .feeds import feed_filename, feed_url, write_feed
+from .counters import reconcile
+from .hll import HyperLogLog
+from .index_advisor import propose, query_shape
+from .jobs import PermanentJobError, claim, enqueue, execute, job, record_results, requeue_failed, run_batch
+from .webhook_server import WebhookReceiver
+from .webhooks import claim_due, deliver_due, record_results as record_webhook_results, verify
+from .paginator import EstimatedCountPaginator, count_cache_key
+from .partitioning import subtract_counters, next_period, partition_name, period_start, plan_partitions, retention_cutoff
+from .models import (
+    CustomUser, Group, Job, Notification, NotificationChange, NotificationReach, NotificationView, WebhookDeadLetter, WebhookDelivery,
+    WebhookEndpoint,
+)
+from .reach import least_read_important, rebuild, record_view
+from .regrouping import merge_groups, move_users
+from .scheduling import activate_due
+from .signals import notification_published
+from .uploads import delete_files_later
+
+
+@override_settings(REPLICA_DATABASES=['replica_1'])
+class PrimaryReplicaRouterTests(TestCase):
+    databases = {'default', 'replica_1'}
+
+    def setUp(self):
+        self.router = PrimaryReplicaRouter()
+        self.factory = RequestFactory()
+
+    def _run(self, request, view):
+        # Django process_view-ді get_response тізбегінің ішінде шақырады
+        def get_response(req):
+            return middleware.process_view(req, view, (), {}) or view(req)
+
+        middleware = ReplicaPinningMiddleware(get_response)
+        return middleware(request)
+
+    def test_reads_go_to_primary_outside_read_only_views(self):
+        self.assertEqual(self.router.db_for_read(Group), 'default')
+
+    def test_read_only_context_uses_replica(self):
+        with read_from_replica():
+            self.assertEqual(self.router.db_for_read(Group), 'replica_1')
+
+    def test_write_pins_rest_of_request_and_sets_cookie(self):
+        seen = []
+
+        @replica_reads
+        def view(request):
+            seen.append(self.router.db_for_read(Group))
+            self.router.db_for_write(Group)
+            seen.append(self.router.db_for_read(Group))
+            return HttpResponse()
+
+        result = self._run(self.factory.get('/'), view)
+        self.assertEqual(seen, ['replica_1', 'default'])
+        self.assertIn(PIN_COOKIE_NAME, result.cookies)
+
+    def test_pin_cookie_keeps_next_request_on_primary(self):
+        seen = []
+
+        @replica_reads
+        def view(request):
+            seen.append(self.router.db_for_read(Group))
+            return HttpResponse()
+
+        request = self.factory.get('/')
+        request.COOKIES[PIN_COOKIE_NAME] = '9999999999'
+        self._run(request, view)
+        self._run(self.factory.get('/'), view)
+        self._run(self.factory.post('/'), view)
+        self.assertEqual(seen, ['default', 'replica_1', 'default'])
+
+
+class StoredCounterTests(TestCase):
+    def setUp(self):
+        self.group_a = Group.objects.create(name='A')
+        self.group_b = Group.objects.create(name='B')
+        self.author = CustomUser.objects.create_user(
+            username='author', email='author@example.com', group=self.group_a
+        )
+
+    def _counts(self):
+        self.group_a.refresh_from_db()
+        self.group_b.refresh_from_db()
+        self.author.refresh_from_db()
+        return (
+            self.group_a.member_count, self.group_b.member_count,
+            self.group_a.notification_count, self.group_b.notification_count,
+            self.author.notifications_count, self.author.archived_notifications_count,
+        )
+
+    def test_counters_follow_create_move_archive_and_delete(self):
+        notification = Notification.objects.create(
+            title='T', content='C', notification_type='group', group=self.group_a, created_by=self.author
+        )
+        self.assertEqual(self._counts(), (1, 0, 1, 0, 1, 0))
+
+        self.author.group = self.group_b
+        self.author.save()
+        notification.group = self.group_b
+        notification.save()
+        self.assertEqual(self._counts(), (0, 1, 0, 1, 1, 0))
+
+        notification.archive(user=self.author)
+        self.assertEqual(self._counts(), (0, 1, 0, 1, 1, 1))
+        notification.restore()
+        self.assertEqual(self._counts(), (0, 1, 0, 1, 1, 0))
+
+        notification.delete()
+        self.assertEqual(self._counts(), (0, 1, 0, 0, 0, 0))
+
+    def test_full_save_does_not_overwrite_counters(self):
+        stale = Group.objects.get(pk=self.group_a.pk)
+        CustomUser.objects.create_user(username='u2', email='u2@example.com', group=self.group_a)
+        stale.name = 'A2'
+        stale.save()
+        self.assertEqual(self._counts()[0], 2)
+
+    def test_full_save_keeps_default_save_semantics(self):
+        received = []
+
+        def receiver(sender, update_fields, **kwargs):
+            received.append(update_fields)
+
+        signals.post_save.connect(receiver, sender=Group)
+        try:
+            self.group_a.save()
+        finally:
+            signals.post_save.disconnect(receiver, sender=Group)
+        self.assertEqual(received, [None])
+
+        # Жойылған жолды толық save() қайта қосады (Django әдеттегідей)
+        gone = Group.objects.get(pk=self.group_b.pk)
+        Group.objects.filter(pk=gone.pk).delete()
+        gone.save()
+        self.assertTrue(Group.objects.filter(pk=gone.pk).exists())
+
+    def test_reconcile_fixes_drift(self):
+        Group.objects.filter(pk=self.group_a.pk).update(member_count=42)
+        fixed = reconcile(Group, CustomUser, Notification)
+        self.assertEqual(fixed['Group.member_count'], 1)
+        self.assertEqual(self._counts()[0], 1)
+
+
+class UserManagementTests(TestCase):
+    def setUp(self):
+        self.admin = CustomUser.objects.create_user(
+            username='admin', email='admin@example.com', password='pass12345', role='admin'
+        )
+        self.group = Group.objects.create(name='ИС-21')
+        for n in range(60):
+            CustomUser.objects.create_user(
+                username=f'student{n}', email=f's{n}@example.com', group=self.group if n % 2 else None
+            )
+        self.client.login(username='admin', password='pass12345')
+
+    def test_list_is_paginated_and_filtered(self):
+        response = self.client.get('/user-management/')
+        self.assertEqual(len(response.context['users']), 50)
+        self.assertEqual(response.context['total_users'], 61)
+
+        response = self.client.get('/user-management/', {'q': 'student1', 'group': self.group.id})
+        usernames = {user.username for user in response.context['users']}
+        self.assertEqual(usernames, {'student1', 'student11', 'student13', 'student15', 'student17', 'student19'})
+
+    def test_batch_user_api(self):
+        ids = list(CustomUser.objects.filter(role='user').values_list('id', flat=True)[:5])
+        response = self.client.get('/api/users/', {'ids': ','.join(map(str, ids))})
+        self.assertEqual(sorted(user['id'] for user in response.json()['users']), sorted(ids))
+
+
+@override_settings(ESTIMATED_COUNT_THRESHOLD=5, ESTIMATED_COUNT_BACKGROUND=False)
+class EstimatedCountPaginatorTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        Group.objects.bulk_create(Group(name=f'G{n}') for n in range(12))
+
+    def test_small_results_are_counted_exactly(self):
+        paginator = EstimatedCountPaginator(Group.objects.filter(name='G1'), 2)
+        self.assertEqual(paginator.count, 1)
+        self.assertFalse(paginator.is_estimated)
+
+    def test_large_result_uses_bounded_count_then_cached_exact_count(self):
+        first = EstimatedCountPaginator(Group.objects.order_by('name'), 2)
+        first.get_page(1)
+        self.assertEqual(first.count, 5)
+        self.assertEqual(first.count_display, 'шамамен 5')
+
+        second = EstimatedCountPaginator(Group.objects.order_by('-name'), 2)
+        with self.assertNumQueries(0):
+            self.assertEqual(second.count, 12)
+        self.assertFalse(second.is_estimated)
+
+    def test_synchronous_count_keeps_request_connections(self):
+        with mock.patch('core.paginator.connections.close_all') as close_all:
+            EstimatedCountPaginator(Group.objects.order_by('name'), 2).get_page(1)
+        close_all.assert_not_called()
+
+    @override_settings(ESTIMATED_COUNT_THRESHOLD=10000)
+    def test_small_table_falls_back_to_exact_count(self):
+        paginator = EstimatedCountPaginator(Group.objects.order_by('name'), 5)
+        self.assertEqual(paginator.count, 12)
+        self.assertEqual(paginator.count_display, '12')
+        self.assertIsNone(cache.get(count_cache_key(Group.objects.all())))
+
+        paginator = EstimatedCountPaginator(list(range(7)), 5)
+        self.assertEqual((paginator.count, paginator.num_pages), (7, 2))
+        self.assertFalse(paginator.is_estimated)
+
+    def test_cache_key_does_not_depend_on_replica_alias(self):
+        queryset = Group.objects.filter(name__startswith='G')
+        self.assertEqual(count_cache_key(queryset.using('default')), count_cache_key(queryset.using('replica_1')))
+
+    def test_bound_covers_requested_page(self):
+        paginator = EstimatedCountPaginator(Group.objects.all(), 2)
+        page = paginator.get_page(4)
+        self.assertEqual(page.number, 4)
+        self.assertEqual(len(page), 2)
+
+
+class AdminChangelistTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = CustomUser.objects.create_user(
+            username='admin', email='admin@example.com', password='pass12345', role='admin',
+            is_staff=True, is_superuser=True,
+        )
+        self.client.force_login(self.admin)
+
+    def _populate(self, count):
+        now = timezone.now()
+        for _ in range(count):
+            n = Notification.objects.count()
+            group = Group.objects.create(name=f'G{n}')
+            user = CustomUser.objects.create_user(username=f'u{n}', email=f'u{n}@example.com', group=group)
+            notification = Notification.objects.create(
+                title=f'Хабарландыру {n}', content='...', notification_type='group', group=group, created_by=user,
+            )
+            NotificationView.objects.create(user=user, notification=notification)
+            notification.archive(user=user)
+            endpoint = WebhookEndpoint.objects.create(
+                name=f'E{n}', url='https://example.com/hook', secret='s', group=group,
+            )
+            WebhookDeadLetter.objects.create(
+                endpoint=endpoint, event='published', payload={}, attempts=3, created_at=now,
+            )
+            Job.objects.create(name='core.tests.remember', payload={'args': [n]})
+
+    def _changelist_queries(self, model_admin):
+        opts = model_admin.model._meta
+        params = {}
+        if model_admin.date_hierarchy:
+            today = timezone.localdate()
+            params[f'{model_admin.date_hierarchy}__year'] = today.year
+            params[f'{model_admin.date_hierarchy}__month'] = today.month
+        if model_admin.search_fields:
+            params['q'] = 'u'
+        url = reverse(f'admin:{opts.app_label}_{opts.model_name}_changelist')
+        # Бірінші сұрау группа каталогын жүктейді: кэштелген күйді өлшейміз
+        self.client.get(url, params)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200, url)
+        return len(queries)
+
+    def test_changelists_render_with_constant_queries(self):
+        model_admins = [ma for model, ma in admin.site._registry.items() if model._meta.app_label == 'core']
+        self._populate(2)
+        small = {ma: self._changelist_queries(ma) for ma in model_admins}
+        self._populate(5)
+        for model_admin in model_admins:
+            queries = self._changelist_queries(model_admin)
+            # Жол саны өскенде сұраулар саны өспейді (N+1 жоқ)
+            self.assertEqual(queries, small[model_admin], model_admin)
+            self.assertLessEqual(queries, 5, model_admin)
+
+
+@override_settings(ROOT_URLCONF='edunotify.urls_asgi')
+class AsyncViewTests(TestCase):
+    def setUp(self):
+        self.group = Group.objects.create(name='ИС-21')
+        self.admin = CustomUser.objects.create_user(username='admin', email='admin@example.com', role='admin')
+        self.student = CustomUser.objects.create_user(
+            username='student', email='student@example.com', group=self.group
+        )
+        for n in range(12):
+            Notification.objects.create(
+                title=f'Хабарландыру {n}', content='Мазмұны', notification_type='group',
+                group=self.group, created_by=self.admin,
+            )
+
+    async def test_admin_pages_render_without_sync_queries(self):
+        await sync_to_async(self.async_client.force_login)(self.admin)
+        response = await self.async_client.get('/')
+        self.assertEqual(len(response.context['notifications']), 5)
+        self.assertEqual(response.context['total_users'], 2)
+
+        response = await self.async_client.get('/admin-dashboard/')
+        self.assertEqual(response.context['group_count'], 12)
+        self.assertEqual(len(response.context['recent_users']), 2)
+
+        response = await self.async_client.get('/notifications/', {'page': 2})
+        self.assertEqual(len(response.context['notifications']), 2)
+        self.assertEqual(len(response.context['groups']), 1)
+
+    async def test_list_context_matches_sync_view(self):
+        await sync_to_async(self.async_client.force_login)(self.admin)
+        response = await self.async_client.get('/notifications/', {'page': 2})
+        with override_settings(ROOT_URLCONF='edunotify.urls'):
+            await sync_to_async(self.client.force_login)(self.admin)
+            sync_response = await sync_to_async(self.client.get)('/notifications/', {'page': 2})
+        self.assertEqual(set(response.context.keys()), set(sync_response.context.keys()))
+        self.assertEqual(list(response.context['page_obj']), list(sync_response.context['page_obj']))
+
+    async def test_student_feed_and_access_checks(self):
+        await sync_to_async(self.async_client.force_login)(self.student)
+        response = await self.async_client.get('/notifications/')
+        self.assertEqual(len(response.context['notifications']), 10)
+        self.assertIsNone(response.context['groups'])
+
+        response = await self.async_client.get('/admin-dashboard/')
+        self.assertEqual(response.status_code, 302)
+
+
+class PrecompressedStaticMiddlewareTests(TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        os.makedirs(os.path.join(self.root, 'css'))
+        self.name = 'css/base.0123456789ab.css'
+        with open(os.path.join(self.root, self.name), 'w') as f:
+            f.write('body { color: red; }\n' * 100)
+        compress_file(os.path.join(self.root, self.name))
+        self.factory = RequestFactory()
+
+    def _get(self, path, **headers):
+        with override_settings(STATIC_ROOT=self.root):
+            middleware = PrecompressedStaticMiddleware(lambda request: HttpResponse('app'))
+        return middleware(self.factory.get(path, headers=headers))
+
+    def test_serves_gzip_variant_with_immutable_cache(self):
+        response = self._get(f'/static/{self.name}', accept_encoding='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        body = b''.join(response.streaming_content)
+        self.assertEqual(gzip.decompress(body).decode(), 'body { color: red; }\n' * 100)
+
+    def test_identity_and_not_modified(self):
+        response = self._get(f'/static/{self.name}', accept_encoding='gzip;q=0')
+        self.assertNotIn('Content-Encoding', response)
+        response = self._get(f'/static/{self.name}', if_none_match=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_unknown_paths_fall_through(self):
+        self.assertEqual(self._get('/static/missing.css').content, b'app')
+        self.assertEqual(self._get('/static/../secret').content, b'app')
+
+
+class ResponseCompressionTests(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def _compress(self, response, accept_encoding):
+        middleware = ResponseCompressionMiddleware(lambda request: response)
+        return middleware(self.factory.get('/', headers={'accept-encoding': accept_encoding}))
+
+    def test_minify_keeps_preformatted_blocks(self):
+        html = (
+            '<div>\n    <p>  Мәтін  </p>\n\n    <!-- түсініктеме -->\n'
+            '<pre>  a\n    b</pre><textarea>\n  x</textarea><script>if (a  <  b) {\n  f();\n}</script></div>'
+        )
+        self.assertEqual(
+            minify_html(html),
+            '<div>\n<p> Мәтін </p>\n'
+            '<pre>  a\n    b</pre><textarea>\n  x</textarea><script>if (a  <  b) {\n  f();\n}</script></div>',
+        )
+
+    def test_minify_keeps_attribute_values(self):
+        html = '<input  type="hidden"\n   value="a    b"  title=\'x  >  y\'>\n  <p>don\'t   stop</p>'
+        self.assertEqual(
+            minify_html(html),
+            '<input type="hidden"\nvalue="a    b" title=\'x  >  y\'>\n<p>don\'t stop</p>',
+        )
+
+    def test_html_is_minified_before_compression(self):
+        middleware = HtmlMinifyMiddleware(lambda request: HttpResponse('<p>\n        x\n    </p>'))
+        self.assertEqual(middleware(self.factory.get('/')).content, b'<p>\nx\n</p>')
+
+    def test_negotiates_brotli_then_gzip(self):
+        body = 'хабарландыру ' * 200
+        response = self._compress(HttpResponse(body), 'gzip, br')
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+
+        response = self._compress(HttpResponse(body), 'gzip, br;q=0')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content).decode(), body)
+        self.assertEqual(int(response['Content-Length']), len(response.content))
+
+    def test_brotli_output_length_is_padded(self):
+        body = 'хабарландыру ' * 200
+        responses = [self._compress(HttpResponse(body), 'br') for _ in range(20)]
+        self.assertTrue(all(brotli.decompress(r.content).decode() == body for r in responses))
+        self.assertGreater(len({len(r.content) for r in responses}), 1)
+
+        chunks = (f'{n},хабарландыру\n' * 50 for n in range(20))
+        response = self._compress(StreamingHttpResponse(chunks, content_type='text/csv'), 'br')
+        body = brotli.decompress(b''.join(response.streaming_content)).decode()
+        self.assertEqual(body, ''.join(f'{n},хабарландыру\n' * 50 for n in range(20)))
+
+    def test_small_and_binary_responses_are_left_alone(self):
+        response = self._compress(HttpResponse('кішкентай'), 'gzip')
+        self.assertNotIn('Content-Encoding', response)
+        response = self._compress(HttpResponse(b'\x00' * 2000, content_type='image/png'), 'gzip')
+        self.assertNotIn('Content-Encoding', response)
+
+    def test_streaming_response_is_compressed_incrementally(self):
+        chunks = (f'{n},хабарландыру\n' * 50 for n in range(20))
+        response = self._compress(StreamingHttpResponse(chunks, content_type='text/csv'), 'gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertNotIn('Content-Length', response)
+        body = gzip.decompress(b''.join(response.streaming_content)).decode()
+        self.assertEqual(body, ''.join(f'{n},хабарландыру\n' * 50 for n in range(20)))
+
+
+class StartupTests(TestCase):
+    def test_warm_up_compiles_every_project_template(self):
+        root = settings.TEMPLATES[0]['DIRS'][0]
+        names = {
+            os.path.relpath(os.path.join(directory, name), root)
+            for directory, _, files in os.walk(root) for name in files if name.endswith(('.html', '.txt'))
+        }
+        with override_settings(TEMPLATE_WARMUP=False):
+            self.assertIsNone(warm_up())
+        with override_settings(TEMPLATE_WARMUP=True):
+            compiled, _, errors = warm_up()
+        self.assertEqual(errors, [])
+        self.assertEqual(compiled, len(names))
+
+    def test_template_syntax_error_is_reported(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        with open(os.path.join(directory, 'broken.html'), 'w') as file:
+            file.write('{% if %}')
+        templates = [{**settings.TEMPLATES[0], 'DIRS': [directory]}]
+        with override_settings(TEMPLATES=templates, TEMPLATE_WARMUP=True), self.assertLogs('edunotify.warmup', 'ERROR'):
+            compiled, _, errors = warm_up()
+        self.assertEqual((compiled, [name for name, _ in errors]), (0, ['broken.html']))
+
+    def test_profile_startup_reports_phases_and_imports(self):
+        out, err = io.StringIO(), io.StringIO()
+        call_command('profile_startup', '--top', '3', stdout=out, stderr=err)
+        self.assertEqual(err.getvalue(), '')
+        output = out.getvalue()
+        self.assertIn('django.setup()', output)
+        self.assertRegex(output, r'templates \(\d+\)')
+        self.assertIn('Барлық импорт', output)
+
+
+class ReachTests(TestCase):
+    def setUp(self):
+        self.group = Group.objects.create(name='A')
+        self.admin = CustomUser.objects.create_user(username='admin', email='admin@example.com', role='admin')
+        self.students = [
+            CustomUser.objects.create_user(username=f's{i}', email=f's{i}@example.com', group=self.group)
+            for i in range(4)
+        ]
+        self.outsider = CustomUser.objects.create_user(username='outsider', email='outsider@example.com')
+        self.general = Notification.objects.create(
+            title='Жалпы', content='...', is_important=True, created_by=self.admin
+        )
+        self.for_group = Notification.objects.create(
+            title='Группаға', content='...', notification_type='group', group=self.group,
+            is_important=True, created_by=self.admin,
+        )
+
+    def _reach(self, notification, group):
+        return NotificationReach.objects.get(notification=notification, group=group).read_count
+
+    def test_rollups_count_each_audience_member_once(self):
+        self.assertTrue(record_view(self.students[0], self.general))
+        self.assertFalse(record_view(self.students[0], self.general))
+        self.assertFalse(record_view(self.admin, self.general))
+        record_view(self.outsider, self.general)
+        record_view(self.students[1], self.for_group)
+
+        self.general.refresh_from_db()
+        self.assertEqual(self.general.read_count, 2)
+        self.assertEqual(self._reach(self.general, self.group), 1)
+        self.assertEqual(self._reach(self.general, None), 1)
+
+        # Толық save() санауышты ескі мәнмен қайта жазбайды
+        stale = Notification.objects.get(pk=self.for_group.pk)
+        record_view(self.students[2], self.for_group)
+        stale.title = 'Жаңа тақырып'
+        stale.save()
+        self.assertEqual(Notification.objects.get(pk=self.for_group.pk).read_count, 2)
+
+        NotificationReach.objects.all().delete()
+        Notification.objects.update(read_count=0)
+        self.assertEqual(rebuild(), 2)
+        self.assertEqual(self._reach(self.for_group, self.group), 2)
+
+    def test_least_read_important_orders_by_share(self):
+        for student in self.students[:3]:
+            record_view(student, self.for_group)
+        record_view(self.outsider, self.general)
+
+        # Жалпы: 1/5, группалық: 3/4
+        notifications = least_read_important()
+        self.assertEqual([n.pk for n in notifications], [self.general.pk, self.for_group.pk])
+        self.assertAlmostEqual(notifications[1].reach_share, 0.75)
+
+        self.client.force_login(self.admin)
+        response = self.client.get('/notifications/reach/least-read/', {'limit': 1})
+        self.assertEqual([n['id'] for n in response.json()['notifications']], [self.general.pk])
+        self.client.force_login(self.outsider)
+        self.assertEqual(self.client.get('/notifications/reach/least-read/').status_code, 403)
+
+    @override_settings(REACH_APPROXIMATE=True)
+    def test_approximate_mode_uses_sketch(self):
+        for student in self.students + self.students:
+            record_view(student, self.for_group)
+        self.assertEqual(Notification.objects.get(pk=self.for_group.pk).read_count, 4)
+        self.assertIsNotNone(NotificationReach.objects.get(notification=self.for_group).sketch)
+
+    def test_hyperloglog_estimate(self):
+        sketch = HyperLogLog()
+        for value in range(20000):
+            sketch.add(value)
+        self.assertFalse(sketch.add(5))
+        self.assertAlmostEqual(sketch.count(), 20000, delta=20000 * 0.05)
+
+        other = HyperLogLog()
+        for value in range(10000, 30000):
+            other.add(value)
+        sketch.merge(HyperLogLog.from_bytes(other.to_bytes()))
+        self.assertAlmostEqual(sketch.count(), 30000, delta=30000 * 0.05)
+
+
+class GroupCatalogueTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.group_b = Group.objects.create(name='B')
+        self.group_a = Group.objects.create(name='A')
+        self.admin = CustomUser.objects.create_user(
+            username='admin', email='admin@example.com', role='admin', group=self.group_a
+        )
+        self.notification = Notification.objects.create(title='Тест', content='...', created_by=self.admin)
+        self.client.force_login(self.admin)
+
+    def _group_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get(url).status_code, 200)
+        return [query['sql'] for query in queries if 'FROM "core_group"' in query['sql']]
+
+    def test_warm_pages_make_no_group_queries(self):
+        group_catalogue()
+        for url in ['/profile/', '/notifications/create/', f'/notifications/{self.notification.pk}/edit/',
+                    '/user-management/', '/register/', '/notifications/']:
+            self.assertEqual(self._group_queries(url), [], url)
+
+    def test_save_and_delete_replace_snapshot(self):
+        self.assertEqual([group.name for group in group_catalogue()], ['A', 'B'])
+        with self.assertNumQueries(0):
+            group_catalogue()
+
+        self.group_b.name = 'Ә'
+        self.group_b.save()
+        self.assertEqual([group.name for group in group_catalogue()], ['A', 'Ә'])
+        self.group_a.delete()
+        self.assertEqual([group.name for group in group_catalogue()], ['Ә'])
+        self.assertIsNone(get_group(self.group_a.pk))
+        self.assertIsNone(get_group('abc'))
+
+    @override_settings(REPLICA_DATABASES=['replica_1'])
+    def test_snapshot_is_loaded_from_primary_in_replica_views(self):
+        seen = []
+        db_for_read = PrimaryReplicaRouter.db_for_read
+
+        def spy(router, model, **hints):
+            seen.append(db_for_read(router, model, **hints))
+            return seen[-1]
+
+        with read_from_replica(), mock.patch.object(PrimaryReplicaRouter, 'db_for_read', spy):
+            self.assertEqual([group.name for group in group_catalogue()], ['A', 'B'])
+        self.assertEqual(set(seen), {'default'})
+
+    def test_notification_form_validates_against_catalogue(self):
+        response = self.client.post('/notifications/create/', {
+            'title': 'Группаға', 'content': '...', 'notification_type': 'group', 'group': self.group_b.pk,
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Notification.objects.get(title='Группаға').group, self.group_b)
+
+        response = self.client.post('/notifications/create/', {
+            'title': 'Қате', 'content': '...', 'notification_type': 'group', 'group': 999999,
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Notification.objects.filter(title='Қате').exists())
+
+
+class ContentRenderingTests(TestCase):
+    def setUp(self):
+        self.admin = CustomUser.objects.create_user(
+            username='admin', email='admin@example.com', password='pass12345', role='admin'
+        )
+
+    def test_sanitizer_keeps_links_and_lists_only(self):
+        html, excerpt = render_content(
+            'Сәлем!\nЕкінші жол\n\n<a href="https://example.com/?a=1&b=2" onclick="x()">сілтеме</a> '
+            '<a href="javascript:alert(1)">зиянды</a><script>alert(1)</script><img src=x onerror=alert(1)>\n'
+            '<ul><li>бір</li><li><strong>екі</strong></li></ul>'
+        )
+        self.assertEqual(
+            html,
+            '<p>Сәлем!<br>Екінші жол</p>'
+            '<p><a href="https://example.com/?a=1&amp;b=2" rel="nofollow noopener noreferrer">сілтеме</a> '
+            '<a>зиянды</a></p><ul><li>бір</li><li><strong>екі</strong></li></ul>',
+        )
+        self.assertEqual(excerpt, 'Сәлем! Екінші жол сілтеме зиянды бір екі')
+        self.assertEqual(render_content('5 < 6 & <b>7</b>')[0], '<p>5 &lt; 6 &amp; <b>7</b></p>')
+
+    def test_unclosed_tags_are_closed_once(self):
+        self.assertEqual(render_content('<b>x')[0], '<p><b>x</b></p>')
+        self.assertEqual(render_content('<b>x\n\ny')[0], '<p><b>x</b></p><p><b>y</b></p>')
+        self.assertEqual(render_content('<ul><li><em>x')[0], '<ul><li><em>x</em></li></ul>')
+
+    def test_rendered_on_save_and_backfilled(self):
+        notification = Notification.objects.create(title='Тест', content='x' * 200, created_by=self.admin)
+        self.assertEqual(notification.content_html, f'<p>{"x" * 200}</p>')
+        self.assertEqual(notification.excerpt, 'x' * 147 + '...')
+
+        notification.content = '<em>жаңа</em>'
+        notification.save(update_fields=['content'])
+        notification.refresh_from_db()
+        self.assertEqual((notification.content_html, notification.excerpt), ('<p><em>жаңа</em></p>', 'жаңа'))
+
+        Notification.objects.update(content_html='', excerpt='')
+        self.assertEqual(Notification.objects.get().short_content, 'жаңа')
+        # backfill_content-ке дейін бет бастапқы мазмұнды көрсетеді
+        self.client.force_login(self.admin)
+        self.assertContains(self.client.get(f'/notifications/{notification.pk}/'), '&lt;em&gt;жаңа&lt;/em&gt;')
+        call_command('backfill_content', chunk_size=1, stdout=io.StringIO())
+        notification.refresh_from_db()
+        self.assertEqual(notification.content_html, '<p><em>жаңа</em></p>')
+
+    def test_pages_serve_stored_html(self):
+        notification = Notification.objects.create(
+            title='Тест', content='<a href="/notifications/">тізім</a>', created_by=self.admin
+        )
+        self.client.force_login(self.admin)
+        self.assertContains(self.client.get(f'/notifications/{notification.pk}/'), notification.content_html, html=True)
+        self.assertContains(self.client.get('/notifications/'), 'тізім')
+
+
+class PartitioningTests(TestCase):
+    def local(self, *args):
+        return timezone.make_aware(datetime(*args))
+
+    def test_month_periods(self):
+        start = period_start(self.local(2025, 12, 31, 23, 30), 'month')
+        self.assertEqual(start, self.local(2025, 12, 1))
+        self.assertEqual(next_period(start, 'month'), self.local(2026, 1, 1))
+        self.assertEqual(partition_name('core_notification', start), 'core_notification_p2025_12')
+
+    def test_term_periods(self):
+        self.assertEqual(period_start(self.local(2026, 1, 15), 'term'), self.local(2025, 9, 1))
+        self.assertEqual(period_start(self.local(2026, 5, 1), 'term'), self.local(2026, 2, 1))
+        self.assertEqual(next_period(self.local(2026, 2, 1), 'term'), self.local(2026, 9, 1))
+        self.assertEqual(next_period(self.local(2025, 9, 1), 'term'), self.local(2026, 2, 1))
+
+    def test_plan_covers_range_without_gaps(self):
+        plan = list(plan_partitions(self.local(2025, 11, 20), self.local(2026, 2, 3), 'month'))
+        self.assertEqual([start.month for start, _ in plan], [11, 12, 1, 2])
+        for (_, end), (start, _) in zip(plan, plan[1:]):
+            self.assertEqual(end, start)
+
+    def test_retention_cutoff(self):
+        now = self.local(2026, 3, 10)
+        self.assertEqual(retention_cutoff(0, 'month', now), self.local(2026, 3, 1))
+        self.assertEqual(retention_cutoff(2, 'month', now), self.local(2026, 1, 1))
+        self.assertEqual(retention_cutoff(1, 'term', now), self.local(2025, 9, 1))
+
+    def test_detached_rows_are_subtracted_from_counters(self):
+        group = Group.objects.create(name='G')
+        author = CustomUser.objects.create_user(username='author', email='author@example.com')
+        kept = Notification.objects.create(title='Қалады', content='...', created_by=author)
+        for _ in range(2):
+            Notification.objects.create(
+                title='Ескі', content='...', notification_type='group', group=group, created_by=author,
+            ).archive(user=author)
+        # Бөлімнің орнына ескі жолдар ғана бар кесте
+        with connection.cursor() as cursor:
+            cursor.execute('CREATE TABLE old_part AS SELECT * FROM core_notification WHERE id <> %s', [kept.pk])
+        subtract_counters(connection, 'old_part')
+        group.refresh_from_db()
+        author.refresh_from_db()
+        self.assertEqual(
+            (group.notification_count, author.notifications_count, author.archived_notifications_count), (0, 1, 0),
+        )
+
+    def test_command_is_noop_without_postgresql(self):
+        out = io.StringIO()
+        call_command('manage_partitions', '--retain', '6', stdout=out)
+        self.assertIn('әрекет жоқ', out.getvalue())
+
+
+class IndexAdvisorTests(TestCase):
+    def setUp(self):
+        self.group = Group.objects.create(name='Топ')
+        self.admin = CustomUser.objects.create_user(
+            username='admin', email='admin@example.com', password='pass12345', role='admin'
+        )
+        self.user = CustomUser.objects.create_user(
+            username='student', email='student@example.com', password='pass12345', group=self.group
+        )
+        Notification.objects.create(title='Тест', content='Мазмұн', created_by=self.admin)
+        Notification.objects.create(title='Ескі', content='Мазмұн', created_by=self.admin).archive(self.user)
+
+    def shape(self, queryset):
+        with CaptureQueriesContext(connection) as queries:
+            list(queryset)
+        return query_shape(queries.captured_queries[-1]['sql'])
+
+    def test_archive_list_gets_partial_index(self):
+        shape = self.shape(
+            Notification.objects.filter(status='archived', archived_by=self.user).order_by('-archive_date')
+        )
+        self.assertEqual(shape.equal, {'status': 'archived', 'archived_by': self.user.pk})
+        self.assertEqual(shape.order, ['-archive_date'])
+        index = propose(shape)
+        self.assertEqual(index.fields, ['archived_by', '-archive_date'])
+        self.assertEqual(index.condition, Q(status='archived'))
+
+    def test_covered_and_or_queries_get_no_proposal(self):
+        # (status, created_at) индексі артқа қарай оқылады
+        self.assertIsNone(propose(self.shape(Notification.objects.filter(status='active').order_by('-created_at'))))
+        shape = self.shape(Notification.objects.filter(
+            Q(notification_type='general') | Q(group=self.group), status='active'
+        ).order_by('-created_at'))
+        self.assertEqual(shape.equal, {'status': 'active'})
+        self.assertIsNone(propose(shape))
+
+    def test_command_replays_views(self):
+        out = io.StringIO()
+        call_command('advise_indexes', stdout=out)
+        output = out.getvalue()
+        self.assertIn('SELECT талданды', output)
+        self.assertIn("'-archive_date'", output)
+
+
+class WebhookTests(TestCase):
+    def setUp(self):
+        self.group = Group.objects.create(name='Топ')
+        self.other_group = Group.objects.create(name='Басқа')
+        self.admin = CustomUser.objects.create_user(
+            username='admin', email='admin@example.com', password='pass12345', role='admin'
+        )
+        self.notification = Notification.objects.create(
+            title='Тест', content='Мазмұн', notification_type='group', group=self.group, created_by=self.admin,
+        )
+
+    def endpoint(self, url='http://127.0.0.1:9/hook', **kwargs):
+        return WebhookEndpoint.objects.create(name='LMS', url=url, secret='s3cret', **kwargs)
+
+    def test_events_are_queued_for_matching_subscriptions(self):
+        everything = self.endpoint()
+        published_only = self.endpoint(group=self.group, events=['published'])
+        self.endpoint(group=self.other_group)
+        self.endpoint(is_active=False)
+
+        notification_published.send(sender=Notification, notification=self.notification)
+        self.notification.archive(self.admin)
+        self.notification.restore()
+        self.notification.save()
+
+        queued = sorted(WebhookDelivery.objects.values_list('endpoint_id', 'event'))
+        self.assertEqual(queued, sorted([
+            (everything.pk, 'published'), (published_only.pk, 'published'),
+            (everything.pk, 'archived'), (everything.pk, 'restored'),
+        ]))
+        payload = WebhookDelivery.objects.filter(event='archived').get().payload
+        self.assertEqual(payload['notification']['id'], self.notification.pk)
+        self.assertEqual(payload['notification']['status'], 'archived')
+
+    def test_concurrent_signed_delivery_over_pooled_connections(self):
+        with WebhookReceiver(latency=0.05) as receiver:
+            endpoint = self.endpoint(receiver.url, max_concurrency=3)
+            for _ in range(9):
+                notification_published.send(sender=Notification, notification=self.notification)
+            result = deliver_due()
+
+        self.assertEqual(result['delivered'], 9)
+        self.assertFalse(WebhookDelivery.objects.exists())
+        self.assertEqual(len(receiver.requests), 9)
+        self.assertEqual(receiver.max_in_flight, 3)
+        self.assertEqual(receiver.connections, 3)
+        _, headers, body = receiver.requests[0]
+        self.assertEqual(headers['X-EduNotify-Event'], 'published')
+        self.assertTrue(verify(endpoint.secret, headers['X-EduNotify-Signature'], body))
+        self.assertFalse(verify('басқа', headers['X-EduNotify-Signature'], body))
+
+    @override_settings(WEBHOOK_MAX_ATTEMPTS=2, WEBHOOK_RETRY_BASE=10)
+    def test_retries_with_backoff_then_dead_letter(self):
+        with WebhookReceiver(statuses=[503, 410, 503]) as receiver:
+            self.endpoint(receiver.url)
+            notification_published.send(sender=Notification, notification=self.notification)
+            notification_published.send(sender=Notification, notification=self.notification)
+
+            started = timezone.now()
+            self.assertEqual(deliver_due(), {'claimed': 2, 'delivered': 0, 'retried': 1, 'dead': 1})
+            retry = WebhookDelivery.objects.get()
+            self.assertEqual((retry.attempts, retry.last_error), (1, 'HTTP 503'))
+            delay = (retry.next_attempt_at - started).total_seconds()
+            self.assertTrue(5 <= delay <= 11, delay)
+            self.assertEqual(deliver_due()['claimed'], 0)
+
+            self.assertEqual(deliver_due(now=retry.next_attempt_at)['dead'], 1)
+
+        self.assertFalse(WebhookDelivery.objects.exists())
+        errors = sorted(WebhookDeadLetter.objects.values_list('attempts', 'last_error'))
+        self.assertEqual(errors, [(1, 'HTTP 410'), (2, 'HTTP 503')])
+
+
+    @override_settings(WEBHOOK_TIMEOUT=10, WEBHOOK_MAX_CONCURRENCY=50)
+    def test_lease_covers_batch_and_stale_results_are_ignored(self):
+        self.endpoint(max_concurrency=4)
+        for _ in range(8):
+            notification_published.send(sender=Notification, notification=self.notification)
+        now = timezone.now()
+        first = claim_due(now, 500, worker='w1')
+        # 8 / 4 = 2 кезек endpoint-ке + 1 жалпы кезек, әрқайсысы 3 * timeout
+        lease = WebhookDelivery.objects.values_list('next_attempt_at', flat=True).first()
+        self.assertEqual(lease, now + timedelta(seconds=90))
+
+        second = claim_due(lease, 500, worker='w2')
+        self.assertEqual(len(second), 8)
+        # w1 кешігіп аяқтады: w2 ұстап тұрған жазбаларға тиіспейді
+        self.assertEqual(record_webhook_results([(delivery, 200, '') for delivery in first], now), (0, 0, 0))
+        self.assertEqual(record_webhook_results([(delivery, 503, 'HTTP 503') for delivery in first], now), (0, 0, 0))
+        self.assertEqual(WebhookDelivery.objects.filter(attempts=0).count(), 8)
+        self.assertEqual(record_webhook_results([(delivery, 200, '') for delivery in second], now), (8, 0, 0))
+        self.assertFalse(WebhookDelivery.objects.exists())
+
+
+class StaticFeedTests(TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        overrides = override_settings(FEEDS_ROOT=self.root, SITE_URL='https://edu.example.com')
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        self.group = Group.objects.create(name='ИС-21')
+        self.other_group = Group.objects.create(name='ИС-22')
+        self.admin = CustomUser.objects.create_user(
+            username='admin', email='admin@example.com', password='pass12345', role='admin'
+        )
+
+    def read(self, key):
+        with open(os.path.join(self.root, feed_filename(key)), encoding='utf-8') as file:
+            return file.read()
+
+    def exists(self, key):
+        return os.path.exists(os.path.join(self.root, feed_filename(key)))
+
+    def create(self, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Notification.objects.create(
+                title='Сабақ кестесі', content='<b>Дүйсенбі</b>', notification_type='group',
+                group=self.group, created_by=self.admin, **kwargs,
+            )
+
+    def test_only_affected_feeds_are_written(self):
+        notification = self.create()
+        key = f'group-{self.group.pk}'
+        feed = self.read(key)
+        self.assertIn('<title>Сабақ кестесі</title>', feed)
+        self.assertIn(f'https://edu.example.com/notifications/{notification.pk}/', feed)
+        self.assertFalse(self.exists('general'))
+        self.assertFalse(self.exists(f'group-{self.other_group.pk}'))
+
+        # Мазмұны өзгермесе файл қайта жазылмайды (ETag өзгермейді)
+        self.assertFalse(write_feed(key))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            notification.group = self.other_group
+            notification.save()
+        self.assertNotIn('Сабақ кестесі', self.read(key))
+        self.assertIn('Сабақ кестесі', self.read(f'group-{self.other_group.pk}'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.other_group.delete()
+        self.assertFalse(self.exists(f'group-{self.other_group.pk}'))
+
+    def test_scheduled_batch_rewrites_feed_once(self):
+        for _ in range(3):
+            self.create(status='scheduled', publish_at=timezone.now() - timedelta(minutes=1))
+        with mock.patch('core.feeds.write_feed') as write_feed, self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(activate_due(), 3)
+        write_feed.assert_called_once_with(f'group-{self.group.pk}')
+
+    def test_served_without_database_with_validators(self):
+        self.create()
+        url = feed_url(f'group-{self.group.pk}')
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Сабақ кестесі'.encode(), b''.join(response.streaming_content))
+        etag, last_modified = response['ETag'], response['Last-Modified']
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+            self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 304)
+        self.assertEqual(self.client.get(feed_url('group-999')).status_code, 404)
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        self.group = Group.objects.create(name='ИС-21')
+        self.other_group = Group.objects.create(name='ИС-22')
+        self.admin = CustomUser.objects.create_user(
+            username='admin', email='admin@example.com', password='pass12345', role='admin'
+        )
+        self.student = CustomUser.objects.create_user(
+            username='student', email='student@example.com', password='pass12345', group=self.group,
+            first_name='Айгерім',
+        )
+        self.notification = Notification.objects.create(
+            title='=Емтихан', content='Мазмұны', notification_type='group', group=self.group,
+            created_by=self.admin, is_important=True,
+        )
+        self.notification.archive(self.admin, 'Өтті')
+        old = Notification.objects.create(
+            title='Ескі', content='Мазмұны', notification_type='group', group=self.group, created_by=self.admin,
+        )
+        Notification.objects.filter(pk=old.pk).update(created_at=timezone.now() - timedelta(days=40))
+        Notification.objects.create(
+            title='Басқа группа', content='Мазмұны', notification_type='group', group=self.other_group,
+            created_by=self.admin,
+        )
+        NotificationView.objects.create(user=self.student, notification=self.notification)
+        self.client.login(username='admin', password='pass12345')
+
+    def export(self, **params):
+        response = self.client.get(reverse('export_data'), params)
+        self.assertIsInstance(response, StreamingHttpResponse)
+        return response, b''.join(response.streaming_content)
+
+    def test_csv_filters_by_group_and_date(self):
+        today = timezone.localdate()
+        response, content = self.export(
+            kind='notifications', file_format='csv', group=self.group.pk,
+            date_from=(today - timedelta(days=7)).isoformat(), date_to=today.isoformat(),
+        )
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertIn('attachment; filename="notifications-', response['Content-Disposition'])
+        lines = content.decode('utf-8-sig').splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[0].startswith('ID,Тақырып,Түрі'))
+        # Формула ретінде орындалмайды; таңдаулар атауымен; архив ақпараты бар
+        self.assertIn("'=Емтихан", lines[1])
+        self.assertIn('Архивтелген', lines[1])
+        self.assertIn('Иә', lines[1])
+        self.assertIn('Өтті', lines[1])
+
+    def test_xlsx_is_valid_workbook(self):
+        response, content = self.export(kind='views', file_format='xlsx', group=self.group.pk)
+        self.assertEqual(response['Content-Type'], CONTENT_TYPES['xlsx'])
+        with zipfile.ZipFile(io.BytesIO(content)) as archive:
+            self.assertIsNone(archive.testzip())
+            sheet = ElementTree.fromstring(archive.read('xl/worksheets/sheet1.xml'))
+            ElementTree.fromstring(archive.read('xl/workbook.xml'))
+        namespace = {'x': 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'}
+        rows = sheet.findall('.//x:row', namespace)
+        self.assertEqual(len(rows), 2)
+        texts = [node.text for node in rows[1].findall('.//x:t', namespace)]
+        self.assertEqual(texts, ['=Емтихан', 'student', 'Айгерім', 'ИС-21'])
+        # Сан мен уақыт сандық ұяшық ретінде жазылады
+        self.assertEqual(rows[1].find('x:c[@r="A2"]/x:v', namespace).text, str(self.notification.pk))
+        self.assertEqual(rows[1].find('x:c[@r="G2"]', namespace).get('s'), '1')
+
+    def test_rows_are_read_with_iterator(self):
+        queryset = export_queryset(EXPORTS['users'])
+        with mock.patch.object(type(queryset), 'iterator', autospec=True, return_value=iter([])) as iterator:
+            response, content = self.export(kind='users', file_format='csv')
+        iterator.assert_called_once()
+        self.assertEqual(content.decode('utf-8-sig').splitlines()[0].split(',')[:2], ['ID', 'Логин'])
+
+    @override_settings(REPLICA_DATABASES=['replica_1'])
+    def test_database_is_chosen_before_streaming(self):
+        with read_from_replica():
+            queryset = export_queryset(EXPORTS['notifications'])
+        self.assertEqual(queryset.db, 'replica_1')
+
+    def test_invalid_filters_and_non_admin(self):
+        response = self.client.get(reverse('export_data'), {'kind': 'secrets', 'file_format': 'csv'})
+        self.assertRedirects(response, reverse('admin_dashboard'))
+        response = self.client.get(reverse('export_data'), {
+            'kind': 'users', 'file_format': 'csv', 'date_from': '2026-02-01', 'date_to': '2026-01-01',
+        })
+        self.assertRedirects(response, reverse('admin_dashboard'))
+
+        self.client.login(username='student', password='pass12345')
+        response = self.client.get(reverse('export_data'), {'kind': 'users', 'file_format': 'csv'})
+        self.assertEqual(response.status_code, 302)
+        self.assertNotIsInstance(response, StreamingHttpResponse)
+
+
+class RegroupingTests(TestCase):
+    def setUp(self):
+        self.source = Group.objects.create(name='ИС-21')
+        self.target = Group.objects.create(name='ИС-22')
+        self.admin = CustomUser.objects.create_user(
+            username='admin', email='admin@example.com', password='pass12345', role='admin',
+            is_staff=True, is_superuser=True,
+        )
+        self.students = [
+            CustomUser.objects.create_user(username=f's{n}', email=f's{n}@example.com', group=self.source)
+            for n in range(6)
+        ]
+
+    def assertCountersConsistent(self):
+        self.assertEqual(set(reconcile(Group, CustomUser, Notification).values()), {0})
+
+    def updates(self, queries):
+        return [query['sql'] for query in queries.captured_queries if query['sql'].startswith('UPDATE')]
+
+    def test_move_uses_constant_updates_and_invalidates_cache(self):
+        CachedModelBackend().get_user(self.students[0].pk)
+        self.assertIsNotNone(cache.get(user_cache_key(self.students[0].pk)))
+
+        for count in (2, 4):
+            users = CustomUser.objects.filter(username__in=[f's{n}' for n in range(count)])
+            with CaptureQueriesContext(connection) as queries, self.captureOnCommitCallbacks(execute=True):
+                moved = move_users(users, self.target)
+            self.assertEqual(len(self.updates(queries)), 2)
+            self.assertEqual(len(moved), count - (2 if count == 4 else 0))
+
+        self.assertIsNone(cache.get(user_cache_key(self.students[0].pk)))
+        self.assertEqual(CustomUser.objects.filter(group=self.target).count(), 4)
+        self.assertCountersConsistent()
+
+        move_users(CustomUser.objects.filter(group=self.target), None)
+        self.assertFalse(CustomUser.objects.filter(group=self.target).exists())
+        self.assertCountersConsistent()
+
+    def test_update_size_does_not_grow_with_cohort(self):
+        sizes = []
+        for last in ('s1', 's5'):
+            with transaction.atomic(), CaptureQueriesContext(connection) as queries:
+                moved = move_users(CustomUser.objects.filter(username__gte='s0', username__lte=last), self.target)
+                transaction.set_rollback(True)
+            sizes.append((len(moved), [len(sql) for sql in self.updates(queries)]))
+        self.assertEqual([count for count, _ in sizes], [2, 6])
+        self.assertEqual(sizes[0][1], sizes[1][1])
+
+    def test_merge_moves_members_notifications_and_reach(self):
+        other = CustomUser.objects.create_user(username='t0', email='t0@example.com', group=self.target)
+        general = Notification.objects.create(title='Жалпы', content='Мазмұны', created_by=self.admin)
+        group_notification = Notification.objects.create(
+            title='Кесте', content='Мазмұны', notification_type='group', group=self.source, created_by=self.admin,
+        )
+        for user in (self.students[0], self.students[1], other):
+            record_view(user, general)
+        record_view(self.students[0], group_notification)
+        endpoint = WebhookEndpoint.objects.create(
+            name='LMS', url='http://lms.example.com/hook', secret='s', group=self.source,
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(merge_groups(self.source, self.target), (6, 1))
+
+        self.assertFalse(Group.objects.filter(pk=self.source.pk).exists())
+        self.assertEqual(CustomUser.objects.filter(group=self.target).count(), 7)
+        group_notification.refresh_from_db()
+        self.assertEqual(group_notification.group, self.target)
+        self.assertTrue(NotificationChange.objects.filter(
+            notification_id=group_notification.pk, action='update',
+        ).exists())
+        reach = dict(NotificationReach.objects.filter(group=self.target).values_list('notification_id', 'read_count'))
+        self.assertEqual(reach, {general.pk: 3, group_notification.pk: 1})
+        self.assertFalse(NotificationReach.objects.exclude(group=self.target).exists())
+        endpoint.refresh_from_db()
+        self.assertEqual(endpoint.group, self.target)
+        self.assertCountersConsistent()
+
+    def test_split_command_is_all_or_nothing(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, 'split.csv')
+
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write('username,group\ns0,ИС-22\ns1,ИС-23\nunknown,ИС-22\n')
+        with self.assertRaisesMessage(CommandError, 'unknown'):
+            call_command('regroup_users', 'split', 'ИС-21', path, '--create-groups', stdout=io.StringIO())
+        self.assertEqual(CustomUser.objects.filter(group=self.source).count(), 6)
+        self.assertFalse(Group.objects.filter(name='ИС-23').exists())
+
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write('email,group\ns0@example.com,ИС-22\ns1@example.com,ИС-23\ns2@example.com,ИС-23\n')
+        call_command('regroup_users', 'split', 'ИС-21', path, '--create-groups', stdout=io.StringIO())
+        new_group = Group.objects.get(name='ИС-23')
+        self.assertEqual(
+            set(CustomUser.objects.filter(group=new_group).values_list('username', flat=True)), {'s1', 's2'},
+        )
+        self.assertEqual(new_group.member_count, 2)
+        self.assertCountersConsistent()
+
+    def test_move_command_and_admin_action(self):
+        call_command('regroup_users', 'move', '--from', 'ИС-21', '--users', 's0,s1', '--to', str(self.target.pk),
+                     stdout=io.StringIO())
+        self.assertEqual(CustomUser.objects.filter(group=self.target).count(), 2)
+        with self.assertRaises(CommandError):
+            call_command('regroup_users', 'move', '--to', 'ИС-22', stdout=io.StringIO())
+
+        self.client.login(username='admin', password='pass12345')
+        response = self.client.post('/admin/core/customuser/', {
+            'action': 'move_to_group', 'target_group': self.target.pk,
+            '_selected_action': [self.students[2].pk, self.students[3].pk],
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(CustomUser.objects.filter(group=self.target).count(), 4)
+
+        response = self.client.post('/admin/core/group/', {
+            'action': 'merge_into', 'target_group': self.target.pk, '_selected_action': [self.source.pk],
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(CustomUser.objects.filter(group=self.target).count(), 6)
+        self.assertFalse(Group.objects.filter(pk=self.source.pk).exists())
+        self.assertCountersConsistent()
+
+
+executed_jobs = []
+
+
+@job()
+def remember(label):
+    executed_jobs.append(label)
+
+
+@job(max_attempts=1)
+def once_only():
+    executed_jobs.append('once')
+
+
+@job(max_attempts=2)
+def always_fails(permanent=False):
+    if permanent:
+        raise PermanentJobError('қайталаудың мәні жоқ')
+    raise RuntimeError('SMTP қолжетімсіз')
+
+
+class JobQueueTests(TestCase):
+    def setUp(self):
+        executed_jobs.clear()
+
+    def test_priority_schedule_and_completion(self):
+        remember.delay(label='төмен')
+        remember.schedule(timezone.now() + timedelta(hours=1), label='кейін')
+        enqueue(remember.name, {'label': 'жоғары'}, priority=5)
+
+        result = run_batch()
+        self.assertEqual(executed_jobs, ['жоғары', 'төмен'])
+        self.assertEqual((result['claimed'], result['done']), (2, 2))
+        self.assertEqual(list(Job.objects.values_list('payload', flat=True)), [{'label': 'кейін'}])
+        self.assertEqual(run_batch()['claimed'], 0)
+
+        with self.assertRaises(LookupError):
+            enqueue('core.tests.missing')
+
+    def test_retries_with_backoff_then_fails(self):
+        queued = always_fails.delay()
+        now = timezone.now()
+        results = [execute(claimed) for claimed in claim(now=now)]
+        self.assertEqual(record_results(results, now=now)['retried'], 1)
+        queued.refresh_from_db()
+        self.assertEqual((queued.status, queued.attempts, queued.locked_by), ('queued', 1, ''))
+        self.assertIn('SMTP', queued.last_error)
+        self.assertGreater(queued.run_at, now)
+        self.assertEqual(claim(now=now), [])
+
+        later = queued.run_at
+        results = [execute(claimed) for claimed in claim(now=later)]
+        self.assertEqual(record_results(results, now=later)['failed'], 1)
+        queued.refresh_from_db()
+        self.assertEqual((queued.status, queued.attempts), ('failed', 2))
+
+        self.assertEqual(requeue_failed(), 1)
+        queued.refresh_from_db()
+        self.assertEqual((queued.status, queued.attempts), ('queued', 0))
+
+        permanent = always_fails.delay(permanent=True)
+        run_batch()
+        permanent.refresh_from_db()
+        self.assertEqual((permanent.status, permanent.attempts), ('failed', 1))
+
+    @override_settings(JOB_VISIBILITY_TIMEOUT=60)
+    def test_claims_are_disjoint_and_expire_after_visibility_timeout(self):
+        for label in 'abc':
+            remember.delay(label=label)
+        now = timezone.now()
+        first, second = claim(2, now=now, worker='w1'), claim(2, now=now, worker='w2')
+        self.assertEqual(len(first), 2)
+        self.assertEqual(len(second), 1)
+        self.assertFalse({queued.pk for queued in first} & {queued.pk for queued in second})
+        self.assertEqual(claim(now=now + timedelta(seconds=59)), [])
+
+        # Worker-лер құлады: көріну уақыты өткен соң тапсырмалар қайта алынады
+        reclaimed = claim(now=now + timedelta(seconds=61), worker='w3')
+        self.assertEqual(len(reclaimed), 3)
+        self.assertEqual({queued.attempts for queued in reclaimed}, {2})
+        # Кешіккен w1 нәтижесі w3-тің тапсырмаларын жоймайды
+        self.assertEqual(record_results([(queued, None, False) for queued in first])['done'], 0)
+        self.assertEqual(record_results([execute(queued) for queued in reclaimed])['done'], 3)
+        self.assertFalse(Job.objects.exists())
+
+    @override_settings(JOB_VISIBILITY_TIMEOUT=60)
+    def test_exhausted_job_is_failed_instead_of_reclaimed(self):
+        queued = once_only.delay()
+        now = timezone.now()
+        self.assertEqual(len(claim(now=now, worker='w1')), 1)
+        # w1 құлады: көріну уақыты өткенде тапсырма қайта орындалмайды
+        self.assertEqual(claim(now=now + timedelta(seconds=61), worker='w2'), [])
+        queued.refresh_from_db()
+        self.assertEqual((queued.status, queued.attempts, queued.locked_by), ('failed', 1, ''))
+
+    def test_listen_is_renewed_after_reconnect(self):
+        executed = []
+
+        class Cursor:
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *args):
+                pass
+
+            def execute(self, sql):
+                executed.append(sql)
+
+        fake = mock.Mock(vendor='postgresql', connection=object(), cursor=Cursor)
+        with mock.patch.dict(wakeup._listening, clear=True), \
+                mock.patch('core.wakeup.connections', {'default': fake}):
+            wakeup.listen('jobs')
+            wakeup.listen('jobs')
+            fake.connection = object()
+            wakeup.listen('jobs')
+        self.assertEqual(executed, ['LISTEN jobs', 'LISTEN jobs'])
+
+    def test_upload_cleanup_queue_and_worker_command(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        with open(os.path.join(media_root, 'old.png'), 'wb') as file:
+            file.write(b'png')
+
+        with override_settings(MEDIA_ROOT=media_root, UPLOAD_CLEANUP_BACKGROUND='queue'):
+            from django.core.files.storage import default_storage
+            with transaction.atomic():
+                delete_files_later(default_storage, ['old.png'])
+                transaction.set_rollback(True)
+            self.assertFalse(Job.objects.exists())
+
+            delete_files_later(default_storage, ['old.png'])
+            self.assertTrue(os.path.exists(os.path.join(media_root, 'old.png')))
+            out = io.StringIO()
+            call_command('run_jobs', '--once', stdout=out)
+            self.assertIn('Өңделді: 1', out.getvalue())
+        self.assertFalse(os.path.exists(os.path.join(media_root, 'old.png')))
+        self.assertFalse(Job.objects.exists())
@@ -0,0 +1,82 @@
+"""
+Хабарландыру суреттерін бір рет жазу.
+
+Жаңа хабарландырудың ID-і PostgreSQL sequence-тен алдын ала алынады
+(`reserve_pk`), сондықтан жүктелген файл бір INSERT кезінде бірден
+notifications/<id>/ ішіне жазылады (үлкен файл уақытша файлдан көшірілмей,
+ауыстырылады). Сурет тек тақырыбы (header) бойынша тексеріледі -
+пиксельдер декодталмайды. Ауыстырылған/жойылған файлдар транзакция
+commit болғаннан кейін сұраудан тыс өшіріледі.
+"""
+import logging
+import threading
+
+from django.conf import settings
+from django.db import connections, transaction
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+ALLOWED_IMAGE_FORMATS = {'JPEG', 'PNG', 'GIF', 'WEBP'}
+MAX_IMAGE_PIXELS = 40_000_000
+
+
+class InvalidImage(ValueError):
+    """Файл рұқсат етілген сурет емес"""
+
+
+def reserve_pk(model, using):
+    """Келесі ID-ді sequence-тен алу; sequence жоқ базаларда None"""
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT nextval(pg_get_serial_sequence(%s, %s))',
+            [model._meta.db_table, model._meta.pk.column],
+        )
+        return cursor.fetchone()[0]
+
+
+def inspect_image(file):
+    """Суреттің форматы мен өлшемін тақырыбынан оқу: (формат, (ені, биіктігі))"""
+    try:
+        with Image.open(file) as image:
+            image_format, size = image.format, image.size
+    except (OSError, SyntaxError, Image.DecompressionBombError):
+        raise InvalidImage('Файл сурет емес немесе зақымдалған')
+    finally:
+        file.seek(0)
+    if image_format not in ALLOWED_IMAGE_FORMATS:
+        raise InvalidImage(f'{image_format} форматына рұқсат жоқ')
+    if size[0] * size[1] > MAX_IMAGE_PIXELS:
+        raise InvalidImage('Суреттің пиксель саны тым көп')
+    return image_format, size
+
+
+def _delete_files(storage, names):
+    for name in names:
+        try:
+            storage.delete(name)
+        except OSError:
+            logger.warning('Файлды өшіру мүмкін болмады: %s', name, exc_info=True)
+
+
+def delete_files_later(storage, names, using=None):
+    """Файлдарды commit-тен кейін өшіру (әдепкіде фондық ағында, 'queue' - core.jobs кезегінде)"""
+    names = [name for name in names if name]
+    if not names:
+        return
+    if getattr(settings, 'UPLOAD_CLEANUP_BACKGROUND', True) == 'queue':
+        # Тапсырма осы транзакцияда жазылады: rollback болса, файлдар қалады
+        from .tasks import delete_files
+        delete_files.delay(names=names)
+        return
+
+    def schedule():
+        if getattr(settings, 'UPLOAD_CLEANUP_BACKGROUND', True):
+            threading.Thread(target=_delete_files, args=(storage, names), daemon=True).start()
+        else:
+            _delete_files(storage, names)
+
+    transaction.on_commit(schedule, using=using)
@@ -3,65 +3,144 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib import messages
 from django.db.models import Count, Q
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils import timezone
 from datetime import date, timedelta
+from edunotify.db_router import replica_reads
+from .catalogue import get_group, group_catalogue
+from .concurrency import gather_queries
+from .decorators import aget_user, async_user_passes_test
+from .exports import CONTENT_TYPES, EXPORTS, ExportFilterForm, export_filename, export_queryset, stream_export
 from .models import Notification, Group, CustomUser
+from .paginator import EstimatedCountPaginator
+from .reach import least_read_important
+from .search import filter_users
+
+USERS_PER_PAGE = 50
+USERS_BATCH_LIMIT = 200
 
 def is_admin(user):
     return user.is_authenticated and user.role == 'admin'
 
+def home_notifications(user):
+    """Басты беттегі соңғы 5 хабарландыру"""
+    notifications = (
+        Notification.objects.select_related('group', 'created_by')
+        .defer('content', 'content_html').order_by('-created_at')
+    )
+    if user.role != 'admin':
+        # Жоспарланған, архивтелген және жойылғандар басты бетте көрсетілмейді
+        notifications = notifications.filter(status='active')
+        if user.group:
+            notifications = notifications.filter(Q(notification_type='general') | Q(group=user.group))
+        else:
+            notifications = notifications.filter(notification_type='general')
+    return notifications[:5]
+
+def home_stats_queries():
+    return {
+        'total_notifications': Notification.objects.count,
+        'total_users': CustomUser.objects.count,
+        'total_groups': Group.objects.count,
+        'admin_count': CustomUser.objects.filter(role='admin').count,
+    }
+
+@replica_reads
 def home(request):
     context = {}
     
     if request.user.is_authenticated:
-        if request.user.role == 'admin':
-            notifications = Notification.objects.all().order_by('-created_at')[:5]
-        else:
-            if request.user.group:
-                notifications = Notification.objects.filter(
-                    Q(notification_type='general') | 
-                    Q(group=request.user.group)
-                ).order_by('-created_at')[:5]
-            else:
-                notifications = Notification.objects.filter(
-                    notification_type='general'
-                ).order_by('-created_at')[:5]
-        
-        context['notifications'] = notifications
+        context['notifications'] = home_notifications(request.user)
         
         if request.user.role == 'admin':
-            context['total_notifications'] = Notification.objects.count()
-            context['total_users'] = CustomUser.objects.count()
-            context['total_groups'] = Group.objects.count()
-            context['admin_count'] = CustomUser.objects.filter(role='admin').count()
+            context.update({name: query() for name, query in home_stats_queries().items()})
     
     return render(request, 'home.html', context)
 
-@login_required
-@user_passes_test(is_admin)
-def admin_dashboard(request):
+@replica_reads
+async def home_async(request):
+    """home-ның ASGI нұсқасы: админ статистикасы қатар есептеледі"""
+    user = await aget_user(request)
+    context = {}
+    
+    if user.is_authenticated:
+        notifications = home_notifications(user)
+        if user.role == 'admin':
+            context = await gather_queries(notifications=lambda: list(notifications), **home_stats_queries())
+        else:
+            context['notifications'] = [notification async for notification in notifications.aiterator()]
+    
+    return render(request, 'home.html', context)
+
+def dashboard_export_form():
+    # Группалар каталогы осы жерде жүктеледі: async көріністе шаблон оны sync оқи алмайды
+    group_catalogue()
+    return ExportFilterForm()
+
+def dashboard_queries():
+    """Админ панелінің бір-бірінен тәуелсіз сұраулары"""
     today = date.today()
     week_ago = today - timedelta(days=7)
+    # __date емес, ауқым: created_at индексі (және бөлімдер) қолданылады
+    today_start = timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0)
     
-    admin_count = CustomUser.objects.filter(role='admin').count()
-    general_count = Notification.objects.filter(notification_type='general').count()
-    group_count = Notification.objects.filter(notification_type='group').count()
-    
-    context = {
-        'total_notifications': Notification.objects.count(),
-        'total_users': CustomUser.objects.count(),
-        'total_groups': Group.objects.count(),
-        'admin_count': admin_count,
-        'general_count': general_count,
-        'group_count': group_count,
-        'today_notifications': Notification.objects.filter(created_at__date=today).count(),
-        'recent_activity': Notification.objects.filter(created_at__gte=week_ago).count(),
-        'recent_notifications': Notification.objects.all().order_by('-created_at')[:10],
-        'recent_users': CustomUser.objects.order_by('-date_joined')[:10],
+    return {
+        'total_notifications': Notification.objects.count,
+        'total_users': CustomUser.objects.count,
+        'total_groups': Group.objects.count,
+        'admin_count': CustomUser.objects.filter(role='admin').count,
+        'general_count': Notification.objects.filter(notification_type='general').count,
+        'group_count': Notification.objects.filter(notification_type='group').count,
+        'today_notifications': Notification.objects.filter(
+            created_at__gte=today_start, created_at__lt=today_start + timedelta(days=1)
+        ).count,
+        'recent_activity': Notification.objects.filter(created_at__gte=week_ago).count,
+        'recent_notifications': lambda: list(
+            Notification.objects.select_related('group').order_by('-created_at')[:10]
+        ),
+        'recent_users': lambda: list(CustomUser.objects.select_related('group').order_by('-date_joined')[:10]),
+        'least_read_notifications': lambda: least_read_important(5),
+        'export_form': dashboard_export_form,
     }
+
+@login_required
+@user_passes_test(is_admin)
+@replica_reads
+def admin_dashboard(request):
+    context = {name: query() for name, query in dashboard_queries().items()}
+    
+    return render(request, 'admin/dashboard.html', context)
+
+@async_user_passes_test(is_admin)
+@replica_reads
+async def admin_dashboard_async(request):
+    """admin_dashboard-тың ASGI нұсқасы"""
+    context = await gather_queries(**dashboard_queries())
     
     return render(request, 'admin/dashboard.html', context)
 
+@login_required
+@user_passes_test(is_admin)
+@replica_reads
+def export_data(request):
+    """Хабарландыруларды, оқу белгілерін немесе пайдаланушыларды CSV/XLSX ретінде ағынмен жүктеу"""
+    form = ExportFilterForm(request.GET)
+    if not form.is_valid():
+        for errors in form.errors.values():
+            messages.error(request, errors[0])
+        return redirect('admin_dashboard')
+    
+    filters = form.cleaned_data
+    kind, file_format = filters.pop('kind'), filters.pop('file_format')
+    export = EXPORTS[kind]
+    queryset = export_queryset(export, **filters)
+    response = StreamingHttpResponse(
+        stream_export(export, file_format, queryset), content_type=CONTENT_TYPES[file_format]
+    )
+    filename = export_filename(kind, file_format, filters['date_from'], filters['date_to'])
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
 @login_required
 @user_passes_test(is_admin)
 def manage_groups(request):
@@ -83,11 +162,8 @@ def manage_groups(request):
         
         return redirect('manage_groups')
     
-    # ТҮЗЕТІЛГЕН БӨЛІК - customuser емес, members пайдалану керек
-    groups = Group.objects.annotate(
-        user_count=Count('members'),  # <-- 'customuser' емес, 'members'
-        notification_count=Count('notifications')  # <-- 'notification' емес, 'notifications'
-    ).order_by('-created_at')
+    # Санауыштар Group жолында сақталады (core.signals), агрегация қажет емес
+    groups = Group.objects.order_by('-created_at')
     
     return render(request, 'admin/manage_groups.html', {'groups': groups})
 
@@ -122,17 +198,33 @@ def delete_group(request, group_id):
 @login_required
 @user_passes_test(is_admin)
 def user_management(request):
-    users = CustomUser.objects.select_related('group').order_by('-date_joined')
-    groups = Group.objects.all()
+    users, sort = filter_users(CustomUser.objects.select_related('group'), request.GET)
+    groups = group_catalogue()
     
-    admin_count = users.filter(role='admin').count()
-    user_count = users.filter(role='user').count()
+    paginator = EstimatedCountPaginator(users, USERS_PER_PAGE)
+    page_obj = paginator.get_page(request.GET.get('page'))
+    
+    stats = CustomUser.objects.aggregate(
+        admin_count=Count('pk', filter=Q(role='admin')),
+        user_count=Count('pk', filter=Q(role='user')),
+    )
+    
+    # Бет ауыстырғанда сүзгілерді сақтау
+    query_params = request.GET.copy()
+    query_params.pop('page', None)
     
     context = {
-        'users': users,
+        'users': page_obj,
+        'page_obj': page_obj,
         'all_groups': groups,
-        'admin_count': admin_count,
-        'user_count': user_count,
+        'admin_count': stats['admin_count'],
+        'user_count': stats['user_count'],
+        'total_users': stats['admin_count'] + stats['user_count'],
+        'search_query': request.GET.get('q', ''),
+        'role_filter': request.GET.get('role', ''),
+        'group_filter': request.GET.get('group', ''),
+        'sort': sort,
+        'query_string': query_params.urlencode(),
     }
     
     return render(request, 'admin/manage_users.html', context)
@@ -162,36 +254,47 @@ def add_user(request):
             role=role
         )
         
-        if group_id:
-            try:
-                group = Group.objects.get(id=group_id)
-                user.group = group
-                user.save()
-            except Group.DoesNotExist:
-                pass
+        group = get_group(group_id) if group_id else None
+        if group is not None:
+            user.group = group
+            user.save()
         
         messages.success(request, 'Пайдаланушы сәтті қосылды!')
         return redirect('user_management')
     
     return redirect('user_management')
 
+def user_payload(user):
+    return {
+        'id': user.id,
+        'username': user.username,
+        'email': user.email,
+        'first_name': user.first_name,
+        'last_name': user.last_name,
+        'role': user.role,
+        'group_id': user.group_id,
+    }
+
 @login_required
 @user_passes_test(is_admin)
+@replica_reads
 def get_user_api(request, user_id):
     user = get_object_or_404(CustomUser, id=user_id)
-    data = {
-        'success': True,
-        'user': {
-            'id': user.id,
-            'username': user.username,
-            'email': user.email,
-            'first_name': user.first_name,
-            'last_name': user.last_name,
-            'role': user.role,
-            'group_id': user.group.id if user.group else None,
-        }
-    }
-    return JsonResponse(data)
+    return JsonResponse({'success': True, 'user': user_payload(user)})
+
+@login_required
+@user_passes_test(is_admin)
+@replica_reads
+def get_users_api(request):
+    """Бірнеше пайдаланушыны бір сұраумен алу: ?ids=1,2,3"""
+    ids = [int(i) for i in request.GET.get('ids', '').split(',') if i.strip().isdigit()]
+    if len(ids) > USERS_BATCH_LIMIT:
+        return JsonResponse({'success': False, 'error': f'{USERS_BATCH_LIMIT}-нан артық емес'}, status=400)
+    
+    users = CustomUser.objects.filter(id__in=ids).only(
+        'id', 'username', 'email', 'first_name', 'last_name', 'role', 'group_id'
+    )
+    return JsonResponse({'success': True, 'users': [user_payload(user) for user in users]})
 
 @login_required
 @user_passes_test(is_admin)
@@ -206,14 +309,7 @@ def edit_user(request, user_id):
         user.role = request.POST.get('role', 'user')
         
         group_id = request.POST.get('group')
-        if group_id:
-            try:
-                group = Group.objects.get(id=group_id)
-                user.group = group
-            except Group.DoesNotExist:
-                user.group = None
-        else:
-            user.group = None
+        user.group = get_group(group_id) if group_id else None
         
         password = request.POST.get('password')
         if password:
@@ -223,7 +319,7 @@ def edit_user(request, user_id):
         messages.success(request, 'Пайдаланушы сәтті жаңартылды!')
         return redirect('user_management')
     
-    groups = Group.objects.all()
+    groups = group_catalogue()
     return render(request, 'admin/edit_user.html', {
         'edit_user': user,
         'groups': groups
@@ -0,0 +1,47 @@
+"""
+Worker-лерді PostgreSQL LISTEN/NOTIFY арқылы ояту (run_scheduler, run_jobs).
+
+NOTIFY транзакция commit болғанда жеткізіледі. LISTEN қосылымға
+байланған: Django қосылымды жапса (CONN_MAX_AGE=0 кезінде
+close_old_connections, қате кезінде қайта қосылу), жаңа қосылымда
+LISTEN жоқ. Сондықтан `listen` әр шақыруда қосылым ауысқанын тексеріп,
+қажет болса LISTEN-ді қайталайды. Басқа базаларда ояту жоқ - `wait`
+жай ұйықтайды.
+"""
+import time
+
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# (база, арна) -> LISTEN орындалған DB-API қосылымы
+_listening = {}
+
+
+def notify(channel, using=DEFAULT_DB_ALIAS):
+    connection = connections[using]
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(f'NOTIFY {channel}')
+
+
+def listen(channel, using=DEFAULT_DB_ALIAS):
+    """Ағымдағы қосылымда арнаны тыңдау (қосылым өзгермесе, әрекетсіз)"""
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return
+    connection.ensure_connection()
+    if _listening.get((using, channel)) is connection.connection:
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'LISTEN {channel}')
+    _listening[(using, channel)] = connection.connection
+
+
+def wait(channel, timeout, using=DEFAULT_DB_ALIAS):
+    """`timeout` секунд күту; PostgreSQL-де NOTIFY келсе ерте оянады"""
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        time.sleep(timeout)
+        return
+    listen(channel, using)
+    for _ in connection.connection.notifies(timeout=timeout, stop_after=1):
+        pass
@@ -0,0 +1,79 @@
+"""
+Тесттер мен `benchmark_webhooks` үшін жергілікті HTTP қабылдаушы.
+
+127.0.0.1-дегі бос портта ThreadingHTTPServer (HTTP/1.1, keep-alive)
+іске қосылады. Қабылданған сұраулар `requests`-те, ашылған TCP
+қосылымдарының саны `connections`-та, бір уақытта өңделген сұраулардың
+ең көп саны `max_in_flight`-та сақталады. `statuses` - кезекпен
+қайтарылатын жауап статустары (біткенде 200), `latency` - әр жауаптың
+кідірісі (секунд).
+"""
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        super().setup()
+        self.server.receiver.connection_opened()
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        status = self.server.receiver.record(self.path, dict(self.headers), body)
+        self.send_response(status)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class WebhookReceiver:
+    def __init__(self, statuses=(), latency=0.0):
+        self.statuses = list(statuses)
+        self.latency = latency
+        self.requests = []
+        self.connections = 0
+        self.in_flight = self.max_in_flight = 0
+        self._lock = threading.Lock()
+        self._server = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}/hook'
+
+    def connection_opened(self):
+        with self._lock:
+            self.connections += 1
+
+    def record(self, path, headers, body):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            self.in_flight -= 1
+            self.requests.append((path, headers, body))
+            return self.statuses.pop(0) if self.statuses else 200
+
+    def start(self):
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+        self._server.daemon_threads = True
+        self._server.receiver = self
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
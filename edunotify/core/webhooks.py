@@ -0,0 +1,384 @@
+"""
+Хабарландыру оқиғаларын сыртқы жүйелерге жіберу (webhook).
+
+Жариялау, архивтеу және қалпына келтіру кезінде сәйкес жазылымдарға
+(WebhookEndpoint: группа және оқиға бойынша) WebhookDelivery жазбасы
+сол транзакцияда құрылады (outbox) - оқиға commit болмаса, жіберілмейді.
+Commit-тен кейін фондық ағын кезекті жібереді; `deliver_webhooks` worker-і
+қайталауларды орындайды.
+
+Жіберу asyncio-да: бір пакеттің барлық сұраулары қатар, әр endpoint-ке
+`max_concurrency`-ден, жалпы WEBHOOK_MAX_CONCURRENCY-ден аспай жіберіледі.
+TCP/TLS қосылымдары keep-alive арқылы пакет ішінде қайта қолданылады.
+Әр сұраудың денесі HMAC-SHA256-мен қол қойылады:
+
+    X-EduNotify-Signature: t=<unix уақыт>,v1=<hex(hmac(secret, "<t>.<дене>"))>
+
+2xx емес жауап немесе желі қатесі кезінде әрекет jitter-і бар экспоненциалды
+кідіріспен қайталанады; WEBHOOK_MAX_ATTEMPTS-тен кейін немесе тұрақты
+қатеде (408/429-дан басқа 4xx) жазба WebhookDeadLetter кестесіне көшеді.
+"""
+import asyncio
+import hashlib
+import hmac
+import json
+import random
+import ssl
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import timedelta
+from math import ceil
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Min, Q
+from django.utils import timezone
+
+from .changes import notification_payload
+from .jobs import worker_id
+from .models import WebhookDeadLetter, WebhookDelivery, WebhookEndpoint
+
+SIGNATURE_HEADER = 'X-EduNotify-Signature'
+EVENT_HEADER = 'X-EduNotify-Event'
+DELIVERY_HEADER = 'X-EduNotify-Delivery'
+USER_AGENT = 'EduNotify-Webhooks/1.0'
+RETRYABLE_CLIENT_ERRORS = {408, 429}
+
+_wakeup = threading.Event()
+_worker_lock = threading.Lock()
+
+
+def get_timeout():
+    return getattr(settings, 'WEBHOOK_TIMEOUT', 10)
+
+
+def get_max_attempts():
+    return getattr(settings, 'WEBHOOK_MAX_ATTEMPTS', 8)
+
+
+def get_retry_range():
+    """(алғашқы кідіріс, ең ұзақ кідіріс) секундпен"""
+    return getattr(settings, 'WEBHOOK_RETRY_BASE', 10), getattr(settings, 'WEBHOOK_RETRY_MAX', 3600)
+
+
+def get_max_concurrency():
+    return getattr(settings, 'WEBHOOK_MAX_CONCURRENCY', 50)
+
+
+def get_batch_size():
+    return getattr(settings, 'WEBHOOK_BATCH_SIZE', 500)
+
+
+# -- Кезекке қою ---------------------------------------------------------------
+
+def enqueue(notification, event):
+    """Оқиғаны сәйкес жазылымдарға кезекке қою (ағымдағы транзакцияда)"""
+    endpoints = [
+        endpoint for endpoint in WebhookEndpoint.objects.filter(
+            Q(group__isnull=True) | Q(group_id=notification.group_id), is_active=True,
+        )
+        if endpoint.accepts(event, notification.group_id)
+    ]
+    if not endpoints:
+        return 0
+    payload = {'event': event, 'notification': notification_payload(notification)}
+    WebhookDelivery.objects.bulk_create(
+        WebhookDelivery(endpoint=endpoint, event=event, payload=payload) for endpoint in endpoints
+    )
+    transaction.on_commit(wake_delivery)
+    return len(endpoints)
+
+
+def wake_delivery():
+    """Кезекті фондық ағында жіберу (бір процесте бір ағын)"""
+    if not getattr(settings, 'WEBHOOK_DELIVERY_BACKGROUND', True):
+        return
+    _wakeup.set()
+    if _worker_lock.acquire(blocking=False):
+        threading.Thread(target=_drain, daemon=True).start()
+
+
+def _drain():
+    try:
+        while _wakeup.is_set():
+            _wakeup.clear()
+            while deliver_due()['claimed'] == get_batch_size():
+                pass
+    finally:
+        connections.close_all()
+        _worker_lock.release()
+    # Жұмыс аяқталып жатқанда келген оятуды жоғалтпау үшін
+    if _wakeup.is_set():
+        wake_delivery()
+
+
+# -- Қол қою -------------------------------------------------------------------
+
+def sign(secret, body, timestamp=None):
+    timestamp = int(timestamp if timestamp is not None else time.time())
+    digest = hmac.new(secret.encode(), f'{timestamp}.'.encode() + body, hashlib.sha256).hexdigest()
+    return f't={timestamp},v1={digest}'
+
+
+def verify(secret, header, body, tolerance=300, now=None):
+    """Қабылдаушы жағындағы тексеру: қолтаңба дұрыс және ескі емес пе?"""
+    try:
+        parts = dict(item.split('=', 1) for item in header.split(','))
+        timestamp = int(parts['t'])
+    except (KeyError, ValueError):
+        return False
+    if abs((now or time.time()) - timestamp) > tolerance:
+        return False
+    return hmac.compare_digest(sign(secret, body, timestamp), header)
+
+
+def backoff(attempts):
+    """`attempts` сәтсіз әрекеттен кейінгі кідіріс: экспонента, жартысы кездейсоқ"""
+    base, cap = get_retry_range()
+    delay = min(cap, base * 2 ** (attempts - 1))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+# -- HTTP клиенті ----------------------------------------------------------------
+
+class ConnectionPool:
+    """
+    asyncio ағындарындағы HTTP/1.1 keep-alive клиенті: бос қосылымдар
+    (схема, хост, порт) бойынша сақталып, келесі сұрауларда қолданылады.
+    """
+
+    def __init__(self, timeout):
+        self.timeout = timeout
+        self.idle = {}
+        self.opened = 0
+
+    async def post(self, url, body, headers):
+        """POST жіберіп, жауап статусын қайтарады"""
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.hostname, parts.port)
+        for attempt in range(2):
+            idle = self.idle.get(key)
+            reused = bool(idle)
+            reader, writer = idle.pop() if reused else await self._connect(parts)
+            try:
+                status, keep_alive = await asyncio.wait_for(
+                    self._exchange(reader, writer, parts, body, headers), self.timeout,
+                )
+            except (ConnectionError, asyncio.IncompleteReadError):
+                writer.close()
+                # Сервер бос қосылымды жауып қойған: жаңа қосылыммен бір рет қайталау
+                if reused and attempt == 0:
+                    continue
+                raise
+            except BaseException:
+                writer.close()
+                raise
+            if keep_alive:
+                self.idle.setdefault(key, []).append((reader, writer))
+            else:
+                writer.close()
+            return status
+
+    async def _connect(self, parts):
+        context = ssl.create_default_context() if parts.scheme == 'https' else None
+        port = parts.port or (443 if parts.scheme == 'https' else 80)
+        connection = await asyncio.wait_for(
+            asyncio.open_connection(parts.hostname, port, ssl=context), self.timeout,
+        )
+        self.opened += 1
+        return connection
+
+    async def _exchange(self, reader, writer, parts, body, headers):
+        path = (parts.path or '/') + (f'?{parts.query}' if parts.query else '')
+        lines = [
+            f'POST {path} HTTP/1.1',
+            f'Host: {parts.netloc}',
+            f'User-Agent: {USER_AGENT}',
+            'Content-Type: application/json',
+            f'Content-Length: {len(body)}',
+            *(f'{name}: {value}' for name, value in headers.items()),
+        ]
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body)
+        await writer.drain()
+
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionResetError('Сервер жауапсыз қосылымды жапты')
+        version, status = status_line.split(None, 2)[:2]
+        response_headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            response_headers[name.strip().lower()] = value.strip().lower()
+
+        keep_alive = version == b'HTTP/1.1' and response_headers.get('connection') != 'close'
+        if 'chunked' in response_headers.get('transfer-encoding', ''):
+            while True:
+                size = int((await reader.readline()).split(b';')[0], 16)
+                await reader.readexactly(size + 2)
+                if size == 0:
+                    break
+        elif 'content-length' in response_headers:
+            await reader.readexactly(int(response_headers['content-length']))
+        else:
+            # Дененің шекарасы жоқ: қосылым жабылғанша оқылады
+            await reader.read()
+            keep_alive = False
+        return int(status), keep_alive
+
+    async def close(self):
+        for idle in self.idle.values():
+            for _, writer in idle:
+                writer.close()
+        self.idle.clear()
+
+
+# -- Жіберу ----------------------------------------------------------------------
+
+async def send_all(deliveries, pool=None):
+    """[(жазба, статус немесе None, қате мәтіні)]; ORM-ге қатынамайды"""
+    own_pool = pool is None
+    pool = pool or ConnectionPool(get_timeout())
+    overall = asyncio.Semaphore(get_max_concurrency())
+    per_endpoint = {}
+
+    async def send(delivery):
+        endpoint = delivery.endpoint
+        limit = per_endpoint.setdefault(endpoint.pk, asyncio.Semaphore(max(1, endpoint.max_concurrency)))
+        body = json.dumps(delivery.payload, ensure_ascii=False, separators=(',', ':')).encode()
+        headers = {
+            SIGNATURE_HEADER: sign(endpoint.secret, body),
+            EVENT_HEADER: delivery.event,
+            DELIVERY_HEADER: str(delivery.pk),
+        }
+        # Алдымен endpoint шегі: баяу endpoint жалпы орындарды бос ұстамайды
+        async with limit, overall:
+            try:
+                status = await pool.post(endpoint.url, body, headers)
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError) as exc:
+                return delivery, None, f'{type(exc).__name__}: {exc}'
+        return delivery, status, '' if 200 <= status < 300 else f'HTTP {status}'
+
+    try:
+        return await asyncio.gather(*(send(delivery) for delivery in deliveries))
+    finally:
+        if own_pool:
+            await pool.close()
+
+
+def lease_seconds(batch):
+    """
+    Пакетті жіберудің ең ұзақ уақыты: endpoint және жалпы шектеулер
+    бойынша кезектер саны, әр сұрауға қосылу, жауап және бір қайталау
+    """
+    per_endpoint = Counter(delivery.endpoint_id for delivery in batch)
+    limits = {delivery.endpoint_id: max(1, delivery.endpoint.max_concurrency) for delivery in batch}
+    waves = max(ceil(count / limits[pk]) for pk, count in per_endpoint.items())
+    waves += ceil(len(batch) / get_max_concurrency())
+    return waves * get_timeout() * 3
+
+
+def claim_due(now, batch_size, worker=None):
+    """
+    Уақыты келген жазбаларды алу. Басқа worker-лер оларды lease біткенше
+    алмайды; locked_by - осы пакетке бірегей белгі, нәтиже тек сол белгі
+    сақталған жазбаларға жазылады.
+    """
+    token = f'{(worker or worker_id())[:80]}:{uuid.uuid4().hex[:8]}'
+    with transaction.atomic():
+        batch = list(
+            WebhookDelivery.objects.select_for_update(skip_locked=True, of=('self',))
+            .select_related('endpoint')
+            .filter(next_attempt_at__lte=now, endpoint__is_active=True)
+            .order_by('next_attempt_at')[:batch_size]
+        )
+        if not batch:
+            return []
+        WebhookDelivery.objects.filter(pk__in=[delivery.pk for delivery in batch]).update(
+            next_attempt_at=now + timedelta(seconds=lease_seconds(batch)), locked_by=token,
+        )
+    for delivery in batch:
+        delivery.locked_by = token
+    return batch
+
+
+def _held(deliveries):
+    """Берілген жазбалардың ішінен lease-і әлі сол пакетте тұрғандары"""
+    condition = Q(pk__in=[])
+    for token in {delivery.locked_by for delivery in deliveries}:
+        condition |= Q(locked_by=token, pk__in=[delivery.pk for delivery in deliveries if delivery.locked_by == token])
+    return WebhookDelivery.objects.filter(condition)
+
+
+def record_results(results, now):
+    """Lease-і басқа worker-ге өтпеген жазбалардың нәтижесін сақтау"""
+    delivered, retry, dead = [], [], []
+    for delivery, status, error in results:
+        if not error:
+            delivered.append(delivery)
+            continue
+        delivery.attempts += 1
+        delivery.last_error = error
+        permanent = status is not None and 400 <= status < 500 and status not in RETRYABLE_CLIENT_ERRORS
+        if permanent or delivery.attempts >= get_max_attempts():
+            dead.append(delivery)
+        else:
+            delivery.next_attempt_at = now + timedelta(seconds=backoff(delivery.attempts))
+            retry.append(delivery)
+
+    with transaction.atomic():
+        delivered_count, _ = _held(delivered).delete()
+        retried = 0
+        for delivery in retry:
+            retried += _held([delivery]).update(
+                attempts=delivery.attempts, last_error=delivery.last_error,
+                next_attempt_at=delivery.next_attempt_at, locked_by='',
+            )
+        dead_ids = set(_held(dead).select_for_update().values_list('pk', flat=True))
+        dead = [delivery for delivery in dead if delivery.pk in dead_ids]
+        WebhookDeadLetter.objects.bulk_create(
+            WebhookDeadLetter(
+                endpoint_id=delivery.endpoint_id, event=delivery.event, payload=delivery.payload,
+                attempts=delivery.attempts, last_error=delivery.last_error, created_at=delivery.created_at,
+            )
+            for delivery in dead
+        )
+        WebhookDelivery.objects.filter(pk__in=dead_ids).delete()
+    return delivered_count, retried, len(dead)
+
+
+def deliver_due(now=None, batch_size=None):
+    """Бір пакетті жіберу: {'claimed', 'delivered', 'retried', 'dead'}"""
+    batch = claim_due(now or timezone.now(), batch_size or get_batch_size())
+    if not batch:
+        return {'claimed': 0, 'delivered': 0, 'retried': 0, 'dead': 0}
+    results = asyncio.run(send_all(batch))
+    delivered, retried, dead = record_results(results, timezone.now())
+    return {'claimed': len(batch), 'delivered': delivered, 'retried': retried, 'dead': dead}
+
+
+def next_attempt_time():
+    return WebhookDelivery.objects.filter(endpoint__is_active=True).aggregate(
+        next_at=Min('next_attempt_at'),
+    )['next_at']
+
+
+def requeue_dead(queryset=None):
+    """Жеткізілмеген оқиғаларды кезекке қайта қою, санын қайтарады"""
+    queryset = WebhookDeadLetter.objects.all() if queryset is None else queryset
+    with transaction.atomic():
+        letters = list(queryset.select_for_update())
+        WebhookDelivery.objects.bulk_create(
+            WebhookDelivery(endpoint_id=letter.endpoint_id, event=letter.event, payload=letter.payload,
+                            created_at=letter.created_at)
+            for letter in letters
+        )
+        WebhookDeadLetter.objects.filter(pk__in=[letter.pk for letter in letters]).delete()
+        if letters:
+            transaction.on_commit(wake_delivery)
+    return len(letters)
@@ -5,6 +5,8 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
+
+Production-да edunotify.settings_asgi профилімен іске қосыңыз.
 """
 
 import os
@@ -14,3 +16,7 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'edunotify.settings')
 
 application = get_asgi_application()
+
+from edunotify.warmup import warm_up  # noqa: E402
+
+warm_up()
@@ -0,0 +1,244 @@
+"""
+Динамикалық жауаптарды кішірейту.
+
+`HtmlMinifyMiddleware` шаблондардағы шегіністер мен бос жолдарды жинайды
+(`<pre>`, `<textarea>`, `<script>`, `<style>` ішіне тиіспейді), ал
+`ResponseCompressionMiddleware` Accept-Encoding бойынша brotli немесе
+gzip таңдап, жауапты сығады. Ағындық жауаптар (StreamingHttpResponse)
+бөлік-бөлікпен сығылады, толық жауап жадқа жиналмайды.
+
+BREACH-ке қарсы екі форматта да сығылған ұзындыққа кездейсоқ толтырма
+қосылады: gzip-те тақырыптағы файл атауы (Django GZipMiddleware сияқты),
+brotli-де декодер өткізіп жіберетін метадеректер блогы. Мазмұн өзгермейді,
+сондықтан тәсіл кез келген Content-Type-қа жарайды.
+"""
+import gzip
+import re
+import secrets
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.text import StreamingBuffer
+
+from .static_middleware import accepted_encodings
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli міндетті емес
+    brotli = None
+
+GZIP_LEVEL = 6
+# Динамикалық жауаптар үшін: 11-сапа статикаға ғана (collectstatic) жарайды
+BROTLI_QUALITY = 4
+# BREACH-ке қарсы кездейсоқ ұзындықты толтырманың ең үлкен өлшемі
+MAX_RANDOM_BYTES = 100
+
+COMPRESSIBLE_TYPES = {
+    'application/javascript', 'application/json', 'application/xml', 'image/svg+xml',
+}
+
+PRESERVED_BLOCK_RE = re.compile(r'<(pre|textarea|script|style)\b.*?</\1\s*>', re.S | re.I)
+# Шартты түсініктемелер (<!--[if IE]>) қалдырылады
+COMMENT_RE = re.compile(r'<!--(?!\[if).*?-->', re.S)
+WHITESPACE_RE = re.compile(r'\s+')
+# Ашылатын тег; тырнақшадағы атрибут мәндері (ішінде '>' болса да) бүтін алынады
+TAG_RE = re.compile(r'<[a-zA-Z](?:"[^"]*"|\'[^\']*\'|[^\'">])*>')
+QUOTED_OR_WHITESPACE_RE = re.compile(r'("[^"]*"|\'[^\']*\')|\s+')
+
+
+def get_min_size():
+    """Бұдан кіші жауаптарды сығу пайдасыз"""
+    return getattr(settings, 'RESPONSE_COMPRESSION_MIN_SIZE', 512)
+
+
+def _collapse_whitespace(match):
+    return '\n' if '\n' in match.group() else ' '
+
+
+def _collapse_outside_quotes(match):
+    return match.group(1) or _collapse_whitespace(match)
+
+
+def _minify_fragment(html):
+    """Тег арасындағы мәтін жиналады; тег ішінде атрибут мәндері өзгермейді"""
+    html = COMMENT_RE.sub('', html)
+    parts = []
+    position = 0
+    for match in TAG_RE.finditer(html):
+        parts.append(WHITESPACE_RE.sub(_collapse_whitespace, html[position:match.start()]))
+        parts.append(QUOTED_OR_WHITESPACE_RE.sub(_collapse_outside_quotes, match.group()))
+        position = match.end()
+    parts.append(WHITESPACE_RE.sub(_collapse_whitespace, html[position:]))
+    return ''.join(parts)
+
+
+def minify_html(html):
+    """Бос орындарды жинау; алдын ала пішімделген блоктар өзгеріссіз қалады"""
+    parts = []
+    position = 0
+    for match in PRESERVED_BLOCK_RE.finditer(html):
+        parts.append(_minify_fragment(html[position:match.start()]))
+        parts.append(match.group())
+        position = match.end()
+    parts.append(_minify_fragment(html[position:]))
+    return ''.join(parts)
+
+
+def is_compressible(content_type):
+    media_type = content_type.split(';')[0].strip().lower()
+    return (
+        media_type.startswith('text/')
+        or media_type in COMPRESSIBLE_TYPES
+        or media_type.endswith(('+xml', '+json'))
+    )
+
+
+def choose_encoding(accept_encoding):
+    accepted = accepted_encodings(accept_encoding)
+    if brotli is not None and 'br' in accepted:
+        return 'br'
+    if 'gzip' in accepted:
+        return 'gzip'
+    return None
+
+
+class GzipStream:
+    def __init__(self):
+        self.buffer = StreamingBuffer()
+        padding = secrets.token_hex(secrets.randbelow(MAX_RANDOM_BYTES // 2) + 1)
+        self.file = gzip.GzipFile(
+            filename=padding, mode='wb', compresslevel=GZIP_LEVEL, fileobj=self.buffer, mtime=0
+        )
+
+    def compress(self, data):
+        self.file.write(data)
+        return self.buffer.read()
+
+    def finish(self):
+        self.file.close()
+        return self.buffer.read()
+
+
+def brotli_padding(size):
+    """
+    `size` байттық бос метадеректер блогы (RFC 7932, 9.2): ISLAST=0,
+    MNIBBLES=0, MSKIPBYTES=1, одан кейін MSKIPLEN-1 және нөл байттар.
+    """
+    skip = size - 1
+    return bytes([0b00010110 | (skip & 0b11) << 6, skip >> 2]) + bytes(size)
+
+
+class BrotliStream:
+    def __init__(self):
+        self.compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        # flush() ағын тақырыбын байт шекарасына дейін жазады, сонда блокты қыстыруға болады
+        self.pending = self.compressor.flush() + brotli_padding(secrets.randbelow(MAX_RANDOM_BYTES) + 1)
+
+    def compress(self, data):
+        data = self.pending + self.compressor.process(data)
+        self.pending = b''
+        return data
+
+    def finish(self):
+        data = self.pending + self.compressor.finish()
+        self.pending = b''
+        return data
+
+
+STREAMS = {'gzip': GzipStream, 'br': BrotliStream}
+
+
+def compress_bytes(encoding, data):
+    stream = STREAMS[encoding]()
+    return stream.compress(data) + stream.finish()
+
+
+def compress_chunks(encoding, chunks):
+    stream = STREAMS[encoding]()
+    for chunk in chunks:
+        data = stream.compress(chunk)
+        if data:
+            yield data
+    yield stream.finish()
+
+
+async def acompress_chunks(encoding, chunks):
+    stream = STREAMS[encoding]()
+    async for chunk in chunks:
+        data = stream.compress(chunk)
+        if data:
+            yield data
+    yield stream.finish()
+
+
+class HtmlMinifyMiddleware(MiddlewareMixin):
+    """Толық (ағындық емес) HTML жауаптарын кішірейту"""
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'HTML_MINIFY', True):
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+    def process_response(self, request, response):
+        if (
+            response.streaming
+            or response.has_header('Content-Encoding')
+            or not response.get('Content-Type', '').startswith('text/html')
+        ):
+            return response
+
+        html = response.content.decode(response.charset)
+        response.content = minify_html(html).encode(response.charset)
+        if response.has_header('Content-Length'):
+            response.headers['Content-Length'] = str(len(response.content))
+        return response
+
+
+class ResponseCompressionMiddleware(MiddlewareMixin):
+    """
+    Мәтіндік жауаптарды brotli/gzip арқылы сығу.
+
+    Ағындық жауаптар үшін Content-Length алынып тасталады, өйткені
+    сығылған өлшем жауап толық жіберілгенше белгісіз. ASGI астында
+    MiddlewareMixin сығуды ағынға шығарады, event loop бөгелмейді.
+    """
+
+    def process_response(self, request, response):
+        if (
+            response.has_header('Content-Encoding')
+            or response.has_header('Content-Range')
+            or not is_compressible(response.get('Content-Type', ''))
+        ):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = choose_encoding(request.headers.get('Accept-Encoding', ''))
+        if encoding is None:
+            return response
+
+        min_size = get_min_size()
+        if response.streaming:
+            length = response.get('Content-Length')
+            if length is not None and int(length) < min_size:
+                return response
+            if response.is_async:
+                response.streaming_content = acompress_chunks(encoding, response.streaming_content)
+            else:
+                response.streaming_content = compress_chunks(encoding, response.streaming_content)
+            response.headers.pop('Content-Length')
+        else:
+            if len(response.content) < min_size:
+                return response
+            compressed = compress_bytes(encoding, response.content)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(compressed))
+
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoding
+        return response
@@ -0,0 +1,195 @@
+"""
+Оқу репликаларына маршруттау.
+
+Тек оқуға арналған көріністер (`replica_reads` декораторымен белгіленген)
+оқу сұрауларын репликаларға жібереді. Барлық жазбалар және сұраудың
+қалған бөлігі негізгі (default) базаға барады. Жазбадан кейін пайдаланушы
+қысқа уақыт (REPLICA_PIN_SECONDS) бойы негізгі базаға "бекітіледі",
+сондықтан ол өзі жазған деректерді бірден көреді.
+"""
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+PRIMARY_DB = 'default'
+PIN_COOKIE_NAME = 'edunotify_pin'
+
+# Ағымдағы сұраудың маршруттау күйі
+_replica_allowed = ContextVar('replica_allowed', default=False)
+_pinned = ContextVar('pinned', default=False)
+_wrote = ContextVar('wrote', default=False)
+_pin_writes = ContextVar('pin_writes', default=True)
+
+# Бұл қосымшалардың жазбалары пайдаланушыны бекітпейді (сессия, хабарламалар)
+UNPINNED_APP_LABELS = {'sessions'}
+
+
+def get_replicas():
+    """Конфигурацияланған реплика атаулары"""
+    return getattr(settings, 'REPLICA_DATABASES', [])
+
+
+def get_pin_seconds():
+    return getattr(settings, 'REPLICA_PIN_SECONDS', 5)
+
+
+def pin_to_primary():
+    """Сұраудың қалған бөлігін негізгі базаға бекіту"""
+    _pinned.set(True)
+
+
+def mark_write():
+    """Жазба болғанын белгілеу - келесі сұраулар да бекітіледі"""
+    _wrote.set(True)
+    _pinned.set(True)
+
+
+@contextmanager
+def read_from_replica():
+    """Көріністен тыс кодта оқуды репликаға жіберу"""
+    tokens = (_replica_allowed.set(True), _pinned.set(False))
+    try:
+        yield
+    finally:
+        _replica_allowed.reset(tokens[0])
+        _pinned.reset(tokens[1])
+
+
+@contextmanager
+def use_primary():
+    """Блок ішіндегі барлық оқуды негізгі базадан орындау"""
+    token = _replica_allowed.set(False)
+    try:
+        yield
+    finally:
+        _replica_allowed.reset(token)
+
+
+@contextmanager
+def unpinned_writes():
+    """
+    Блок ішіндегі жазбалар пайдаланушыны бекітпейді (оқу статистикасы
+    сияқты, пайдаланушы бірден көруі міндетті емес жазбалар)
+    """
+    token = _pin_writes.set(False)
+    try:
+        yield
+    finally:
+        _pin_writes.reset(token)
+
+
+def replica_reads(view_func):
+    """Көріністі тек оқуға арналған деп белгілеу"""
+    if iscoroutinefunction(view_func):
+        @wraps(view_func)
+        async def wrapper(*args, **kwargs):
+            return await view_func(*args, **kwargs)
+    else:
+        @wraps(view_func)
+        def wrapper(*args, **kwargs):
+            return view_func(*args, **kwargs)
+
+    wrapper.replica_reads = True
+    return wrapper
+
+
+class PrimaryReplicaRouter:
+    """Оқуды репликаларға, жазуды негізгі базаға бағыттайтын маршрутизатор"""
+
+    def db_for_read(self, model, **hints):
+        replicas = get_replicas()
+        if not replicas or _pinned.get() or not _replica_allowed.get():
+            return PRIMARY_DB
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        if model._meta.app_label not in UNPINNED_APP_LABELS and _pin_writes.get():
+            mark_write()
+        return PRIMARY_DB
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Репликалар негізгі базаның көшірмесі, сондықтан байланыстар рұқсат
+        databases = {PRIMARY_DB, *get_replicas()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+
+class ReplicaPinningMiddleware:
+    """
+    Әр сұрау үшін маршруттау күйін орнатады.
+
+    Қауіпсіз емес әдістер (POST т.б.) және жақында жазба жасаған
+    пайдаланушылар толығымен негізгі базаға барады.
+
+    ASGI астында күй корутинаның өз контекстінде орнатылады, ал
+    sync_to_async арқылы орындалатын ORM сұраулары оны көшіріп алады.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        tokens = self._start(request)
+        try:
+            return self._finish(self.get_response(request))
+        finally:
+            self._reset(tokens)
+
+    async def __acall__(self, request):
+        tokens = self._start(request)
+        try:
+            return self._finish(await self.get_response(request))
+        finally:
+            self._reset(tokens)
+
+    def _start(self, request):
+        return [
+            _replica_allowed.set(False),
+            _pinned.set(self._is_pinned(request)),
+            _wrote.set(False),
+        ]
+
+    @staticmethod
+    def _reset(tokens):
+        for var, token in zip((_replica_allowed, _pinned, _wrote), tokens):
+            var.reset(token)
+
+    @staticmethod
+    def _finish(response):
+        if _wrote.get():
+            pin_seconds = get_pin_seconds()
+            response.set_cookie(
+                PIN_COOKIE_NAME,
+                str(int(time.time()) + pin_seconds),
+                max_age=pin_seconds,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if getattr(view_func, 'replica_reads', False):
+            _replica_allowed.set(True)
+        return None
+
+    @staticmethod
+    def _is_pinned(request):
+        if request.method not in ('GET', 'HEAD', 'OPTIONS'):
+            return True
+        try:
+            pinned_until = int(request.COOKIES.get(PIN_COOKIE_NAME, 0))
+        except ValueError:
+            return False
+        return pinned_until > time.time()
@@ -31,16 +31,6 @@ ALLOWED_HOSTS = ['127.0.0.1', 'localhost']
 
 # Application definition
 
-TEMPLATES = [
-    {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
-        'DIRS': [os.path.join(BASE_DIR, 'templates')],  # Это должно быть
-        'APP_DIRS': True,
-        # ...
-    },
-]
-
-
 LANGUAGE_CODE = 'kk'  # әдепкі — қазақша
 
 LANGUAGES = [
@@ -77,6 +67,11 @@ AUTH_USER_MODEL = 'core.CustomUser'
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'edunotify.compression.ResponseCompressionMiddleware',
+    'edunotify.static_middleware.PrecompressedStaticMiddleware',
+    'edunotify.static_middleware.StaticFeedsMiddleware',
+    'edunotify.compression.HtmlMinifyMiddleware',
+    'edunotify.db_router.ReplicaPinningMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -120,6 +115,35 @@ DATABASES = {
     }
 }
 
+# Оқу репликалары: EDUNOTIFY_REPLICA_HOSTS="10.0.0.2,10.0.0.3"
+for index, host in enumerate(filter(None, os.environ.get('EDUNOTIFY_REPLICA_HOSTS', '').split(',')), 1):
+    DATABASES[f'replica_{index}'] = {
+        **DATABASES['default'],
+        'HOST': host.strip(),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+# Жергілікті тексеру үшін екі SQLite базасы: EDUNOTIFY_DB=sqlite
+if os.environ.get('EDUNOTIFY_DB') == 'sqlite':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+        },
+        'replica_1': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db_replica.sqlite3',
+            'TEST': {'MIRROR': 'default'},
+        },
+    }
+
+DATABASE_ROUTERS = ['edunotify.db_router.PrimaryReplicaRouter']
+REPLICA_DATABASES = [alias for alias in DATABASES if alias != 'default']
+# Тесттерде реплика маршруттауы өшірулі (edunotify.settings_test, pytest үшін)
+TEST_RUNNER = 'edunotify.test_runner.PrimaryOnlyTestRunner'
+# Жазбадан кейін пайдаланушы негізгі базаға қанша секунд бекітіледі
+REPLICA_PIN_SECONDS = 5
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
@@ -163,6 +187,10 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Ауыстырылған суреттерді commit-тен кейін фондық ағында өшіру (core.uploads);
+# 'queue' - core.jobs кезегі арқылы (run_jobs worker-і керек)
+UPLOAD_CLEANUP_BACKGROUND = True
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 
@@ -177,9 +205,105 @@ EMAIL_HOST_USER = 'dinmmixw@bk.ru'
 EMAIL_HOST_PASSWORD = 'CmYDPttYdj3IGyb1objQ'
 DEFAULT_FROM_EMAIL = 'dinmmixw@bk.ru'
 
+# Хаттардағы сілтемелер үшін сайт адресі
+SITE_URL = os.environ.get('EDUNOTIFY_SITE_URL', 'http://localhost:8000')
+
 # Email settings for testing (if SMTP doesn't work)
 # EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 
+# Cache
+# Бірнеше процесс/сервер үшін ортақ кэш: EDUNOTIFY_REDIS_URL="redis://localhost:6379/1"
+if os.environ.get('EDUNOTIFY_REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['EDUNOTIFY_REDIS_URL'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Үлкен тізімдердің пагинациясы (core.paginator.EstimatedCountPaginator)
+ESTIMATED_COUNT_THRESHOLD = 10000
+ESTIMATED_COUNT_CACHE_TTL = 300
+ESTIMATED_COUNT_BACKGROUND = True
+
+# Динамикалық жауаптарды кішірейту (edunotify.compression)
+HTML_MINIFY = True
+RESPONSE_COMPRESSION_MIN_SIZE = 512
+
+# Async көріністердегі тәуелсіз сұрауларды бөлек қосылымдарда қатар орындау
+# (core.concurrency, тек PostgreSQL; edunotify.settings_asgi қосады)
+ASYNC_CONCURRENT_QUERIES = False
+
+# Жоспарланған хабарландырулар (core.scheduling, `manage.py run_scheduler`)
+SCHEDULER_BATCH_SIZE = 500
+SCHEDULER_MAX_SLEEP = 60
+
+# Клиенттерге арналған өзгерістер ағыны (core.changes, `manage.py compact_changes`)
+CHANGE_FEED_RETENTION_DAYS = 30
+CHANGE_FEED_SETTLE_SECONDS = 5
+
+# Хабарландыру таралымы (core.reach): өте үлкен аудиторияда HyperLogLog жуық санауышы
+REACH_APPROXIMATE = False
+
+# core_notification кестесін created_at бойынша бөлімдеу (core.partitioning, тек PostgreSQL).
+# Қосу 0012 миграциясынан бұрын болуы керек; кезең: 'month' немесе 'term'
+NOTIFICATION_PARTITIONING = False
+NOTIFICATION_PARTITION_INTERVAL = 'month'
+NOTIFICATION_PARTITIONS_AHEAD = 3
+
+# Webhook-тар (core.webhooks): commit-тен кейін фондық ағында жіберу,
+# қайталауларды `deliver_webhooks` worker-і орындайды
+WEBHOOK_DELIVERY_BACKGROUND = True
+WEBHOOK_TIMEOUT = 10
+WEBHOOK_MAX_ATTEMPTS = 8
+WEBHOOK_RETRY_BASE = 10
+WEBHOOK_RETRY_MAX = 3600
+WEBHOOK_MAX_CONCURRENCY = 50
+WEBHOOK_BATCH_SIZE = 500
+WEBHOOK_POLL_SECONDS = 5
+
+# Atom арналары (core.feeds): хабарландыру өзгергенде FEEDS_ROOT-қа жазылады.
+# Production-да FEEDS_URL-ді nginx тікелей береді (gzip_static on)
+FEEDS_ROOT = BASE_DIR / 'feeds'
+FEEDS_URL = '/feeds/'
+FEED_ITEMS = 50
+
+# CSV/XLSX экспорттары (core.exports): бір рет оқылатын жолдар саны
+EXPORT_CHUNK_SIZE = 2000
+
+# Дерекқордағы тапсырмалар кезегі (core.jobs): `run_jobs` worker-і орындайды
+JOB_BATCH_SIZE = 20
+JOB_VISIBILITY_TIMEOUT = 300
+JOB_MAX_ATTEMPTS = 5
+JOB_RETRY_BASE = 10
+JOB_RETRY_MAX = 3600
+JOB_POLL_SECONDS = 5
+
+# Sessions & authentication cache
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+MESSAGE_STORAGE = 'django.contrib.messages.storage.cookie.CookieStorage'
+AUTHENTICATION_BACKENDS = ['accounts.backends.CachedModelBackend']
+AUTH_USER_CACHE_TIMEOUT = 300
+
+# Кіру/тіркелу/парольді қалпына келтіруді шектеу (accounts.throttling):
+# {әрекет: {'ip' | 'username': (шек, терезе секундпен)}}, құлып екі еселеніп өседі
+AUTH_THROTTLE_RULES = {
+    'login': {'ip': (100, 300), 'username': (5, 300)},
+    'register': {'ip': (30, 3600)},
+    'password_reset': {'ip': (20, 3600), 'username': (3, 3600)},
+}
+AUTH_THROTTLE_LOCKOUT = 60
+AUTH_THROTTLE_MAX_LOCKOUT = 3600
+# Клиент IP-ін осы прокси(лер)ден келген сұрауда ғана тақырыптан алу (nginx)
+AUTH_THROTTLE_TRUSTED_PROXIES = ['127.0.0.1', '::1']
+AUTH_THROTTLE_CLIENT_IP_HEADER = 'HTTP_X_FORWARDED_FOR'
+
 # Authentication URLs
 LOGIN_URL = 'login'
 LOGIN_REDIRECT_URL = 'home'
@@ -0,0 +1,22 @@
+"""
+ASGI deployment profile.
+
+    DJANGO_SETTINGS_MODULE=edunotify.settings_asgi uvicorn edunotify.asgi:application --workers 4
+
+Басты бет, админ панелі және хабарландырулар тізімі async көріністермен
+(edunotify.urls_asgi) беріледі. PostgreSQL-де олардың тәуелсіз сұраулары
+бөлек қосылымдарда қатар орындалады (core.concurrency), сондықтан бір
+сұрау бірнеше қосылым ашуы мүмкін - алдына PgBouncer қойыңыз.
+"""
+
+from .settings_production import *  # noqa: F401,F403
+from .settings_production import DATABASES
+
+ROOT_URLCONF = 'edunotify.urls_asgi'
+
+ASYNC_CONCURRENT_QUERIES = True
+
+# Django 4.2-де тұрақты қосылымдар тек сұрау ағынында жабылады, ал async
+# көріністер ORM-ді әртүрлі ағындардан шақырады - пулды PgBouncer атқарады
+for database in DATABASES.values():
+    database['CONN_MAX_AGE'] = 0
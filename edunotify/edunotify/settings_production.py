@@ -0,0 +1,57 @@
+"""
+Production settings for edunotify project.
+
+    DJANGO_SETTINGS_MODULE=edunotify.settings_production gunicorn edunotify.wsgi
+
+Шаблондар cached loader арқылы бір рет талданады, ал TEMPLATE_WARMUP
+барлық шаблонды worker іске қосылғанда алдын ала компиляциялайды.
+"""
+
+from .settings import *  # noqa: F401,F403
+from .settings import BASE_DIR, os
+
+DEBUG = False
+
+SECRET_KEY = os.environ.get('DJANGO_SECRET_KEY', SECRET_KEY)  # noqa: F405
+
+ALLOWED_HOSTS = os.environ.get('EDUNOTIFY_ALLOWED_HOSTS', '127.0.0.1,localhost').split(',')
+
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [BASE_DIR / 'templates'],
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+            ],
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
+        },
+    },
+]
+
+# collectstatic: хэштелген атаулар және .gz/.br көшірмелер (edunotify.storage)
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'edunotify.storage.CompressedManifestStaticFilesStorage'},
+}
+
+# Worker іске қосылғанда барлық шаблонды компиляциялау (edunotify.warmup)
+TEMPLATE_WARMUP = True
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'edunotify': {'handlers': ['console'], 'level': 'INFO'},
+    },
+}
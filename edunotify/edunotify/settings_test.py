@@ -0,0 +1,14 @@
+"""
+Тест профилі.
+
+    python manage.py test --settings=edunotify.settings_test
+    DJANGO_SETTINGS_MODULE=edunotify.settings_test pytest
+
+Тесттерде реплика негізгі базаның айнасы (MIRROR), бірақ тест транзакциясының
+деректерін көрмейді - сондықтан реплика маршруттауы тек оны тексеретін
+тесттерде override_settings арқылы қосылады.
+"""
+
+from .settings import *  # noqa: F401,F403
+
+REPLICA_DATABASES = []
@@ -0,0 +1,142 @@
+"""
+STATIC_ROOT ішіндегі файлдарды Django арқылы тиімді беру.
+
+Nginx/CDN жоқ орталарда (бір контейнер, PaaS) статикалық файлдарды
+алдын ала сығылған нұсқасымен (`.br`, `.gz`) береді. Хэштелген атаулар
+(ManifestStaticFilesStorage) бір жылға кэштеледі, басқалары - қысқа уақытқа.
+`StaticFeedsMiddleware` дәл солай FEEDS_ROOT-тағы Atom арналарын береді
+(core.feeds): сессия мен дерекқорға дейін жауап қайтарылады.
+"""
+import mimetypes
+import os
+import re
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.http import http_date, parse_http_date_safe
+
+# base.3f2a9c1d7e4b.css - ManifestStaticFilesStorage хэші (12 он алтылық таңба)
+HASHED_NAME_RE = re.compile(r'\.[0-9a-f]{12}\.[^/.]+$')
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+DEFAULT_CACHE_CONTROL = 'public, max-age=60'
+
+# Accept-Encoding ретімен емес, тиімділік ретімен тексеріледі
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+def accepted_encodings(header):
+    """Accept-Encoding тақырыбынан q=0 емес кодтаулар жиыны"""
+    accepted = set()
+    for item in header.split(','):
+        name, _, params = item.strip().partition(';')
+        quality = params.strip()
+        if quality.startswith('q='):
+            try:
+                if float(quality[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        if name:
+            accepted.add(name.strip().lower())
+    return accepted
+
+
+class PrecompressedStaticMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        url, root = self.get_location()
+        self.static_url = '/' + url.lstrip('/')
+        self.static_root = str(root) if root else None
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def get_location(self):
+        """(URL префиксі, файлдар бумасы)"""
+        return settings.STATIC_URL, settings.STATIC_ROOT
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if self._is_static(request):
+            response = self.serve(request, request.path_info[len(self.static_url):])
+            if response is not None:
+                return response
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        # Файлдық жүйеге тек статикалық жолдар үшін ғана ағынға ауысамыз
+        if self._is_static(request):
+            response = await sync_to_async(self.serve)(request, request.path_info[len(self.static_url):])
+            if response is not None:
+                return response
+        return await self.get_response(request)
+
+    def _is_static(self, request):
+        return (
+            self.static_root
+            and request.method in ('GET', 'HEAD')
+            and request.path_info.startswith(self.static_url)
+        )
+
+    def serve(self, request, name):
+        try:
+            path = safe_join(self.static_root, name)
+        except SuspiciousFileOperation:
+            return None
+        if not os.path.isfile(path):
+            return None
+
+        stat = os.stat(path)
+        etag = f'"{int(stat.st_mtime):x}-{stat.st_size:x}"'
+        if self._not_modified(request, stat, etag):
+            response = HttpResponseNotModified()
+            response.headers['Last-Modified'] = http_date(stat.st_mtime)
+            self._add_cache_headers(response, name, etag)
+            return response
+
+        content_type, _ = mimetypes.guess_type(path)
+        accepted = accepted_encodings(request.headers.get('Accept-Encoding', ''))
+        served_path, encoding = path, None
+        for candidate, suffix in ENCODINGS:
+            if candidate in accepted and os.path.isfile(path + suffix):
+                served_path, encoding = path + suffix, candidate
+                break
+
+        response = FileResponse(open(served_path, 'rb'), content_type=content_type or 'application/octet-stream')
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        response.headers['Content-Length'] = os.path.getsize(served_path)
+        response.headers['Last-Modified'] = http_date(stat.st_mtime)
+        self._add_cache_headers(response, name, etag)
+        return response
+
+    @staticmethod
+    def _not_modified(request, stat, etag):
+        # If-None-Match берілсе, If-Modified-Since ескерілмейді (RFC 9110)
+        if_none_match = request.headers.get('If-None-Match')
+        if if_none_match:
+            return etag in if_none_match
+        since = parse_http_date_safe(request.headers.get('If-Modified-Since', ''))
+        return since is not None and int(stat.st_mtime) <= since
+
+    @staticmethod
+    def _add_cache_headers(response, name, etag):
+        response.headers['ETag'] = etag
+        response.headers['Vary'] = 'Accept-Encoding'
+        response.headers['Cache-Control'] = (
+            IMMUTABLE_CACHE_CONTROL if HASHED_NAME_RE.search(name) else DEFAULT_CACHE_CONTROL
+        )
+
+
+class StaticFeedsMiddleware(PrecompressedStaticMiddleware):
+    """FEEDS_ROOT-тағы алдын ала жазылған Atom арналары (core.feeds)"""
+
+    def get_location(self):
+        return getattr(settings, 'FEEDS_URL', '/feeds/'), getattr(settings, 'FEEDS_ROOT', None)
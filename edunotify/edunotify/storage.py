@@ -0,0 +1,64 @@
+"""
+Статикалық файлдарды алдын ала сығу.
+
+`collectstatic` кезінде ManifestStaticFilesStorage файлдарды хэштейді
+(base.3f2a9c1d7e4b.css), ал бұл storage әр мәтіндік файлдың қасына
+`.gz` және (brotli орнатылған болса) `.br` нұсқаларын жазады.
+Оларды `edunotify.static_middleware.PrecompressedStaticMiddleware` береді.
+"""
+import gzip
+import os
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli міндетті емес
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = {'.css', '.js', '.svg', '.txt', '.html', '.json', '.xml', '.map', '.ico'}
+# Бұдан кіші файлдарды сығу пайдасыз
+MIN_COMPRESS_SIZE = 256
+
+
+def compressed_variants(data):
+    """[(жұрнақ, сығылған дерек)]; тек өлшемі кішірейгендері"""
+    if len(data) < MIN_COMPRESS_SIZE:
+        return []
+    variants = [('.gz', gzip.compress(data, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        variants.append(('.br', brotli.compress(data, quality=11)))
+    return [(suffix, compressed) for suffix, compressed in variants if len(compressed) < len(data)]
+
+
+def compress_file(path):
+    """`path` қасына .gz/.br жазу; тек өлшемі кішірейсе сақталады"""
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    written = []
+    for suffix, compressed in compressed_variants(data):
+        with open(path + suffix, 'wb') as f:
+            f.write(compressed)
+        written.append(path + suffix)
+    return written
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Хэштелген атаулар + алдын ала сығылған .gz/.br көшірмелер"""
+
+    def post_process(self, paths, dry_run=False, **options):
+        processed = []
+        for name, hashed_name, was_processed in super().post_process(paths, dry_run, **options):
+            processed.append((name, hashed_name))
+            yield name, hashed_name, was_processed
+
+        if dry_run:
+            return
+
+        for name, hashed_name in processed:
+            for target in {name, hashed_name}:
+                if not isinstance(target, str):
+                    continue
+                if os.path.splitext(target)[1].lower() in COMPRESSIBLE_EXTENSIONS and self.exists(target):
+                    compress_file(self.path(target))
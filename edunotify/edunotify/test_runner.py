@@ -0,0 +1,17 @@
+"""
+`manage.py test` үшін runner: settings_test профиліндегідей реплика
+маршруттауын өшіреді (pytest-те edunotify.settings_test қолданыңыз).
+"""
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class PrimaryOnlyTestRunner(DiscoverRunner):
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._primary_only = override_settings(REPLICA_DATABASES=[])
+        self._primary_only.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._primary_only.disable()
+        super().teardown_test_environment(**kwargs)
@@ -2,6 +2,7 @@ from django.contrib import admin
 from django.urls import path, include
 from django.contrib.auth import views as auth_views
 from accounts import views as account_views
+from accounts.throttling import throttle_posts
 from core import views as core_views
 from django.conf import settings
 from django.conf.urls.static import static
@@ -50,12 +51,12 @@ urlpatterns = [
     
 
     path('password-reset/', 
-         auth_views.PasswordResetView.as_view(
+         throttle_posts('password_reset', username_field='email')(auth_views.PasswordResetView.as_view(
              template_name='auth/password_reset.html',
              email_template_name='auth/password_reset_email.html',
              subject_template_name='auth/password_reset_subject.txt',
              success_url='/password-reset/done/'
-         ), 
+         )), 
          name='password_reset'),
     path('password-reset/done/', 
          auth_views.PasswordResetDoneView.as_view(
@@ -77,6 +78,7 @@ urlpatterns = [
     path('notifications/', include('notifications.urls')),
 
     path('admin-dashboard/', core_views.admin_dashboard, name='admin_dashboard'),
+    path('admin-dashboard/export/', core_views.export_data, name='export_data'),
     path('manage-groups/', core_views.manage_groups, name='manage_groups'),
     path('manage-groups/<int:group_id>/edit/', core_views.edit_group, name='edit_group'),
     path('manage-groups/<int:group_id>/delete/', core_views.delete_group, name='delete_group'),
@@ -85,12 +87,13 @@ urlpatterns = [
     path('user-management/<int:user_id>/edit/', core_views.edit_user, name='edit_user'),
     path('user-management/<int:user_id>/delete/', core_views.delete_user, name='delete_user'),
     path('api/user/<int:user_id>/', core_views.get_user_api, name='get_user_api'),
+    path('api/users/', core_views.get_users_api, name='get_users_api'),
 ]
 
 if settings.DEBUG:
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
 
-    from django.conf.urls.i18n import set_language
+from django.conf.urls.i18n import set_language
 
 urlpatterns += [
     path('i18n/setlang/', set_language, name='set_language'),
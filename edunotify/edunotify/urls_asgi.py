@@ -0,0 +1,18 @@
+"""
+ASGI профилінің URL-дары (edunotify.settings_asgi).
+
+Ең көп қаралатын беттердің async нұсқалары сол жолдар мен атаулармен
+негізгі URL-дардың алдына қойылады; қалғаны edunotify.urls-тен алынады.
+"""
+from django.urls import path
+
+from core import views as core_views
+from notifications import views as notification_views
+
+from .urls import urlpatterns as wsgi_urlpatterns
+
+urlpatterns = [
+    path('', core_views.home_async, name='home'),
+    path('admin-dashboard/', core_views.admin_dashboard_async, name='admin_dashboard'),
+    path('notifications/', notification_views.notifications_list_async, name='notifications'),
+] + wsgi_urlpatterns
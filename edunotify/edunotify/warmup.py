@@ -0,0 +1,51 @@
+"""
+Worker іске қосылғандағы дайындық.
+
+`warm_templates` TEMPLATES['DIRS'] ішіндегі барлық шаблонды cached loader
+арқылы компиляциялайды, сондықтан бірінші сұраулар `base.html` және
+басқа шаблондарды талдауға уақыт жұмсамайды.
+"""
+import logging
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.template import TemplateSyntaxError, engines
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_SUFFIXES = ('.html', '.txt')
+
+
+def iter_template_names():
+    """Жоба шаблондарының аттары (DIRS ішіндегі салыстырмалы жолдар)"""
+    for engine in engines.all():
+        for directory in getattr(engine, 'dirs', []):
+            root = Path(directory)
+            for path in sorted(root.rglob('*')):
+                if path.suffix in TEMPLATE_SUFFIXES:
+                    yield engine, path.relative_to(root).as_posix()
+
+
+def warm_templates():
+    """Барлық шаблонды компиляциялау, (саны, секунд, қателер) қайтарады"""
+    started = time.perf_counter()
+    compiled = 0
+    errors = []
+    for engine, name in iter_template_names():
+        try:
+            engine.get_template(name)
+            compiled += 1
+        except TemplateSyntaxError as exc:
+            errors.append((name, exc))
+            logger.error('Template %s failed to compile: %s', name, exc)
+    elapsed = time.perf_counter() - started
+    logger.info('Compiled %d templates in %.1f ms', compiled, elapsed * 1000)
+    return compiled, elapsed, errors
+
+
+def warm_up():
+    """wsgi.py/asgi.py application құрылғаннан кейін шақырылады; өшірулі болса None"""
+    if getattr(settings, 'TEMPLATE_WARMUP', False):
+        return warm_templates()
+    return None
@@ -0,0 +1,139 @@
+"""
+Хабарландыру дайджесттері (күнделікті / апталық email).
+
+Хабарландырулар бір сұраумен (алдымен жалпы, сосын группа және уақыт
+бойынша) ағынмен оқылады. Пайдаланушылар да группа бойынша сұрыпталып
+ағынмен оқылады, сондықтан екі ағын merge-join арқылы біріктіріледі:
+әр пайдаланушы үшін жеке сұрау жоқ, жұмыс уақыты сызықтық.
+"""
+import heapq
+from datetime import timedelta
+from itertools import groupby
+from operator import itemgetter
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.template.loader import get_template
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.dateformat import format as date_format
+
+from core.models import CustomUser, Notification
+
+DIGEST_PERIODS = {
+    'daily': timedelta(days=1),
+    'weekly': timedelta(days=7),
+}
+
+DIGEST_TEMPLATE = 'notifications/digest_email.txt'
+
+NOTIFICATION_FIELDS = ('id', 'title', 'excerpt', 'notification_type', 'group_id', 'is_important', 'created_at')
+USER_FIELDS = ('id', 'username', 'first_name', 'email', 'group_id')
+
+_by_created_at = itemgetter('created_at')
+_by_stream_key = itemgetter('notification_type', 'group_id')
+
+
+def stream_notifications(since, chunk_size=2000):
+    """Бір сұрау: жалпы хабарландырулар, сосын группа және уақыт бойынша"""
+    return (
+        Notification.objects
+        .filter(status='active', created_at__gte=since)
+        .order_by('notification_type', 'group_id', 'created_at')
+        .values(*NOTIFICATION_FIELDS)
+        .iterator(chunk_size=chunk_size)
+    )
+
+
+def stream_recipients(frequency, chunk_size=2000):
+    """Дайджест алатын пайдаланушылар, группа бойынша сұрыпталған"""
+    return (
+        CustomUser.objects
+        .filter(digest_frequency=frequency, is_active=True)
+        .exclude(email='')
+        .order_by('group_id', 'id')
+        .values(*USER_FIELDS)
+        .iterator(chunk_size=chunk_size)
+    )
+
+
+def prepare(notifications):
+    """
+    Әр хабарландыруға арналған мәндерді бір рет есептеу.
+
+    Бір хабарландыру мыңдаған дайджестке кіреді, сондықтан күн форматы
+    және сілтеме әр пайдаланушы үшін қайта есептелмейді (қысқа мәтін
+    Notification.excerpt-те сақталған).
+    """
+    for notification in notifications:
+        notification['created_display'] = date_format(
+            timezone.localtime(notification['created_at']), 'd.m.Y H:i'
+        )
+        notification['url'] = reverse('notification_detail', args=[notification['id']])
+        yield notification
+
+
+def iter_digests(frequency, now=None):
+    """(пайдаланушы, хабарландырулар) жұптарын ағынмен қайтару"""
+    now = now or timezone.now()
+    notifications = prepare(stream_notifications(now - DIGEST_PERIODS[frequency]))
+    stream = groupby(notifications, key=_by_stream_key)
+    current = next(stream, None)
+
+    general = []
+    while current is not None and current[0][0] == 'general':
+        general.extend(current[1])
+        current = next(stream, None)
+    general.sort(key=_by_created_at)
+
+    loaded_group_id, group_posts = None, []
+    for user in stream_recipients(frequency):
+        group_id = user['group_id']
+        if group_id is None:
+            posts = general
+        else:
+            if group_id != loaded_group_id:
+                # Пайдаланушылар да группа бойынша сұрыпталған: ағынды алға жылжыту
+                group_posts = []
+                while current is not None and (current[0][1] is None or current[0][1] < group_id):
+                    current = next(stream, None)
+                if current is not None and current[0][1] == group_id:
+                    group_posts = list(current[1])
+                    current = next(stream, None)
+                loaded_group_id = group_id
+            posts = list(heapq.merge(general, group_posts, key=_by_created_at)) if group_posts else general
+        if posts:
+            yield user, posts
+
+
+def send_digests(frequency, now=None, connection=None, batch_size=500):
+    """Барлық дайджестті бір шаблонмен және бір пошта қосылымымен жіберу"""
+    template = get_template(DIGEST_TEMPLATE)
+    connection = connection or get_connection()
+    site_url = getattr(settings, 'SITE_URL', '')
+    profile_url = site_url + reverse('profile')
+    sent = 0
+    batch = []
+
+    with connection:
+        for user, posts in iter_digests(frequency, now=now):
+            body = template.render({
+                'user': user,
+                'notifications': posts,
+                'frequency': frequency,
+                'site_url': site_url,
+                'profile_url': profile_url,
+            })
+            batch.append(EmailMessage(
+                subject=f'EduNotify: {len(posts)} жаңа хабарландыру',
+                body=body,
+                to=[user['email']],
+                connection=connection,
+            ))
+            if len(batch) >= batch_size:
+                sent += connection.send_messages(batch) or 0
+                batch = []
+        if batch:
+            sent += connection.send_messages(batch) or 0
+
+    return sent
@@ -1,12 +1,18 @@
 from django import forms
 from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import UploadedFile
+from django.utils import timezone
+from core.catalogue import GroupChoiceField
 from core.models import Notification
+from core.uploads import InvalidImage, inspect_image
 import os
 
 class NotificationForm(forms.ModelForm):
     class Meta:
         model = Notification
-        fields = ['title', 'content', 'notification_type', 'group', 'image', 'is_important']
+        fields = ['title', 'content', 'notification_type', 'group', 'image', 'is_important', 'publish_at', 'expires_at']
+        # forms.ImageField суретті толық тексереді (verify); clean_image тек тақырыбын оқиды
+        field_classes = {'group': GroupChoiceField, 'image': forms.FileField}
         widgets = {
             'title': forms.TextInput(attrs={
                 'class': 'form-control',
@@ -20,9 +26,29 @@ class NotificationForm(forms.ModelForm):
             'notification_type': forms.Select(attrs={'class': 'form-control'}),
             'group': forms.Select(attrs={'class': 'form-control'}),
             'image': forms.FileInput(attrs={'class': 'form-control'}),
-            'is_important': forms.CheckboxInput(attrs={'class': 'form-check-input'})
+            'is_important': forms.CheckboxInput(attrs={'class': 'form-check-input'}),
+            'publish_at': forms.DateTimeInput(attrs={'class': 'form-control', 'type': 'datetime-local'},
+                                              format='%Y-%m-%dT%H:%M'),
+            'expires_at': forms.DateTimeInput(attrs={'class': 'form-control', 'type': 'datetime-local'},
+                                              format='%Y-%m-%dT%H:%M'),
         }
     
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Жарияланған хабарландырудың уақыты өзгермейді: жіберілген мән еленбейді
+        if self.instance.pk and not self.instance.is_scheduled:
+            del self.fields['publish_at']
+    
+    def clean(self):
+        cleaned_data = super().clean()
+        publish_at = cleaned_data.get('publish_at', self.instance.publish_at)
+        expires_at = cleaned_data.get('expires_at')
+        
+        if expires_at and expires_at <= (publish_at or timezone.now()):
+            self.add_error('expires_at', 'Аяқталу уақыты жариялану уақытынан кейін болуы керек.')
+        
+        return cleaned_data
+    
     def clean_image(self):
         image = self.cleaned_data.get('image')
         
@@ -33,6 +59,12 @@ class NotificationForm(forms.ModelForm):
             
             if image.size > 5 * 1024 * 1024:  # 5MB
                 raise ValidationError('Суреттің өлшемі 5MB-тан аспауы керек.')
+            
+            if isinstance(image, UploadedFile):
+                try:
+                    inspect_image(image)
+                except InvalidImage as exc:
+                    raise ValidationError(str(exc))
         
         return image
 
@@ -0,0 +1,82 @@
+import time
+
+from django.core import mail
+from django.core.mail import get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from django.core.management.base import BaseCommand
+from core.models import CustomUser, Group, Notification
+from notifications.digest import send_digests
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Дайджест құрастырудың өнімділігін locmem пошта бэкендімен өлшеу (деректер қайтарылады)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100_000)
+        parser.add_argument('--groups', type=int, default=200)
+        parser.add_argument('--general', type=int, default=4, help='Жалпы хабарландырулар саны')
+        parser.add_argument('--per-group', type=int, default=8, help='Әр группаға хабарландырулар саны')
+        parser.add_argument('--steps', type=int, default=4)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self._run(options)
+                raise Rollback
+        except Rollback:
+            self.stdout.write('Тест деректері қайтарылды.')
+
+    def _run(self, options):
+        groups = Group.objects.bulk_create(
+            Group(name=f'bench-{i}') for i in range(options['groups'])
+        )
+        author = CustomUser.objects.create_user(
+            username='bench-author', email='bench-author@example.com', role='admin'
+        )
+        notifications = [
+            Notification(title=f'Жалпы хабарландыру {i}', content='Мазмұны ' * 30,
+                         notification_type='general', created_by=author)
+            for i in range(options['general'])
+        ]
+        notifications += [
+            Notification(title=f'{group.name}: хабарландыру {i}', content='Мазмұны ' * 30,
+                         notification_type='group', group=group, created_by=author)
+            for group in groups for i in range(options['per_group'])
+        ]
+        # bulk_create save()-ті шақырмайды
+        for notification in notifications:
+            notification.render_content()
+        Notification.objects.bulk_create(notifications, batch_size=2000)
+
+        connection = get_connection('django.core.mail.backends.locmem.EmailBackend')
+        step = options['users'] // options['steps']
+        created = 0
+        self.stdout.write(f'{"users":>10} {"sent":>10} {"seconds":>10} {"µs/user":>10}')
+        for _ in range(options['steps']):
+            CustomUser.objects.bulk_create(
+                (
+                    CustomUser(
+                        username=f'bench-{n}',
+                        email=f'bench-{n}@example.com',
+                        password='!',
+                        group=groups[n % len(groups)] if n % 7 else None,
+                        digest_frequency='daily',
+                    )
+                    for n in range(created, created + step)
+                ),
+                batch_size=2000,
+            )
+            created += step
+
+            mail.outbox = []
+            started = time.perf_counter()
+            sent = send_digests('daily', now=timezone.now(), connection=connection)
+            elapsed = time.perf_counter() - started
+            self.stdout.write(f'{created:>10} {sent:>10} {elapsed:>10.2f} {elapsed / created * 1e6:>10.1f}')
+        mail.outbox = []
@@ -0,0 +1,81 @@
+import time
+
+from django.db import transaction
+from django.test import Client, override_settings
+
+from django.core.management.base import BaseCommand
+from core.models import CustomUser, Group, Notification
+
+PAGES = [
+    '/',
+    '/notifications/',
+    '/notifications/?page=2',
+    '/notifications/archive/',
+    '/admin/core/notification/',
+]
+
+# (атауы, HTML_MINIFY, Accept-Encoding)
+VARIANTS = [
+    ('raw', False, 'identity'),
+    ('minified', True, 'identity'),
+    ('minified+gzip', True, 'gzip'),
+    ('minified+br', True, 'br, gzip'),
+]
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Хабарландыру беттерінің өлшемі мен CPU уақытын минификация/сығу нұсқалары бойынша өлшеу (деректер қайтарылады)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--notifications', type=int, default=2000)
+        parser.add_argument('--requests', type=int, default=20, help='Әр бет пен нұсқаға сұраулар саны')
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self._run(options)
+                raise Rollback
+        except Rollback:
+            self.stdout.write('Тест деректері қайтарылды.')
+
+    def _run(self, options):
+        group = Group.objects.create(name='bench-group')
+        admin = CustomUser.objects.create_user(
+            username='bench-admin', email='bench-admin@example.com', role='admin',
+            is_staff=True, is_superuser=True, group=group,
+        )
+        notifications = [
+            Notification(title=f'Хабарландыру {i}', content='Мазмұны ' * 60,
+                         notification_type='group' if i % 3 else 'general',
+                         group=group if i % 3 else None, created_by=admin)
+            for i in range(options['notifications'])
+        ]
+        # bulk_create save()-ті шақырмайды
+        for notification in notifications:
+            notification.render_content()
+        Notification.objects.bulk_create(notifications, batch_size=2000)
+        for notification in notifications[:50]:
+            notification.archive(user=admin)
+
+        self.stdout.write(f'{"page":<28} {"variant":<15} {"bytes":>9} {"ratio":>7} {"CPU ms/req":>11}')
+        for page in PAGES:
+            raw_size = None
+            for name, minify, accept_encoding in VARIANTS:
+                # Middleware бірінші сұрауда жүктеледі, сондықтан әр нұсқаға жаңа клиент.
+                # Репликалар транзакциядағы тест деректерін көрмейді.
+                with override_settings(HTML_MINIFY=minify, ALLOWED_HOSTS=['testserver'], REPLICA_DATABASES=[]):
+                    client = Client(headers={'accept-encoding': accept_encoding})
+                    client.force_login(admin)
+                    size = len(client.get(page).content)
+                    started = time.process_time()
+                    for _ in range(options['requests']):
+                        client.get(page)
+                    cpu = (time.process_time() - started) / options['requests']
+                raw_size = raw_size or size
+                self.stdout.write(
+                    f'{page:<28} {name:<15} {size:>9} {size / raw_size:>7.1%} {cpu * 1000:>11.2f}'
+                )
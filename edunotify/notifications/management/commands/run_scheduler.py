@@ -0,0 +1,42 @@
+import time
+
+from django.db import DatabaseError, connection
+from django.utils import timezone
+
+from django.core.management.base import BaseCommand
+from core.scheduling import (
+    activate_due, expire_due, listen_for_schedule_changes, next_due_time, seconds_until, wait_for_schedule_change,
+)
+
+RETRY_SECONDS = 5
+
+
+class Command(BaseCommand):
+    help = 'Жоспарланған хабарландыруларды жариялау және мерзімі өткендерін архивтеу (worker)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Бір рет орындап, шығу')
+        parser.add_argument('--batch-size', type=int, default=None)
+
+    def handle(self, *args, **options):
+        while True:
+            try:
+                # LISTEN келесі есептеуден бұрын: арадағы NOTIFY жоғалмайды
+                # (қосылым ауысса, жаңа қосылымда қайталанады)
+                listen_for_schedule_changes()
+                now = timezone.now()
+                activated = activate_due(now, options['batch_size'])
+                expired = expire_due(now, options['batch_size'])
+                if activated or expired:
+                    self.stdout.write(f'{timezone.localtime(now):%d.%m.%Y %H:%M:%S} '
+                                      f'жарияланды: {activated}, архивтелді: {expired}')
+                if options['once']:
+                    return
+                wait_for_schedule_change(seconds_until(next_due_time()))
+            except DatabaseError as exc:
+                if options['once']:
+                    raise
+                # Қосылым үзілсе, қайта қосылып LISTEN-ді жаңарту
+                self.stderr.write(f'Дерекқор қатесі: {exc}')
+                connection.close()
+                time.sleep(RETRY_SECONDS)
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from notifications.digest import DIGEST_PERIODS, send_digests
+
+
+class Command(BaseCommand):
+    help = 'Күнделікті немесе апталық хабарландыру дайджесттерін жіберу'
+
+    def add_arguments(self, parser):
+        parser.add_argument('frequency', choices=sorted(DIGEST_PERIODS))
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        sent = send_digests(options['frequency'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'{sent} дайджест жіберілді'))
@@ -0,0 +1,9 @@
+from core.jobs import job
+
+from .digest import send_digests as send_digest_emails
+
+
+# Хаттар қайта жіберілмеуі үшін бір ғана әрекет: сәтсіз болса, админде қайта қойылады
+@job(max_attempts=1, timeout=3600)
+def send_digests(frequency):
+    send_digest_emails(frequency)
@@ -1,3 +1,311 @@
-from django.test import TestCase
+import io
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from importlib import import_module
+from unittest import mock
 
-# Create your tests here.
+from django.apps import apps
+
+from django.core import mail
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from PIL import Image
+
+from core.changes import compact, read_changes
+from core.models import CustomUser, Group, Notification, NotificationChange, NotificationView
+from core.scheduling import activate_due, expire_due, next_due_time
+from core.signals import notification_published
+from edunotify.db_router import PIN_COOKIE_NAME
+from .digest import iter_digests, send_digests
+
+
+class DigestTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.group_a = Group.objects.create(name='A')
+        cls.group_b = Group.objects.create(name='B')
+        cls.author = CustomUser.objects.create_user(username='admin', email='admin@example.com', role='admin')
+        cls.general = Notification.objects.create(title='Жалпы', content='...', created_by=cls.author)
+        cls.for_a = Notification.objects.create(
+            title='A үшін', content='...', notification_type='group', group=cls.group_a, created_by=cls.author
+        )
+        Notification.objects.create(
+            title='Архив', content='...', status='archived', created_by=cls.author
+        )
+        for username, group in [('a1', cls.group_a), ('a2', cls.group_a), ('b1', cls.group_b), ('none', None)]:
+            CustomUser.objects.create_user(
+                username=username, email=f'{username}@example.com', group=group, digest_frequency='daily'
+            )
+        CustomUser.objects.create_user(username='off', email='off@example.com', group=cls.group_a)
+
+    def test_groups_notifications_per_recipient(self):
+        digests = {user['username']: [n['title'] for n in posts] for user, posts in iter_digests('daily')}
+        self.assertEqual(digests, {
+            'a1': ['Жалпы', 'A үшін'],
+            'a2': ['Жалпы', 'A үшін'],
+            'b1': ['Жалпы'],
+            'none': ['Жалпы'],
+        })
+
+    def test_query_count_does_not_depend_on_recipients(self):
+        with self.assertNumQueries(2):
+            sent = send_digests('daily')
+        self.assertEqual(sent, 4)
+        self.assertEqual(len(mail.outbox), 4)
+        bodies = {message.to[0]: message.body for message in mail.outbox}
+        self.assertIn('A үшін', bodies['a1@example.com'])
+        self.assertNotIn('A үшін', bodies['b1@example.com'])
+
+
+class SchedulingTests(TestCase):
+    def setUp(self):
+        self.admin = CustomUser.objects.create_user(
+            username='admin', email='admin@example.com', password='pass12345', role='admin'
+        )
+        self.student = CustomUser.objects.create_user(
+            username='student', email='student@example.com', password='pass12345'
+        )
+        self.published = []
+        handler = lambda notification, **kwargs: self.published.append(notification.title)  # noqa: E731
+        notification_published.connect(handler, weak=False)
+        self.addCleanup(notification_published.disconnect, handler)
+
+    def test_future_notification_is_hidden_until_activated(self):
+        publish_at = timezone.now() + timedelta(hours=2)
+        self.client.login(username='admin', password='pass12345')
+        self.client.post('/notifications/create/', {
+            'title': 'Емтихан кестесі', 'content': '...', 'notification_type': 'general',
+            'publish_at': timezone.localtime(publish_at).strftime('%Y-%m-%dT%H:%M'),
+        })
+        notification = Notification.objects.get(title='Емтихан кестесі')
+        self.assertEqual(notification.status, 'scheduled')
+        self.assertEqual(self.published, [])
+        self.assertEqual(next_due_time(), notification.publish_at)
+
+        self.client.login(username='student', password='pass12345')
+        self.assertEqual(len(self.client.get('/notifications/').context['notifications']), 0)
+        self.assertEqual(len(self.client.get('/').context['notifications']), 0)
+        self.assertRedirects(self.client.get(f'/notifications/{notification.id}/'), '/notifications/')
+
+        self.assertEqual(activate_due(now=publish_at - timedelta(minutes=1)), 0)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(activate_due(now=publish_at + timedelta(minutes=1)), 1)
+        notification.refresh_from_db()
+        self.assertEqual(notification.status, 'active')
+        self.assertEqual(notification.created_at, notification.publish_at)
+        self.assertEqual(self.published, ['Емтихан кестесі'])
+        self.assertEqual(len(self.client.get('/notifications/').context['notifications']), 1)
+
+    def test_activation_runs_in_batches_and_expiry_archives(self):
+        now = timezone.now()
+        for n in range(5):
+            Notification.objects.create(
+                title=f'N{n}', content='...', created_by=self.admin, status='scheduled',
+                publish_at=now - timedelta(minutes=n), expires_at=now + timedelta(hours=1),
+            )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(activate_due(now=now, batch_size=2), 5)
+        self.assertEqual(self.published, ['N4', 'N3', 'N2', 'N1', 'N0'])
+
+        self.assertEqual(next_due_time(), now + timedelta(hours=1))
+        self.assertEqual(expire_due(now=now + timedelta(hours=1)), 5)
+        self.assertEqual(Notification.objects.filter(status='archived').count(), 5)
+        self.assertIsNone(next_due_time())
+
+    def test_restored_expired_notification_stays_active(self):
+        now = timezone.now()
+        notification = Notification.objects.create(
+            title='Ескі', content='...', created_by=self.admin, expires_at=now - timedelta(minutes=1),
+        )
+        self.assertEqual(expire_due(now=now), 1)
+        notification.refresh_from_db()
+        notification.restore()
+        self.assertIsNone(notification.expires_at)
+        self.assertEqual(expire_due(), 0)
+        self.assertEqual(Notification.objects.get(pk=notification.pk).status, 'active')
+
+    def test_publish_time_of_active_notification_cannot_be_edited(self):
+        publish_at = timezone.now() - timedelta(hours=1)
+        notification = Notification.objects.create(
+            title='Жарияланған', content='...', created_by=self.admin, publish_at=publish_at,
+        )
+        self.client.login(username='admin', password='pass12345')
+        self.client.post(f'/notifications/{notification.id}/edit/', {
+            'title': 'Жарияланған', 'content': '...', 'notification_type': 'general',
+            'publish_at': timezone.localtime(publish_at + timedelta(days=3)).strftime('%Y-%m-%dT%H:%M'),
+        })
+        notification.refresh_from_db()
+        self.assertEqual(notification.publish_at, publish_at)
+        self.assertEqual(notification.status, 'active')
+
+
+class DetailViewTests(TestCase):
+    def setUp(self):
+        self.admin = CustomUser.objects.create_user(username='admin', email='admin@example.com', role='admin')
+        CustomUser.objects.create_user(username='student', email='student@example.com', password='pass12345')
+        self.notification = Notification.objects.create(title='Жалпы', content='...', created_by=self.admin)
+        self.client.login(username='student', password='pass12345')
+
+    def test_recording_view_does_not_pin_reader_to_primary(self):
+        for _ in range(2):
+            response = self.client.get(f'/notifications/{self.notification.pk}/')
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn(PIN_COOKIE_NAME, response.cookies)
+        self.notification.refresh_from_db()
+        self.assertEqual(self.notification.read_count, 1)
+        self.assertEqual(NotificationView.objects.filter(notification=self.notification).count(), 1)
+
+
+@override_settings(CHANGE_FEED_SETTLE_SECONDS=0)
+class ChangeFeedTests(TestCase):
+    def setUp(self):
+        self.group_a = Group.objects.create(name='A')
+        self.group_b = Group.objects.create(name='B')
+        self.admin = CustomUser.objects.create_user(username='admin', email='admin@example.com', role='admin')
+        self.student = CustomUser.objects.create_user(
+            username='student', email='student@example.com', password='pass12345', group=self.group_a
+        )
+        self.general = Notification.objects.create(title='Жалпы', content='...', created_by=self.admin)
+        self.for_a = Notification.objects.create(
+            title='A үшін', content='...', notification_type='group', group=self.group_a, created_by=self.admin
+        )
+        self.for_b = Notification.objects.create(
+            title='B үшін', content='...', notification_type='group', group=self.group_b, created_by=self.admin
+        )
+        self.client.login(username='student', password='pass12345')
+
+    def _sync(self, since=''):
+        response = self.client.get('/notifications/changes/', {'since': since})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_incremental_sync_with_tombstones(self):
+        first = self._sync()
+        self.assertEqual([n['id'] for n in first['upserts']], [self.general.id, self.for_a.id])
+        self.assertEqual(first['deletes'], [])
+
+        general_id = self.general.id
+        self.for_a.archive(user=self.admin)
+        self.general.delete()
+        self.for_b.title = 'B үшін (жаңа)'
+        self.for_b.save()
+        second = self._sync(first['cursor'])
+        self.assertEqual(second['upserts'], [])
+        self.assertEqual(sorted(second['deletes']), sorted([self.for_a.id, general_id, self.for_b.id]))
+
+        self.assertEqual(self._sync(second['cursor'])['deletes'], [])
+
+    def test_batches_stop_at_unsettled_gap_and_expired_cursor_resets(self):
+        now = timezone.now()
+        last = NotificationChange.objects.latest('seq').seq
+        NotificationChange.objects.create(seq=last + 2, notification_id=self.for_a.id, action='update')
+        with override_settings(CHANGE_FEED_SETTLE_SECONDS=60):
+            changes = read_changes(self.student, f'{last}.{int(now.timestamp())}')
+        self.assertEqual(changes['upserts'], [])
+        self.assertTrue(changes['cursor'].startswith(f'{last}.'))
+
+        changes = read_changes(self.student, f'{last}.{int(now.timestamp())}', now=now + timedelta(minutes=1))
+        self.assertEqual([n['id'] for n in changes['upserts']], [self.for_a.id])
+
+        expired = int((now - timedelta(days=31)).timestamp())
+        self.assertEqual(self.client.get('/notifications/changes/', {'since': f'1.{expired}'}).status_code, 410)
+        self.assertEqual(self.client.get('/notifications/changes/', {'since': 'abc'}).status_code, 400)
+
+    def test_gap_waits_for_older_open_transaction(self):
+        now = timezone.now()
+        last = NotificationChange.objects.latest('seq').seq
+        NotificationChange.objects.create(
+            seq=last + 2, notification_id=self.for_a.id, action='update', recorded_at=now - timedelta(minutes=5),
+        )
+        cursor = f'{last}.{int(now.timestamp())}'
+        # last+1 нөмірін ұстап тұрған транзакция жазба алдында басталған
+        with mock.patch('core.changes.oldest_open_write', return_value=now - timedelta(minutes=10)):
+            self.assertEqual(read_changes(self.student, cursor, now=now)['upserts'], [])
+        with mock.patch('core.changes.oldest_open_write', return_value=None):
+            changes = read_changes(self.student, cursor, now=now)
+        self.assertEqual([n['id'] for n in changes['upserts']], [self.for_a.id])
+
+    def test_migration_seeds_changes_for_existing_notifications(self):
+        NotificationChange.objects.exclude(notification_id=self.general.id).delete()
+        import_module('core.migrations.0015_seed_notification_changes').seed_changes(apps, None)
+        self.assertEqual(
+            sorted(NotificationChange.objects.values_list('notification_id', flat=True)),
+            sorted([self.general.id, self.for_a.id, self.for_b.id]),
+        )
+        self.assertEqual([n['id'] for n in self._sync()['upserts']], [self.general.id, self.for_a.id])
+
+    def test_compaction_keeps_latest_entry_per_notification(self):
+        self.for_a.archive(user=self.admin)
+        self.for_a.restore()
+        deleted_id = self.for_b.id
+        self.for_b.delete()
+        NotificationChange.objects.filter(notification_id=deleted_id).update(
+            recorded_at=timezone.now() - timedelta(days=40)
+        )
+
+        self.assertEqual(compact(), {'superseded': 3, 'tombstones': 1})
+        self.assertEqual(
+            sorted(NotificationChange.objects.values_list('notification_id', 'action')),
+            sorted([(self.general.id, 'create'), (self.for_a.id, 'restore')]),
+        )
+        self.assertEqual([n['id'] for n in self._sync()['upserts']], [self.general.id, self.for_a.id])
+
+
+def png_upload(name, size=(4, 4)):
+    buffer = io.BytesIO()
+    Image.new('RGB', size).save(buffer, 'PNG')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/png')
+
+
+class ImageUploadTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        overrides = override_settings(MEDIA_ROOT=self.media_root, UPLOAD_CLEANUP_BACKGROUND=False)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+        self.admin = CustomUser.objects.create_user(username='admin', email='admin@example.com', role='admin')
+        self.client.force_login(self.admin)
+
+    def _create(self, image):
+        return self.client.post('/notifications/create/', {
+            'title': 'Суретті', 'content': '...', 'notification_type': 'general', 'image': image,
+        })
+
+    def test_upload_is_written_once_to_final_path(self):
+        self.assertEqual(self._create(png_upload('Plan 1.png')).status_code, 302)
+        notification = Notification.objects.get(title='Суретті')
+
+        self.assertEqual(notification.image.name, f'notifications/{notification.pk}/plan-1.png')
+        self.assertEqual(os.listdir(os.path.join(self.media_root, 'notifications')), [str(notification.pk)])
+        self.assertEqual(os.listdir(os.path.join(self.media_root, 'notifications', str(notification.pk))),
+                         ['plan-1.png'])
+        # SQLite-те ID алу үшін екі жазба болады, бірақ өзгеріс тек біреу
+        self.assertEqual(
+            list(NotificationChange.objects.filter(notification_id=notification.pk).values_list('action', flat=True)),
+            ['create'],
+        )
+
+    def test_replaced_image_is_removed_after_commit(self):
+        self._create(png_upload('first.png'))
+        notification = Notification.objects.get(title='Суретті')
+        old_path = notification.image.path
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(f'/notifications/{notification.pk}/edit/', {
+                'title': 'Суретті', 'content': '...', 'notification_type': 'general',
+                'image': png_upload('second.png'),
+            })
+        notification.refresh_from_db()
+        self.assertTrue(notification.image.name.endswith('second.png'))
+        self.assertTrue(os.path.exists(notification.image.path))
+        self.assertFalse(os.path.exists(old_path))
+
+    def test_image_header_is_validated(self):
+        self._create(SimpleUploadedFile('fake.png', b'not an image', content_type='image/png'))
+        self._create(SimpleUploadedFile('bitmap.png', b'BM' + b'\x00' * 64, content_type='image/png'))
+        self.assertFalse(Notification.objects.filter(title='Суретті').exists())
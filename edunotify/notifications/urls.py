@@ -11,4 +11,6 @@ urlpatterns = [
     path('<int:notification_id>/restore/', views.restore_notification, name='restore_notification'),
     path('<int:notification_id>/delete-image/', views.delete_notification_image, name='delete_notification_image'),
     path('archive/', views.notification_archive_list, name='notification_archive'),
+    path('reach/least-read/', views.least_read_notifications, name='least_read_notifications'),
+    path('changes/', views.notification_changes, name='notification_changes'),
 ]
\ No newline at end of file
@@ -3,20 +3,26 @@ from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.db.models import Q
 from django.http import JsonResponse
-from django.core.paginator import Paginator
-import os
+from django.utils import timezone
+from django.utils.dateformat import format as date_format
 
-from core.models import Notification, Group, NotificationArchive
-from core.decorators import is_admin
+from core.models import Notification, NotificationArchive
+from core.catalogue import group_catalogue
+from core.changes import CursorError, CursorExpired, read_changes
+from core.concurrency import gather_queries
+from core.decorators import async_login_required, is_admin
+from core.paginator import EstimatedCountPaginator
+from core.feeds import feeds_for_user
+from core.reach import audience_size, group_breakdown, least_read_important, record_view, share
+from core.signals import notification_published
+from core.uploads import delete_files_later
+from edunotify.db_router import replica_reads
 from .forms import NotificationForm, ArchiveForm
 
 
-@login_required
-def notifications_list(request):
-    """Хабарландырулар тізімі"""
-    status_filter = request.GET.get('status', 'active')
-    
-    if request.user.role == 'admin':
+def notifications_queryset(user, status_filter):
+    """Пайдаланушыға және статус сүзгісіне сәйкес хабарландырулар"""
+    if user.role == 'admin':
         if status_filter == 'all':
             notifications = Notification.objects.exclude(status='deleted').order_by('-created_at')
         elif status_filter == 'archived':
@@ -29,13 +35,13 @@ def notifications_list(request):
         if status_filter == 'archived':
             notifications = Notification.objects.filter(
                 status='archived',
-                archived_by=request.user
+                archived_by=user
             ).order_by('-archive_date')
         else:
-            if request.user.group:
+            if user.group:
                 notifications = Notification.objects.filter(
                     Q(notification_type='general') | 
-                    Q(group=request.user.group),
+                    Q(group=user.group),
                     status='active'
                 ).order_by('-created_at')
             else:
@@ -43,29 +49,61 @@ def notifications_list(request):
                     notification_type='general',
                     status='active'
                 ).order_by('-created_at')
-    
-    important_notifications = notifications.filter(is_important=True, status='active')
-    
-    paginator = Paginator(notifications, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-    
-    groups = None
+    # Тізімдер excerpt-ті көрсетеді: толық мазмұн жүктелмейді
+    return notifications.select_related('group', 'created_by').defer('content', 'content_html')
+
+
+def load_page(paginator, number):
+    """Бетті жолдарымен бірге жүктеу (async көріністе шаблон сұрау жасамауы үшін)"""
+    page = paginator.get_page(number)
+    page.object_list = list(page.object_list)
+    return page
+
+
+def notifications_list_queries(request):
+    """Тізім бетінің бір-бірінен тәуелсіз сұраулары"""
+    status_filter = request.GET.get('status', 'active')
+    paginator = EstimatedCountPaginator(notifications_queryset(request.user, status_filter), 10)
+    queries = {
+        'page_obj': lambda: load_page(paginator, request.GET.get('page')),
+        'feeds': lambda: feeds_for_user(request.user),
+    }
     if request.user.role == 'admin':
-        groups = Group.objects.all()
-    
-    context = {
-        'notifications': page_obj,
-        'important_notifications': important_notifications,
-        'groups': groups,
-        'status_filter': status_filter,
-        'page_obj': page_obj,
+        queries['groups'] = group_catalogue
+    return queries
+
+
+def notifications_list_context(request, results):
+    """Sync және ASGI көріністеріне ортақ контекст"""
+    return {
+        'notifications': results['page_obj'],
+        'groups': results.get('groups'),
+        'status_filter': request.GET.get('status', 'active'),
+        'page_obj': results['page_obj'],
+        'feeds': results['feeds'],
     }
+
+
+@login_required
+@replica_reads
+def notifications_list(request):
+    """Хабарландырулар тізімі"""
+    results = {name: query() for name, query in notifications_list_queries(request).items()}
     
-    return render(request, 'notifications/list.html', context)
+    return render(request, 'notifications/list.html', notifications_list_context(request, results))
+
+
+@async_login_required
+@replica_reads
+async def notifications_list_async(request):
+    """notifications_list-тің ASGI нұсқасы: бет пен группалар тізімі қатар жүктеледі"""
+    results = await gather_queries(**notifications_list_queries(request))
+    
+    return render(request, 'notifications/list.html', notifications_list_context(request, results))
 
 
 @login_required
+@replica_reads
 def notification_detail(request, notification_id):
     """Хабарландырудың толық сипаттамасы"""
     notification = get_object_or_404(Notification, id=notification_id)
@@ -75,11 +113,21 @@ def notification_detail(request, notification_id):
         return redirect('notifications')
     
     can_archive = notification.can_archive(request.user)
+    record_view(request.user, notification)
     
-    return render(request, 'notifications/detail.html', {
+    context = {
         'notification': notification,
         'can_archive': can_archive
-    })
+    }
+    if request.user.is_admin or notification.created_by_id == request.user.pk:
+        audience = audience_size(notification)
+        context.update({
+            'audience': audience,
+            'read_share': share(notification.read_count, audience),
+            'reach_by_group': group_breakdown(notification),
+        })
+    
+    return render(request, 'notifications/detail.html', context)
 
 
 @login_required
@@ -89,17 +137,22 @@ def create_notification(request):
         form = NotificationForm(request.POST, request.FILES)
         
         if form.is_valid():
-            # Алдымен notification сақталып, ID алынады
+            # Сурет (бар болса) осы save()-те бірден соңғы орнына жазылады
             notification = form.save(commit=False)
             notification.created_by = request.user
-            notification.save()  # Бұл жерде сақтап, ID алу керек
-            
-            # Ендер суретті жаңарту
-            if 'image' in request.FILES:
-                notification.image = request.FILES['image']
-                notification.save()  # Суретті сақтау
+            if notification.is_publish_pending():
+                notification.status = 'scheduled'
+            notification.save()
             
-            messages.success(request, 'Хабарландыру сәтті жарияланды!')
+            if notification.is_scheduled:
+                messages.success(
+                    request,
+                    f'Хабарландыру {date_format(timezone.localtime(notification.publish_at), "d.m.Y H:i")} '
+                    f'уақытына жоспарланды!'
+                )
+            else:
+                notification_published.send(sender=Notification, notification=notification)
+                messages.success(request, 'Хабарландыру сәтті жарияланды!')
             return redirect('notification_detail', notification_id=notification.id)
         else:
             # Форма қателерін көрсету
@@ -109,7 +162,7 @@ def create_notification(request):
     else:
         form = NotificationForm()
     
-    groups = Group.objects.all()
+    groups = group_catalogue()
     return render(request, 'notifications/create.html', {
         'form': form,
         'groups': groups
@@ -126,27 +179,31 @@ def edit_notification(request, notification_id):
         return redirect('notification_detail', notification_id=notification.id)
     
     if request.method == 'POST':
+        # is_valid() жаңа суретті instance-қа орнатады: ескісінің атын алдын ала сақтау
+        old_image = notification.image.name
         form = NotificationForm(request.POST, request.FILES, instance=notification)
         
         if form.is_valid():
-            old_image = None
-            if notification.image:
-                old_image = notification.image.path
+            notification = form.save(commit=False)
+            # Тек әлі жарияланбаған хабарландырудың уақытын ауыстыруға болады
+            published_now = False
+            if notification.is_scheduled and not notification.is_publish_pending():
+                notification.status = 'active'
+                published_now = True
+            notification.save()
             
-            notification = form.save()
+            if published_now:
+                notification_published.send(sender=Notification, notification=notification)
 
-            if 'image' in request.FILES and old_image and os.path.exists(old_image):
-                try:
-                    os.remove(old_image)
-                except:
-                    pass
+            if old_image and notification.image.name != old_image:
+                delete_files_later(notification.image.storage, [old_image])
             
             messages.success(request, 'Хабарландыру сәтті жаңартылды!')
             return redirect('notification_detail', notification_id=notification.id)
         else:
             messages.error(request, 'Қателіктерді түзетіңіз')
     
-    groups = Group.objects.all()
+    groups = group_catalogue()
     return render(request, 'notifications/edit.html', {
         'notification': notification,
         'groups': groups
@@ -164,11 +221,7 @@ def delete_notification(request, notification_id):
     
     if request.method == 'POST':
         if notification.image:
-            if os.path.exists(notification.image.path):
-                try:
-                    os.remove(notification.image.path)
-                except:
-                    pass
+            delete_files_later(notification.image.storage, [notification.image.name])
         
         notification.delete()
         
@@ -240,13 +293,7 @@ def delete_notification_image(request, notification_id):
     
     if request.method == 'POST':
         if notification.image:
-            if os.path.exists(notification.image.path):
-                try:
-                    os.remove(notification.image.path)
-                except:
-                    pass
-            
-            notification.image.delete(save=True)
+            notification.delete_image()
             
             messages.success(request, 'Сурет сәтті жойылды!')
     
@@ -254,6 +301,7 @@ def delete_notification_image(request, notification_id):
 
 
 @login_required
+@replica_reads
 def notification_archive_list(request):
     """Архивтелген хабарландырулар тізімі - барлық пайдаланушылар үшін"""
     if request.user.role == 'admin':
@@ -266,11 +314,63 @@ def notification_archive_list(request):
             archived_by=request.user
         ).order_by('-archive_date')
     
-    paginator = Paginator(archived_notifications, 15)
+    paginator = EstimatedCountPaginator(archived_notifications, 15)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     
     return render(request, 'notifications/archive_list.html', {
         'notifications': page_obj,
         'page_obj': page_obj,
-    }) 
\ No newline at end of file
+    }) 
+
+CHANGES_BATCH_LIMIT = 500
+
+
+@login_required
+def notification_changes(request):
+    """Курсордан кейінгі өзгерістер: ?since=<курсор>&limit=N"""
+    try:
+        limit = min(int(request.GET.get('limit', CHANGES_BATCH_LIMIT)), CHANGES_BATCH_LIMIT)
+    except ValueError:
+        limit = CHANGES_BATCH_LIMIT
+    
+    try:
+        changes = read_changes(request.user, request.GET.get('since'), limit=max(limit, 1))
+    except CursorError:
+        return JsonResponse({'success': False, 'error': 'Курсор дұрыс емес'}, status=400)
+    except CursorExpired:
+        # Tombstone-дар тазаланған: клиент since-сіз толық синхрондауды бастауы керек
+        return JsonResponse({'success': False, 'reset': True}, status=410)
+    
+    return JsonResponse({'success': True, **changes})
+
+
+REACH_LIST_LIMIT = 100
+
+
+@login_required
+@replica_reads
+def least_read_notifications(request):
+    """Ең аз оқылған маңызды хабарландырулар (тек админ): ?limit=N"""
+    if not is_admin(request.user):
+        return JsonResponse({'success': False, 'error': 'Рұқсат жоқ'}, status=403)
+    try:
+        limit = min(max(int(request.GET.get('limit', 10)), 1), REACH_LIST_LIMIT)
+    except ValueError:
+        limit = 10
+    
+    return JsonResponse({
+        'success': True,
+        'notifications': [
+            {
+                'id': notification.id,
+                'title': notification.title,
+                'group': notification.group.name if notification.group else None,
+                'created_at': notification.created_at.isoformat(),
+                'read_count': notification.read_count,
+                'audience': notification.audience,
+                'share': notification.reach_share,
+            }
+            for notification in least_read_important(limit)
+        ],
+    })
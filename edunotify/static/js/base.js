@@ -0,0 +1,109 @@
+document.addEventListener('DOMContentLoaded', function() {
+    setTimeout(() => {
+        document.getElementById('loadingOverlay').classList.add('hidden');
+        document.body.style.opacity = '1';
+    }, 800);
+
+    const internalLinks = document.querySelectorAll('a[href^="/"], a[href^="http://127.0.0.1"], a[href^="{% url"]');
+
+    internalLinks.forEach(link => {
+        link.addEventListener('click', function(e) {
+            if (this.target === '_blank' || this.hasAttribute('download') || 
+                this.getAttribute('href').startsWith('#')) {
+                return;
+            }
+
+            e.preventDefault();
+            const href = this.getAttribute('href');
+
+            document.body.classList.add('page-transition');
+
+
+            document.getElementById('loadingOverlay').classList.remove('hidden');
+
+            setTimeout(() => {
+                window.location.href = href;
+            }, 300);
+        });
+    });
+
+
+    const logo = document.getElementById('pageLogo');
+    setTimeout(() => {
+        logo.style.animation = 'bounce 1s ease-out';
+        setTimeout(() => {
+            logo.style.animation = '';
+        }, 1000);
+    }, 1000);
+
+
+    const cards = document.querySelectorAll('.card');
+    cards.forEach(card => {
+        card.addEventListener('mouseenter', () => {
+            card.style.transform = 'translateY(-5px)';
+        });
+
+        card.addEventListener('mouseleave', () => {
+            card.style.transform = 'translateY(0)';
+        });
+    });
+
+    const buttons = document.querySelectorAll('.btn');
+    buttons.forEach(button => {
+        button.addEventListener('click', function(e) {
+            const x = e.clientX - e.target.getBoundingClientRect().left;
+            const y = e.clientY - e.target.getBoundingClientRect().top;
+
+            const ripple = document.createElement('span');
+            ripple.style.position = 'absolute';
+            ripple.style.borderRadius = '50%';
+            ripple.style.backgroundColor = 'rgba(255, 255, 255, 0.5)';
+            ripple.style.transform = 'translate(-50%, -50%) scale(0)';
+            ripple.style.animation = 'ripple 0.6s linear';
+            ripple.style.left = `${x}px`;
+            ripple.style.top = `${y}px`;
+            ripple.style.width = '100px';
+            ripple.style.height = '100px';
+
+            this.appendChild(ripple);
+
+            setTimeout(() => {
+                ripple.remove();
+            }, 600);
+        });
+    });
+
+
+    const animateOnScroll = () => {
+        const elements = document.querySelectorAll('.card, .notification-item, .table tr');
+
+        elements.forEach(element => {
+            const elementTop = element.getBoundingClientRect().top;
+            const elementVisible = 150;
+
+            if (elementTop < window.innerHeight - elementVisible) {
+                element.style.opacity = '1';
+                element.style.transform = 'translateY(0)';
+            }
+        });
+    };
+
+
+    document.querySelectorAll('.card, .notification-item, .table tr').forEach(el => {
+        el.style.opacity = '0';
+        el.style.transform = 'translateY(20px)';
+        el.style.transition = 'opacity 0.5s ease, transform 0.5s ease';
+    });
+
+
+    window.addEventListener('scroll', animateOnScroll);
+    animateOnScroll(); 
+});
+
+
+window.addEventListener('pageshow', function(event) {
+    if (event.persisted) {
+        document.getElementById('loadingOverlay').classList.add('hidden');
+        document.body.classList.remove('page-transition');
+    }
+});